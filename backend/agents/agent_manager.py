@@ -1,19 +1,33 @@
-from typing import Dict, Any
+import time
+import asyncio
+from typing import Dict, Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from config import settings
 from .base_agent import BaseAgent
+from .telemetry import track, record_attempt
+from .llm_client import LLMClientRegistry, llm_registry as shared_llm_registry
 from .extraction_agent import ExtractionAgent
 from .categorization_agent import CategorizationAgent
 from .context_agent import ContextAgent
 from .education_agent import EducationAgent
 from .translation_agent import TranslationAgent
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from .education_rendition_agent import EducationRenditionAgent, rendition_targets, assemble_education, section_sink
+from .analysis_agent import AnalysisAgent, split_analysis
+from .chunking import split_text
+from .json_stream import Path
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
+
+SectionCallback = Callable[[Path, Any], Awaitable[None]]
+# Wraps one step of a staged agent run, e.g. with a pipeline checkpoint: (step, inputs, compute) -> result
+StepRunner = Callable[[str, Any, Callable[[], Awaitable[Dict[str, Any]]]], Awaitable[Dict[str, Any]]]
 
 # Helper for Retry Logic
 # Retries 3 times, waiting 2s, 4s, 8s...
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
 async def execute_agent_scan(agent: BaseAgent, text: str, **kwargs) -> Dict[str, Any]:
     """Execute an agent's process method with retry logic"""
+    record_attempt()
     try:
-        return await agent.process(text, **kwargs)
+        return await agent.run(text, **kwargs)
     except Exception as e:
         print(f"Agent {agent.name} failed (attempting retry): {e}")
         raise e
@@ -26,14 +40,43 @@ class AgentManager:
     and task offloading exclusively mapped via string handler names.
     """
     
-    def __init__(self) -> None:
-        """Initialize the AgentManager and sequentially map available pipeline agents."""
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
+        """
+        Initialize the AgentManager and sequentially map available pipeline agents.
+
+        Args:
+            llm_registry (LLMClientRegistry, optional): Registry the agents draw their LLM clients from,
+                defaults to the shared one.
+        """
         self.agents: Dict[str, BaseAgent] = {}
-        self.register_agent(ExtractionAgent())
-        self.register_agent(CategorizationAgent())
-        self.register_agent(ContextAgent())
-        self.register_agent(EducationAgent())
-        self.register_agent(TranslationAgent())
+        self.llm_registry = llm_registry or shared_llm_registry
+        # Shared by every concurrent batch so parallel backfills split one LLM budget
+        self.batch_slots = asyncio.Semaphore(max(1, settings.AGENT_BATCH_MAX_INFLIGHT))
+        self.register_agent(ExtractionAgent(llm_registry))
+        self.register_agent(CategorizationAgent(llm_registry))
+        self.register_agent(ContextAgent(llm_registry))
+        self.register_agent(EducationAgent(llm_registry))
+        self.register_agent(TranslationAgent(llm_registry))
+        self.register_agent(AnalysisAgent(llm_registry))
+        self.register_agent(EducationRenditionAgent(llm_registry))
+
+    async def warm_up(self, extra_agents: Iterable[BaseAgent] = (), connections: int = 2) -> Dict[str, Any]:
+        """
+        Compile every agent's prompts, build its chains and open LLM connections before traffic arrives.
+
+        Args:
+            extra_agents (Iterable[BaseAgent]): Agents owned elsewhere (e.g. the verification agents) to warm too.
+            connections (int): Pooled connections to open to the LLM provider.
+
+        Returns:
+            Dict[str, Any]: Chains built, connections opened and time taken.
+        """
+        start = time.perf_counter()
+        chains = sum(agent.warm_up() for agent in [*self.agents.values(), *extra_agents])
+        opened = await self.llm_registry.open_connections(connections)
+        summary = {"chains": chains, "connections": opened, "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+        print(f"Agents warmed up: {summary}")
+        return summary
 
     def register_agent(self, agent: BaseAgent) -> None:
         """
@@ -86,38 +129,145 @@ class AgentManager:
             return await execute_agent_scan(self.agents["context"], text)
         return {}
 
-    async def process_education(self, text: str, language: str = "en") -> Dict[str, Any]:
+    async def process_fused_analysis(self, text: str) -> Dict[str, Dict[str, Any]] | None:
+        """
+        Run extraction, categorization and context as a single fused LLM call.
+
+        Args:
+            text (str): Validated transcription corpus.
+
+        Returns:
+            Dict[str, Dict[str, Any]] | None: {"extraction", "categorization", "context"} shaped like
+                the separate agents' outputs, or None if the fused response failed validation or the
+                transcript needs chunking.
+        """
+        if "analysis" not in self.agents:
+            return None
+        # A transcript that needs chunking is left to the separate agents, which map-reduce over it
+        if len(split_text(text)) > 1:
+            return None
+        data = await execute_agent_scan(self.agents["analysis"], text)
+        if data.get("error"):
+            print(f"Fused analysis rejected, falling back to separate agents: {data['error']}")
+            return None
+        return split_analysis(data)
+
+    async def process_analysis(self, text: str, mode: str | None = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extraction, categorization and context in the configured AGENT_ANALYSIS_MODE.
+
+        'fused' makes one combined call and falls back to the three separate agents
+        (run concurrently) if its response is missing any key the pipeline reads, or
+        if the transcript is longer than one AGENT_CHUNK_TOKENS chunk.
+
+        Args:
+            text (str): Validated transcription corpus.
+            mode (str, optional): 'separate' or 'fused', defaults to AGENT_ANALYSIS_MODE.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {"extraction", "categorization", "context"}.
+        """
+        if (mode or settings.AGENT_ANALYSIS_MODE) == "fused":
+            if fused := await self.process_fused_analysis(text):
+                return fused
+        extraction, categorization, context = await asyncio.gather(
+            self.process_extraction(text),
+            self.process_categorization(text),
+            self.process_context(text)
+        )
+        return {"extraction": extraction, "categorization": categorization, "context": context}
+
+    async def process_education(
+        self, text: str, language: str = "en", on_section: SectionCallback | None = None,
+        mode: str | None = None
+    ) -> Dict[str, Any]:
         """
         Reconstruct original metadata logically structured for pedagogical transmission.
 
         Args:
             text (str): Target text transcript.
             language (str): Destination instructional language code translation base.
+            on_section (SectionCallback, optional): Receives each (section, language) as it streams in.
+            mode (str, optional): "single" or "staged", defaults to EDUCATION_MODE.
 
         Returns:
             Dict[str, Any]: Formatted pedagogical dictionary mapped explicitly.
         """
+        if (mode or settings.EDUCATION_MODE) == "staged" and "education_rendition" in self.agents:
+            return await self.process_education_staged(text, language, on_section)
         if "education" in self.agents:
-            return await execute_agent_scan(self.agents["education"], text, language=language)
+            return await execute_agent_scan(self.agents["education"], text, language=language, on_section=on_section)
         return {}
 
-    async def process_translation(self, text: str) -> Dict[str, str]:
+    async def process_education_staged(
+        self, text: str, language: str = "en", on_section: SectionCallback | None = None,
+        run_step: StepRunner | None = None
+    ) -> Dict[str, Any]:
+        """
+        Generate the English education content first, then the Hindi and native renditions concurrently.
+
+        Each step retries on its own, and the renditions are cached per language.
+
+        Args:
+            text (str): Target text transcript.
+            language (str): Language code of the recording (the "native" rendition).
+            on_section (SectionCallback, optional): Receives each (section, language) as it streams in.
+            run_step (StepRunner, optional): Wraps each step ("en", "hi", "native"), e.g. to checkpoint it.
+
+        Returns:
+            Dict[str, Any]: The single-call shape, {"summary": {"en", "hi", "native"}, ...}; the English
+                result as-is when it could not be parsed.
+        """
+        if run_step is None:
+            async def run_step(step: str, inputs: Any, compute):
+                return await compute()
+
+        english = await run_step(
+            "en", {"transcript": text, "language": language},
+            lambda: execute_agent_scan(
+                self.agents["education"], text, language=language, english_only=True,
+                on_section=section_sink(on_section, "en")
+            )
+        )
+        if "error" in english:
+            return english
+
+        targets = rendition_targets(language)
+        renditions = await asyncio.gather(*[
+            run_step(
+                key, {"english": english, "language": code},
+                lambda key=key, code=code: execute_agent_scan(
+                    self.agents["education_rendition"], english, target_language=code,
+                    on_section=section_sink(on_section, key)
+                )
+            )
+            for key, code in targets.items()
+        ])
+        return assemble_education({"en": english, **dict(zip(targets, renditions))}, language)
+
+    async def process_translation(self, text: str, on_section: SectionCallback | None = None) -> Dict[str, str]:
         """
         Multilingual globalization process propagating language alternatives natively.
 
         Args:
             text (str): Evaluated origin string text corpus.
+            on_section (SectionCallback, optional): Receives the translation once it has streamed in.
 
         Returns:
             Dict[str, str]: Mapped language string translations natively.
         """
         if "translation" in self.agents:
-            return await execute_agent_scan(self.agents["translation"], text)
+            return await execute_agent_scan(self.agents["translation"], text, on_section=on_section)
         return {}
 
-    async def run_pipeline(self, text: str) -> Dict[str, Any]:
+    async def run_pipeline(self, text: str, max_concurrency: int | None = None) -> Dict[str, Any]:
         """
-        Run the full cultural preservation pipeline synchronously.
+        Run the full cultural preservation pipeline.
+
+        All five agents only need the raw text, so they run concurrently, at most
+        `max_concurrency` at a time (1 reproduces the old sequential behaviour).
+        A failing agent doesn't sink the others: its result is None and its error
+        is reported under `errors`.
         
         Evaluated Steps:
         1. Extraction
@@ -128,16 +278,137 @@ class AgentManager:
 
         Args:
             text (str): Full original narrative structure.
+            max_concurrency (int, optional): Agents allowed in flight at once, defaults to AGENT_MAX_CONCURRENCY.
 
         Returns:
-            Dict[str, Any]: Re-mapped aggregation holding entirely tracked variables.
+            Dict[str, Any]: Re-mapped aggregation holding entirely tracked variables, plus per-agent
+                `timings` (latency, attempts, token usage) and any `errors`.
         """
-        results = {"original_text": text}
-        
-        results["extraction"] = await self.process_extraction(text)
-        results["categorization"] = await self.process_categorization(text)
-        results["context"] = await self.process_context(text)
-        results["education"] = await self.process_education(text)
-        results["translation"] = await self.process_translation(text)
-        
+        steps = {
+            "extraction": lambda: self.process_extraction(text),
+            "categorization": lambda: self.process_categorization(text),
+            "context": lambda: self.process_context(text),
+            "education": lambda: self.process_education(text),
+            "translation": lambda: self.process_translation(text),
+        }
+        fused = settings.AGENT_ANALYSIS_MODE == "fused"
+        if fused:
+            # One combined call stands in for the three analysis agents
+            for name in ("extraction", "categorization", "context"):
+                del steps[name]
+            steps = {"analysis": lambda: self.process_analysis(text, mode="fused"), **steps}
+        slots = asyncio.Semaphore(max(1, max_concurrency or settings.AGENT_MAX_CONCURRENCY))
+        results: Dict[str, Any] = {"original_text": text}
+        timings: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+
+        async def run_step(name: str, call) -> None:
+            async with slots:
+                with track(name) as timing:
+                    try:
+                        results[name] = await call()
+                    except Exception as e:
+                        # Retries are exhausted; keep the other agents' results
+                        if isinstance(e, RetryError):
+                            e = e.last_attempt.exception()
+                        results[name] = None
+                        errors[name] = str(e)
+                        timing.status = "failed"
+                        timing.error = str(e)
+                timings[name] = timing.as_dict()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[run_step(name, call) for name, call in steps.items()])
+
+        if fused:
+            analysis = results.pop("analysis") or {}
+            for name in ("extraction", "categorization", "context"):
+                results[name] = analysis.get(name)
+                if "analysis" in errors:
+                    errors[name] = errors["analysis"]
+            errors.pop("analysis", None)
+        order = ["extraction", "categorization", "context", "education", "translation"]
+
+        # Keep the response keys in pipeline order regardless of completion order
+        results = {"original_text": text, **{name: results[name] for name in order}}
+        results["timings"] = {
+            "total_latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "agents": {name: timings[name] for name in steps}
+        }
+        if errors:
+            results["errors"] = errors
         return results
+
+    async def run_batch(self, texts: AsyncIterable[str | Exception], concurrency: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run many texts through run_pipeline, yielding each result as soon as it completes.
+
+        At most `concurrency` texts from this batch are in flight, and no more than
+        AGENT_BATCH_MAX_INFLIGHT across all batches. Input is only pulled as slots
+        free up, so a long input iterator is consumed at the pace the LLM can sustain.
+
+        Args:
+            texts (AsyncIterable[str | Exception]): Input texts; an Exception marks an unparseable item.
+            concurrency (int): Texts from this batch processed at once.
+
+        Returns:
+            AsyncIterator[Dict[str, Any]]: {"index", "status", "result" | "error"} in completion order.
+        """
+        local_slots = asyncio.Semaphore(max(1, concurrency))
+        completed: asyncio.Queue = asyncio.Queue()
+        tasks: set[asyncio.Task] = set()
+        done = object()
+
+        async def run_one(index: int, text: str) -> None:
+            try:
+                async with self.batch_slots:
+                    result = await self.run_pipeline(text)
+                status = "partial" if result.get("errors") else "success"
+                await completed.put({"index": index, "status": status, "result": result})
+            except Exception as e:
+                await completed.put({"index": index, "status": "failed", "error": str(e)})
+            finally:
+                local_slots.release()
+
+        async def feed() -> None:
+            index = 0
+            try:
+                async for text in texts:
+                    if index >= settings.AGENT_BATCH_MAX_ITEMS:
+                        await completed.put({"index": index, "status": "failed",
+                                             "error": f"Batch limit of {settings.AGENT_BATCH_MAX_ITEMS} items reached"})
+                        break
+                    if isinstance(text, Exception):
+                        await completed.put({"index": index, "status": "failed", "error": str(text)})
+                    else:
+                        await local_slots.acquire()
+                        task = asyncio.create_task(run_one(index, text))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    index += 1
+            except Exception as e:
+                await completed.put({"index": index, "status": "failed", "error": f"Failed to read input: {e}"})
+            finally:
+                if tasks:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                await completed.put(done)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while (item := await completed.get()) is not done:
+                yield item
+        finally:
+            # Client went away mid-batch: stop reading input and cancel in-flight texts
+            feeder.cancel()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(feeder, *tasks, return_exceptions=True)
+
+_agent_manager: AgentManager | None = None
+
+def get_agent_manager() -> AgentManager:
+    """Return the process-wide AgentManager, so every router and script shares one set of agents."""
+    global _agent_manager
+    if _agent_manager is None:
+        _agent_manager = AgentManager()
+    return _agent_manager
@@ -0,0 +1,88 @@
+from typing import Dict, Any
+from .base_agent import BaseAgent
+from .llm_client import LLMClientRegistry
+from .categorization_agent import CATEGORIES
+from .structured_output import OutputSchema
+
+# Keys process_record_task reads from the extraction, categorization and context outputs
+REQUIRED_KEYS = ("title", "region", "latitude", "longitude", "category", "context_analysis")
+EXTRACTION_KEYS = ("title", "knowledge_type", "details", "cultural_context", "region", "latitude", "longitude")
+
+def validate_analysis(data: Any) -> list[str]:
+    """
+    Check a fused analysis response against the keys the pipeline consumes.
+
+    Returns:
+        list[str]: Problems found; empty when the response is usable.
+    """
+    if not isinstance(data, dict):
+        return ["response is not a JSON object"]
+    problems = [f"missing '{key}'" for key in REQUIRED_KEYS if key not in data]
+    for key in ("title", "region", "category", "context_analysis"):
+        if key in data and not (isinstance(data[key], str) and data[key].strip()):
+            problems.append(f"'{key}' must be a non-empty string")
+    for key in ("latitude", "longitude"):
+        value = data.get(key)
+        if value is not None and not isinstance(value, (int, float)):
+            problems.append(f"'{key}' must be a number or null")
+    return problems
+
+ANALYSIS_SCHEMA = OutputSchema(check=validate_analysis)
+
+def split_analysis(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Reshape a fused response into the outputs of the three separate agents."""
+    return {
+        "extraction": {key: data.get(key) for key in EXTRACTION_KEYS},
+        "categorization": {"category": data["category"]},
+        "context": {"context_analysis": data["context_analysis"]},
+    }
+
+class AnalysisAgent(BaseAgent):
+    """
+    Fused agent producing extraction, categorization and context analysis from a single
+    LLM call, so the transcript is sent (and billed) once instead of three times.
+    """
+    PROMPTS = {
+        "main": """
+            Analyse the following cultural knowledge text: {text}
+
+            Return the output in STRICT JSON format with ALL of the following keys:
+            - title (str): A concise, descriptive title for this piece of cultural knowledge (max 6 words).
+            - knowledge_type (str): e.g., "folk_remedy", "ritual", "story", "other"
+            - details (dict): Key details extracted (ingredients, steps, characters, etc.)
+            - cultural_context (str): The cultural significance or context, in one or two sentences.
+            - region (str): Specific geographic region associated with the cultural knowledge (e.g., "Kerala, India"). If unknown, return "unknown".
+            - latitude (float or null): Estimated precise latitude of the region (e.g. 10.8505). Return null if indeterminable.
+            - longitude (float or null): Estimated precise longitude of the region (e.g. 76.2711). Return null if indeterminable.
+            - category (str): The cultural domain. Choose ONE from: {categories}.
+            - context_analysis (str): A few paragraphs analysing the cultural context and significance of the text.
+
+            Do not add any markdown formatting like ```json ... ```. Just the raw JSON string.
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
+        """Initialize the AnalysisAgent with the same deterministic model as the agents it replaces."""
+        super().__init__("analysis", llm_registry, temperature=0)
+
+    async def process(self, input_data: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Extract entities, pick the cultural domain and analyse context in one structured response.
+
+        Args:
+            input_data (str): Transcript to analyse.
+            **kwargs (Any): Extensible variable configurations for base class.
+
+        Returns:
+            Dict[str, Any]: Union of the extraction, categorization and context schemas, or a
+                dict with an 'error' key when the response is not valid JSON or misses required keys.
+        """
+        chain = self.chain("main")
+        response = await self._invoke(chain, {
+            "text": input_data,
+            "categories": ", ".join(f'"{c}"' for c in CATEGORIES)
+        })
+
+        return await self._parse_output(
+            response, ANALYSIS_SCHEMA, {"error": "Fused analysis response unusable", "raw_output": response.content}
+        )
@@ -1,18 +1,129 @@
+import hashlib
+import inspect
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from config import settings
+from langchain_core.prompts import ChatPromptTemplate
+from .telemetry import record_usage, usage_tokens
+from .rate_limiter import estimate_tokens, retry_after_seconds
+from .response_cache import agent_response_cache
+from .json_stream import IncrementalJSONParser, Path
+from .structured_output import OutputSchema, parse_json, parse_stats
+from .llm_client import LLMClientRegistry, llm_registry as shared_llm_registry
+
+# Compiled once at import; used by every agent's `_reask_json`
+REASK_PROMPT = ChatPromptTemplate.from_template(
+    """
+    The output below was supposed to be a single JSON object with these keys:
+    {keys}
+
+    It has these problems: {problems}
+
+    Output:
+    {output}
+
+    Return only the corrected JSON object. Keep the content as it is; only fix the structure.
+    Do not add any markdown formatting or explanation.
+    """
+)
 
 class BaseAgent(ABC):
     """
     Abstract base class for all language model agents in the pipeline.
     """
-    def __init__(self, name: str) -> None:
+    # False when the result depends on more than the input (e.g. the archive), so it can't be cached
+    cacheable: bool = True
+    # Prompt templates by name; each is compiled once per class (see `prompt` and `chain`)
+    PROMPTS: Dict[str, str] = {}
+
+    def __init__(self, name: str, llm_registry: LLMClientRegistry | None = None, **llm_params: Any) -> None:
         """
         Initialize the base agent.
 
         Args:
             name (str): The unique identifier for this agent.
+            llm_registry (LLMClientRegistry, optional): Source of LLM clients, defaults to the shared registry.
+            **llm_params (Any): ChatGroq parameters for this agent (temperature, max_tokens, ...).
         """
         self.name = name
+        self.llm_registry = llm_registry or shared_llm_registry
+        self.llm_params = llm_params
+        self._llm: Any = None
+        self._chains: Dict[str, Tuple[Any, Any]] = {}
+
+    @property
+    def llm(self) -> Any:
+        """The agent's LLM client, resolved from the registry unless one was assigned directly."""
+        if self._llm is not None:
+            return self._llm
+        return self.llm_registry.for_agent(self.name, **self.llm_params)
+
+    @llm.setter
+    def llm(self, value: Any) -> None:
+        self._llm = value
+
+    @classmethod
+    def prompt(cls, name: str) -> ChatPromptTemplate:
+        """The compiled template PROMPTS[name], parsed on first use and shared by every instance of the class."""
+        compiled = cls.__dict__.get("_compiled_prompts")
+        if compiled is None:
+            compiled = cls._compiled_prompts = {}
+        if name not in compiled:
+            compiled[name] = ChatPromptTemplate.from_template(cls.PROMPTS[name])
+        return compiled[name]
+
+    def chain(self, name: str) -> Any:
+        """`prompt(name) | llm`, rebuilt only when the agent's LLM client changes (e.g. on a new event loop)."""
+        llm = self.llm
+        cached = self._chains.get(name)
+        if cached is None or cached[0] is not llm:
+            cached = self._chains[name] = (llm, self.prompt(name) | llm)
+        return cached[1]
+
+    def warm_up(self) -> int:
+        """Compile every prompt and build its chain ahead of the first request; returns how many."""
+        for name in self.PROMPTS:
+            self.chain(name)
+        return len(self.PROMPTS)
+
+    @property
+    def deterministic(self) -> bool:
+        """Whether the agent samples at temperature 0, so the same prompt gives the same answer."""
+        return not self.llm_params.get("temperature", 0)
+
+    @property
+    def prompt_version(self) -> str:
+        """Hash of the agent's source (its PROMPTS and the code around them), so editing a prompt invalidates its cache."""
+        cls = type(self)
+        if "_prompt_version" not in cls.__dict__:
+            digest = hashlib.sha256()
+            for klass in cls.__mro__:
+                if klass is BaseAgent or not issubclass(klass, BaseAgent):
+                    continue
+                try:
+                    digest.update(inspect.getsource(klass).encode("utf-8"))
+                except (OSError, TypeError):
+                    digest.update(klass.__qualname__.encode("utf-8"))
+            cls._prompt_version = digest.hexdigest()[:12]
+        return cls._prompt_version
+
+    async def run(self, input_data: Any, **kwargs: Any) -> Dict[str, Any]:
+        """
+        `process` behind the agent response cache; callers use this instead of `process`.
+
+        Args:
+            input_data (Any): The primary input data, passed to `process`.
+            **kwargs (Any): Agent-specific parameters, part of the cache key.
+
+        Returns:
+            Dict[str, Any]: The (possibly cached) result of `process`.
+        """
+        # Callbacks (e.g. on_section) don't change the result, so they stay out of the key
+        key_kwargs = {k: v for k, v in kwargs.items() if not callable(v)}
+        return await agent_response_cache.run(
+            self, {"input": input_data, "kwargs": key_kwargs},
+            lambda: self.process(input_data, **kwargs)
+        )
 
     @abstractmethod
     async def process(self, input_data: Any, **kwargs: Any) -> Dict[str, Any]:
@@ -27,3 +138,166 @@ class BaseAgent(ABC):
             Dict[str, Any]: Structured dictionary corresponding to the agent's specialized output format.
         """
         pass
+
+    async def _invoke(
+        self, chain: Any, inputs: Dict[str, Any],
+        on_token: Callable[[str], Awaitable[None]] | None = None
+    ) -> Any:
+        """
+        Invoke a LangChain runnable once the model's rate-limit scheduler grants it, inside a
+        registry in-flight slot, and record its token usage on the current agent timing.
+
+        A 429 from the provider pauses the scheduler for the Retry-After period and the call
+        is queued again (up to LLM_RATE_LIMIT_RETRIES times) instead of surfacing to the
+        agent-level retries. A stream cut off after its first token is not replayed, since
+        `on_token` has already seen that text; the error is raised instead.
+
+        Args:
+            chain (Any): Prompt | LLM runnable to execute.
+            inputs (Dict[str, Any]): Template variables for the prompt.
+            on_token (Callable, optional): When given, the completion is streamed and each text
+                chunk is passed to it as it arrives.
+
+        Returns:
+            Any: The LLM response message (the merged chunks when streaming).
+        """
+        model = self.llm_registry.model_for(self.name)
+        scheduler = self.llm_registry.scheduler(model)
+        estimate = estimate_tokens(inputs, settings.LLM_OUTPUT_TOKEN_ESTIMATE)
+        for attempt in range(settings.LLM_RATE_LIMIT_RETRIES + 1):
+            await scheduler.acquire(estimate)
+            streamed = False
+            try:
+                async with self.llm_registry.slot(model):
+                    if on_token is None:
+                        response = await chain.ainvoke(inputs)
+                    else:
+                        response = None
+                        async for chunk in chain.astream(inputs):
+                            response = chunk if response is None else response + chunk
+                            if chunk.content:
+                                streamed = True
+                                await on_token(chunk.content)
+            except Exception as e:
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    raise
+                if streamed or attempt == settings.LLM_RATE_LIMIT_RETRIES:
+                    scheduler.backoff(delay)
+                    raise
+                # A rejected request doesn't count against the provider's token budget
+                scheduler.settle(estimate, 0)
+                scheduler.backoff(delay)
+                print(f"Agent {self.name} rate limited, retrying in {delay:.1f}s")
+                continue
+            scheduler.settle(estimate, usage_tokens(response)[2] or estimate)
+            record_usage(response)
+            return response
+
+    async def _stream_json(
+        self, chain: Any, inputs: Dict[str, Any], section_depth: int,
+        on_section: Callable[[Path, Any], Awaitable[None]] | None = None
+    ) -> Tuple[Any, Dict[str, Any] | None]:
+        """
+        Stream a JSON completion, handing each section to `on_section` as soon as it closes.
+
+        Args:
+            chain (Any): Prompt | LLM runnable to execute.
+            inputs (Dict[str, Any]): Template variables for the prompt.
+            section_depth (int): Path length of a section, e.g. 2 for `summary.en`.
+            on_section (Callable, optional): Awaited with (path, value) for every completed section.
+
+        Returns:
+            Tuple[Any, Dict[str, Any] | None]: The response message (None if the stream broke) and the
+                parsed object. When the output stops early (max_tokens, a dropped connection) the
+                sections completed so far are returned with `"truncated": True`; None when the output
+                could not be parsed incrementally, so the caller can fall back to its own parsing.
+        """
+        parser = IncrementalJSONParser()
+        broken = False
+
+        async def on_token(text: str) -> None:
+            nonlocal broken
+            if broken:
+                return
+            try:
+                events = parser.feed(text)
+            except ValueError:
+                broken = True  # not JSON we can follow; the caller re-parses the full text
+                return
+            for path, value in events:
+                if len(path) == section_depth and on_section is not None:
+                    await on_section(path, value)
+
+        try:
+            response = await self._invoke(chain, inputs, on_token=on_token)
+        except Exception:
+            partial = parser.partial(include_open_string=True)
+            if broken or not isinstance(partial, dict):
+                raise
+            print(f"Agent {self.name} stream broke off, keeping the completed sections")
+            return None, {**partial, "truncated": True}
+
+        if broken:
+            return response, None
+        if parser.done:
+            return response, parser.value if isinstance(parser.value, dict) else None
+        partial = parser.partial(include_open_string=True)
+        return response, {**partial, "truncated": True} if isinstance(partial, dict) else None
+
+    async def _parse_output(
+        self, response: Any, schema: OutputSchema, fallback: Dict[str, Any],
+        parsed: Dict[str, Any] | None = None
+    ) -> Dict[str, Any]:
+        """
+        Turn an LLM response into a dict matching `schema`.
+
+        Strict parsing is tried first, then a local repair of common breakages (fences,
+        trailing commas, unclosed brackets). Only when both fail, or the shape is wrong, is
+        the model asked once to fix its own output (AGENT_JSON_REASK). Each outcome is
+        counted per agent in `parse_stats`.
+
+        Args:
+            response (Any): The LLM response message (None if a stream broke off).
+            schema (OutputSchema): Keys and types the agent's callers rely on.
+            fallback (Dict[str, Any]): Returned when nothing usable comes back; must carry an "error" key.
+            parsed (Dict[str, Any], optional): Already parsed by `_stream_json`; truncated results pass through.
+
+        Returns:
+            Dict[str, Any]: The validated response, or `fallback`.
+        """
+        if parsed is not None and parsed.get("truncated"):
+            return parsed
+        text = getattr(response, "content", "") or ""
+        data, repaired, problems = parsed, False, []
+        if data is None:
+            try:
+                data, repaired = parse_json(text)
+            except ValueError as e:
+                problems = [f"invalid JSON ({e})"]
+        if not problems:
+            problems = schema.validate(data)
+        if not problems:
+            parse_stats.count(self.name, "repaired" if repaired else "parsed")
+            return data
+
+        if settings.AGENT_JSON_REASK and text:
+            fixed = await self._reask_json(text, schema, problems)
+            if fixed is not None:
+                parse_stats.count(self.name, "reasked")
+                return fixed
+        parse_stats.count(self.name, "failed")
+        print(f"Agent {self.name} output unusable ({'; '.join(problems)}). Raw output: {text[:500]}")
+        return dict(fallback)
+
+    async def _reask_json(self, text: str, schema: OutputSchema, problems: list[str]) -> Dict[str, Any] | None:
+        """Ask the model to correct its own output; None when the answer is still unusable."""
+        try:
+            response = await self._invoke(REASK_PROMPT | self.llm, {
+                "keys": schema.describe(), "problems": "; ".join(problems), "output": text
+            })
+            data, _ = parse_json(response.content)
+        except Exception as e:
+            print(f"Agent {self.name} JSON re-ask failed: {e}")
+            return None
+        return None if schema.validate(data) else data
@@ -1,21 +1,34 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import settings
+from .llm_client import LLMClientRegistry
+from .structured_output import OutputSchema
+
+# Cultural domains shared by the categorization and fused analysis prompts
+CATEGORIES = ["Folk Medicine", "Agriculture", "Folklore & Stories", "Cultural Rituals", "Life Advice & Ethics"]
+
+CATEGORIZATION_SCHEMA = OutputSchema(required={"category": str})
 
 class CategorizationAgent(BaseAgent):
     """
     Agent responsible for classifying cultural text into predefined taxonomic domains.
     """
-    def __init__(self) -> None:
+    PROMPTS = {
+        "main": """
+            Categorize the following text into a cultural domain.
+            Text: {text}
+            
+            Choose ONE from: {categories}.
+            
+            Return the output in STRICT JSON format with the following key:
+            - category (str)
+            
+            Do not add any markdown formatting.
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
         """Initialize the CategorizationAgent with the LLM instance."""
-        super().__init__("categorization")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile", 
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
+        super().__init__("categorization", llm_registry, temperature=0)
 
     async def process(self, input_data: str, **kwargs: Any) -> Dict[str, Any]:
         """
@@ -28,30 +41,13 @@ class CategorizationAgent(BaseAgent):
         Returns:
             Dict[str, Any]: A dictionary containing the established 'category'.
         """
-        prompt = ChatPromptTemplate.from_template(
-            """
-            Categorize the following text into a cultural domain.
-            Text: {text}
-            
-            Choose ONE from: "Folk Medicine", "Agriculture", "Folklore & Stories", "Cultural Rituals", "Life Advice & Ethics".
-            
-            Return the output in STRICT JSON format with the following key:
-            - category (str)
-            
-            Do not add any markdown formatting.
-            """
-        )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({"text": input_data})
-        
-        import json
-        try:
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            return json.loads(content.strip())
-        except:
-             return {"category": "Uncategorized", "raw": response.content}
+        chain = self.chain("main")
+        response = await self._invoke(chain, {
+            "text": input_data,
+            "categories": ", ".join(f'"{c}"' for c in CATEGORIES)
+        })
 
+        return await self._parse_output(
+            response, CATEGORIZATION_SCHEMA,
+            {"category": "Uncategorized", "error": "JSON parse error", "raw": response.content}
+        )
@@ -0,0 +1,134 @@
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, TypeVar
+
+from config import settings
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+# Sentence ends (Latin and Devanagari punctuation) and line breaks between transcript segments
+_BOUNDARY = re.compile(r"(?<=[.!?।॥])\s+|\s*\n\s*")
+
+def chunk_chars() -> int:
+    """Characters per chunk for AGENT_CHUNK_TOKENS (~4 characters per token, as in the rate limiter)."""
+    return max(1, settings.AGENT_CHUNK_TOKENS) * 4
+
+def split_text(text: str, max_chars: int | None = None) -> List[str]:
+    """
+    Split text into chunks of at most `max_chars` on segment and sentence boundaries.
+
+    Text that fits is returned as a single chunk. A sentence longer than a chunk is split
+    on whitespace, and only a single unbroken run of characters is cut mid-way.
+
+    Args:
+        text (str): Transcript or any other prose.
+        max_chars (int, optional): Chunk size, defaults to AGENT_CHUNK_TOKENS worth of characters.
+
+    Returns:
+        List[str]: The chunks in order; joining them with spaces restores the text up to whitespace.
+    """
+    max_chars = max_chars or chunk_chars()
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces: List[str] = []
+    for sentence in filter(None, _BOUNDARY.split(text)):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            pieces.append(sentence)
+
+    return pack(pieces, max_chars)
+
+def pack(pieces: Iterable[str], max_chars: int, separator: str = " ") -> List[str]:
+    """Greedily join consecutive pieces into chunks of at most `max_chars` (a longer piece stays whole)."""
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+async def map_chunks(chunks: Iterable[S], compute: Callable[[S], Awaitable[T]]) -> List[T]:
+    """Run `compute` on every chunk concurrently; the rate limiter and registry slots bound the fan-out."""
+    return list(await asyncio.gather(*[compute(chunk) for chunk in chunks]))
+
+def _failed(result: Dict[str, Any]) -> bool:
+    return "error" in result or "fallback" in result
+
+def _score(result: Dict[str, Any]) -> float:
+    try:
+        return float(result.get("score", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def concat_translations(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Join per-chunk {"en": ...} translations in order; any failed or truncated chunk marks the whole."""
+    merged: Dict[str, Any] = {"en": " ".join(str(r.get("en", "")).strip() for r in results).strip()}
+    for key in ("error", "truncated"):
+        if any(key in r for r in results):
+            merged[key] = next(r[key] for r in results if key in r)
+    return merged
+
+def _merge_values(first: Any, other: Any) -> Any:
+    if first in (None, "", "unknown", [], {}):
+        return other
+    if isinstance(first, list) and isinstance(other, list):
+        return first + [item for item in other if item not in first]
+    if isinstance(first, dict) and isinstance(other, dict):
+        merged = dict(first)
+        for key, value in other.items():
+            merged[key] = _merge_values(merged[key], value) if key in merged else value
+        return merged
+    return first
+
+def merge_extractions(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk extraction entities into one record.
+
+    Scalars (title, region, coordinates) come from the first chunk that has them, detail
+    lists are unioned in order, and distinct cultural contexts are joined. Chunks that
+    failed to parse are skipped unless every chunk failed.
+    """
+    parsed = [r for r in results if not _failed(r)] or results[:1]
+    merged: Dict[str, Any] = {}
+    for result in parsed:
+        for key, value in result.items():
+            merged[key] = _merge_values(merged[key], value) if key in merged else value
+
+    contexts = [r["cultural_context"] for r in parsed if isinstance(r.get("cultural_context"), str) and r["cultural_context"]]
+    if len(contexts) > 1:
+        merged["cultural_context"] = " ".join(dict.fromkeys(contexts))
+    return merged
+
+def max_scores(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce per-chunk verification results to the riskiest one.
+
+    The highest-scoring chunk supplies score and reasoning, and flags from every chunk are
+    kept (deduplicated). A chunk that failed to parse marks the result with its error, so
+    it is neither cached nor checkpointed.
+    """
+    scored = [r for r in results if not _failed(r)] or results
+    worst = dict(max(scored, key=_score))
+    flags: List[Any] = []
+    for result in results:
+        for flag in result.get("flags", []) if isinstance(result.get("flags"), list) else []:
+            if flag not in flags:
+                flags.append(flag)
+    worst["flags"] = flags
+    if len(results) > 1:
+        worst["chunks"] = len(results)
+    failed = next((r for r in results if _failed(r)), None)
+    if failed is not None and not _failed(worst):
+        worst["error"] = failed.get("error") or failed.get("reasoning", "chunk failed")
+    return worst
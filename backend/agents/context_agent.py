@@ -1,21 +1,18 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import settings
+from .llm_client import LLMClientRegistry
 
 class ContextAgent(BaseAgent):
     """
     Agent dedicated to deducing implicit cultural significance and psychological angles from a text.
     """
-    def __init__(self) -> None:
+    PROMPTS = {
+        "main": "Analyze the cultural context and significance of the following text: {text}",
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
         """Initialize the ContextAgent with a configured LLM."""
-        super().__init__("context")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
+        super().__init__("context", llm_registry, temperature=0)
 
     async def process(self, input_data: str, **kwargs: Any) -> Dict[str, Any]:
         """
@@ -28,9 +25,6 @@ class ContextAgent(BaseAgent):
         Returns:
             Dict[str, Any]: Encapsulated string analysis under the 'context_analysis' key.
         """
-        prompt = ChatPromptTemplate.from_template(
-            "Analyze the cultural context and significance of the following text: {text}"
-        )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({"text": input_data})
+        chain = self.chain("main")
+        response = await self._invoke(chain, {"text": input_data})
         return {"context_analysis": response.content}
@@ -1,36 +1,67 @@
-from typing import Dict, Any
-from .base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
+from typing import Dict, Any, Awaitable, Callable
 from config import settings
+from .base_agent import BaseAgent
+from .json_stream import Path
+from .llm_client import LLMClientRegistry
+from .structured_output import OutputSchema
+
+# Each section keyed by "en", "hi" and "native"
+EDUCATION_SCHEMA = OutputSchema(required={"summary": dict, "lesson": dict, "quiz_questions": dict}, optional={"moral": dict})
+# english_only output, also the shape of each EducationRenditionAgent rendition
+ENGLISH_EDUCATION_SCHEMA = OutputSchema(required={"summary": str, "lesson": str, "quiz_questions": list}, optional={"moral": str})
 
 class EducationAgent(BaseAgent):
     """
     Pedagogical agent transforming raw cultural transcripts into structured learning experiences.
-    """
-    def __init__(self) -> None:
-        """Initialize the EducationAgent enforcing a slightly higher temperature for creative narrative style."""
-        super().__init__("education")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile", 
-            temperature=0.7,
-            api_key=settings.GROQ_API_KEY
-        )
 
-    async def process(self, input_data: str, language: str = "en", **kwargs: Any) -> Dict[str, Any]:
-        """
-        Orchestrate the restructuring task using deep conversational prompting strategies.
-
-        Args:
-            input_data (str): The transcribed vocal story to analyze.
-            language (str, optional): Core origin language ensuring targeted instructional language output boundaries.
-            **kwargs (Any): Extensible variable input keyword arguments.
+    By default one completion carries every section in English, Hindi and the native
+    language. With `english_only=True` it returns the English sections alone (flat
+    `{summary, lesson, moral, quiz_questions}`), for EducationRenditionAgent to render
+    into the other languages concurrently.
+    """
+    TRILINGUAL_FORMAT = """Return STRICT JSON only. No markdown, no backticks, no explanatory text before or after.
+Provide all content in English ("en"), Hindi ("hi"), and the original native language ("native").
+If the native language IS English or Hindi, still include it identically under the "native" key.
 
-        Returns:
-            Dict[str, Any]: Comprehensive suite of JSON keys (Summary, Lesson, Moral, Quiz Questions) tailored pedagogically.
-        """
-        prompt = ChatPromptTemplate.from_template(
-            """
+{
+  "summary": { "en": "...", "hi": "...", "native": "..." },
+  "lesson":  { "en": "...", "hi": "...", "native": "..." },
+  "moral":   { "en": "...", "hi": "...", "native": "..." },
+  "quiz_questions": {
+    "en": [
+      {"question": "...", "answer": "..."},
+      {"question": "...", "answer": "..."},
+      {"question": "...", "answer": "..."}
+    ],
+    "hi": [
+      {"question": "...", "answer": "..."},
+      {"question": "...", "answer": "..."},
+      {"question": "...", "answer": "..."}
+    ],
+    "native": [
+      {"question": "...", "answer": "..."},
+      {"question": "...", "answer": "..."},
+      {"question": "...", "answer": "..."}
+    ]
+  }
+}"""
+
+    ENGLISH_FORMAT = """Return STRICT JSON only. No markdown, no backticks, no explanatory text before or after.
+Provide all content in English only.
+
+{
+  "summary": "...",
+  "lesson": "...",
+  "moral": "...",
+  "quiz_questions": [
+    {"question": "...", "answer": "..."},
+    {"question": "...", "answer": "..."},
+    {"question": "...", "answer": "..."}
+  ]
+}"""
+
+    PROMPTS = {
+        "main": """
 You are a cultural preservation educator working on **Heritix**, a platform dedicated to 
 safeguarding living heritage — folk stories, ancestral remedies, oral histories, and 
 time-honoured traditions passed down through generations.
@@ -96,54 +127,46 @@ Use this progression of depth:
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 OUTPUT FORMAT
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Return STRICT JSON only. No markdown, no backticks, no explanatory text before or after.
-Provide all content in English ("en"), Hindi ("hi"), and the original native language ("native").
-If the native language IS English or Hindi, still include it identically under the "native" key.
+{output_format}
+""",
+    }
 
-{{
-  "summary": {{ "en": "...", "hi": "...", "native": "..." }},
-  "lesson":  {{ "en": "...", "hi": "...", "native": "..." }},
-  "moral":   {{ "en": "...", "hi": "...", "native": "..." }},
-  "quiz_questions": {{
-    "en": [
-      {{"question": "...", "answer": "..."}},
-      {{"question": "...", "answer": "..."}},
-      {{"question": "...", "answer": "..."}}
-    ],
-    "hi": [
-      {{"question": "...", "answer": "..."}},
-      {{"question": "...", "answer": "..."}},
-      {{"question": "...", "answer": "..."}}
-    ],
-    "native": [
-      {{"question": "...", "answer": "..."}},
-      {{"question": "...", "answer": "..."}},
-      {{"question": "...", "answer": "..."}}
-    ]
-  }}
-}}
-"""
-        )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({"text": input_data, "language": language})
-        
-        import json
-        import re
-        try:
-            content = response.content.strip()
-            # Strip any markdown code fences (```json ... ``` or ``` ... ```)
-            content = re.sub(r'^```(?:json)?\s*', '', content, flags=re.IGNORECASE)
-            content = re.sub(r'\s*```$', '', content)
-            content = content.strip()
-            return json.loads(content)
-        except json.JSONDecodeError:
-            # Try to extract JSON object via regex as a fallback
-            match = re.search(r'\{.*\}', response.content, re.DOTALL)
-            if match:
-                try:
-                    return json.loads(match.group())
-                except json.JSONDecodeError:
-                    pass
-            print(f"[EducationAgent] JSON parse failed. Raw response: {response.content[:500]}")
-            return {"educational_content": response.content, "error": "JSON parse failed"}
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
+        """Initialize the EducationAgent enforcing a slightly higher temperature for creative narrative style."""
+        super().__init__("education", llm_registry, temperature=0.7)
 
+    async def process(
+        self, input_data: str, language: str = "en",
+        on_section: Callable[[Path, Any], Awaitable[None]] | None = None,
+        english_only: bool = False, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Orchestrate the restructuring task using deep conversational prompting strategies.
+
+        Args:
+            input_data (str): The transcribed vocal story to analyze.
+            language (str, optional): Core origin language ensuring targeted instructional language output boundaries.
+            on_section (Callable, optional): Awaited with e.g. (("summary", "en"), text) as soon as each
+                section/language pair has streamed in; just (("summary",), text) when `english_only`.
+            english_only (bool, optional): Generate the English sections only.
+            **kwargs (Any): Extensible variable input keyword arguments.
+
+        Returns:
+            Dict[str, Any]: Comprehensive suite of JSON keys (Summary, Lesson, Moral, Quiz Questions) tailored pedagogically.
+                A response cut off mid-way keeps its completed sections and is marked `truncated`.
+        """
+        chain = self.chain("main")
+        inputs = {
+            "text": input_data,
+            "language": language,
+            "output_format": self.ENGLISH_FORMAT if english_only else self.TRILINGUAL_FORMAT
+        }
+        if not settings.AGENT_STREAMING:
+            response, data = await self._invoke(chain, inputs), None
+        else:
+            section_depth = 1 if english_only else 2
+            response, data = await self._stream_json(chain, inputs, section_depth=section_depth, on_section=on_section)
+        return await self._parse_output(
+            response, ENGLISH_EDUCATION_SCHEMA if english_only else EDUCATION_SCHEMA,
+            {"educational_content": getattr(response, "content", ""), "error": "JSON parse failed"}, parsed=data
+        )
@@ -0,0 +1,105 @@
+import json
+from typing import Dict, Any, Awaitable, Callable
+from config import settings
+from .base_agent import BaseAgent
+from .json_stream import Path
+from .llm_client import LLMClientRegistry
+from .education_agent import ENGLISH_EDUCATION_SCHEMA
+
+# Sections of the English education content, each rendered into the target language
+EDUCATION_SECTIONS = ("summary", "lesson", "moral", "quiz_questions")
+
+class EducationRenditionAgent(BaseAgent):
+    """
+    Renders finished English educational content into another language.
+
+    Used by the staged education mode: the English sections are generated once and the
+    Hindi and native renditions run concurrently. Rendering is a faithful translation, so
+    it runs at temperature 0 and each language is cached on its own.
+    """
+    PROMPTS = {
+        "main": """
+            You are translating educational content about a piece of cultural heritage.
+            Render the following JSON into the language with code: {target_language}
+
+            {content}
+
+            Keep the meaning, tone and structure. Use natural phrasing for native speakers of that
+            language rather than a word-for-word translation, and keep names of places, people and
+            practices recognisable. Translate every quiz question and answer.
+
+            Return STRICT JSON only with exactly the same keys ("summary", "lesson", "moral",
+            "quiz_questions" as a list of {{"question": "...", "answer": "..."}}).
+            Do not add any markdown formatting.
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
+        """Initialize the EducationRenditionAgent with a deterministic configuration model."""
+        super().__init__("education_rendition", llm_registry, temperature=0)
+
+    async def process(
+        self, input_data: Dict[str, Any], target_language: str = "hi",
+        on_section: Callable[[Path, Any], Awaitable[None]] | None = None, **kwargs: Any
+    ) -> Dict[str, Any]:
+        """
+        Render the English summary, lesson, moral and quiz questions into `target_language`.
+
+        Args:
+            input_data (Dict[str, Any]): English content from EducationAgent with `english_only=True`.
+            target_language (str, optional): Language code to render into.
+            on_section (Callable, optional): Awaited with (("summary",), text) etc. as each section streams in.
+            **kwargs (Any): Extensible variable input keyword arguments.
+
+        Returns:
+            Dict[str, Any]: The same {summary, lesson, moral, quiz_questions} shape in the target language.
+        """
+        chain = self.chain("main")
+        inputs = {
+            "content": json.dumps({k: input_data.get(k) for k in EDUCATION_SECTIONS}, ensure_ascii=False, indent=2),
+            "target_language": target_language
+        }
+        if not settings.AGENT_STREAMING:
+            response, data = await self._invoke(chain, inputs), None
+        else:
+            response, data = await self._stream_json(chain, inputs, section_depth=1, on_section=on_section)
+        return await self._parse_output(
+            response, ENGLISH_EDUCATION_SCHEMA,
+            {"error": "JSON parse failed", "raw_output": getattr(response, "content", "")}, parsed=data
+        )
+
+def rendition_targets(language: str) -> Dict[str, str]:
+    """
+    Renditions the staged mode has to produce, keyed as in the education output.
+
+    A native language of English or Hindi reuses that rendition instead of rendering it twice.
+    """
+    targets = {"hi": "hi"}
+    if language not in ("en", "hi"):
+        targets["native"] = language
+    return targets
+
+def assemble_education(renditions: Dict[str, Dict[str, Any]], language: str) -> Dict[str, Any]:
+    """
+    Merge per-language {summary, lesson, moral, quiz_questions} into the single-call shape
+    ({"summary": {"en", "hi", "native"}, ...}). A failed or truncated rendition marks the whole.
+    """
+    renditions = {**renditions}
+    renditions.setdefault("native", renditions.get(language, {}))
+    assembled: Dict[str, Any] = {
+        section: {key: renditions[key].get(section) for key in ("en", "hi", "native")}
+        for section in EDUCATION_SECTIONS
+    }
+    for key in ("error", "truncated"):
+        if failed := next((r for r in renditions.values() if r.get(key)), None):
+            assembled[key] = failed[key]
+    return assembled
+
+def section_sink(on_section: Callable[[Path, Any], Awaitable[None]] | None, key: str) -> Callable[[Path, Any], Awaitable[None]] | None:
+    """Re-key a rendition's (("summary",), text) sections as (("summary", key), text)."""
+    if on_section is None:
+        return None
+
+    async def sink(path: Path, value: Any) -> None:
+        await on_section((path[0], key, *path[1:]), value)
+    return sink
@@ -1,21 +1,38 @@
 from typing import Dict, Any
 from .base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import settings
+from .chunking import split_text, map_chunks, merge_extractions
+from .llm_client import LLMClientRegistry
+from .structured_output import OutputSchema, OPTIONAL_NUMBER
+
+EXTRACTION_SCHEMA = OutputSchema(
+    required={"title": str, "knowledge_type": str, "details": dict, "cultural_context": str, "region": str},
+    optional={"latitude": OPTIONAL_NUMBER, "longitude": OPTIONAL_NUMBER}
+)
 
 class ExtractionAgent(BaseAgent):
     """
     Knowledge mining agent configured to pull entity artifacts and metadata structures from freeform text.
     """
-    def __init__(self) -> None:
+    PROMPTS = {
+        "main": """
+            Extract key cultural knowledge entities from the following text: {text}
+            
+            Return the output in STRICT JSON format with the following keys:
+            - title (str): A concise, descriptive title for this piece of cultural knowledge (max 6 words).
+            - knowledge_type (str): e.g., "folk_remedy", "ritual", "story", "other"
+            - details (dict): Key details extracted (ingredients, steps, characters, etc.)
+            - cultural_context (str): The cultural significance or context.
+            - region (str): Specific geographic region associated with the cultural knowledge (e.g., "Kerala, India"). If unknown, return "unknown".
+            - latitude (float or null): Estimated precise latitude of the region (e.g. 10.8505). Return null if indeterminable.
+            - longitude (float or null): Estimated precise longitude of the region (e.g. 76.2711). Return null if indeterminable.
+            
+            Do not add any markdown formatting like ```json ... ```. Just the raw JSON string.
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
         """Establish the ExtractionAgent with a deterministic configuration model."""
-        super().__init__("extraction")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
+        super().__init__("extraction", llm_registry, temperature=0)
 
     async def process(self, input_data: str, **kwargs: Any) -> Dict[str, Any]:
         """
@@ -28,34 +45,14 @@ class ExtractionAgent(BaseAgent):
         Returns:
             Dict[str, Any]: Mapped string-value structure housing extracted metadata entities.
         """
-        prompt = ChatPromptTemplate.from_template(
-            """
-            Extract key cultural knowledge entities from the following text: {text}
-            
-            Return the output in STRICT JSON format with the following keys:
-            - title (str): A concise, descriptive title for this piece of cultural knowledge (max 6 words).
-            - knowledge_type (str): e.g., "folk_remedy", "ritual", "story", "other"
-            - details (dict): Key details extracted (ingredients, steps, characters, etc.)
-            - cultural_context (str): The cultural significance or context.
-            - region (str): Specific geographic region associated with the cultural knowledge (e.g., "Kerala, India"). If unknown, return "unknown".
-            - latitude (float or null): Estimated precise latitude of the region (e.g. 10.8505). Return null if indeterminable.
-            - longitude (float or null): Estimated precise longitude of the region (e.g. 76.2711). Return null if indeterminable.
-            
-            Do not add any markdown formatting like ```json ... ```. Just the raw JSON string.
-            """
-        )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({"text": input_data})
-        
-        import json
-        try:
-            # Clean up potential markdown code blocks
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            return json.loads(content.strip())
-        except json.JSONDecodeError:
-            return {"error": "Failed to parse JSON", "raw_output": response.content}
+        chunks = split_text(input_data)
+        if len(chunks) == 1:
+            return await self.extract(input_data)
+        return merge_extractions(await map_chunks(chunks, self.extract))
+
+    async def extract(self, text: str) -> Dict[str, Any]:
+        """Extract entities from one chunk of text in a single LLM call (see `process`)."""
+        chain = self.chain("main")
+        response = await self._invoke(chain, {"text": text})
 
+        return await self._parse_output(response, EXTRACTION_SCHEMA, {"error": "Failed to parse JSON", "raw_output": response.content})
@@ -0,0 +1,162 @@
+import json
+from typing import Any, List, Tuple
+
+Path = Tuple[str | int, ...]
+
+class _Frame:
+    __slots__ = ("kind", "path", "start", "key", "index", "state")
+
+    def __init__(self, kind: str, path: Path, start: int) -> None:
+        self.kind = kind          # "object" | "array"
+        self.path = path
+        self.start = start
+        self.key: str | None = None
+        self.index = 0
+        # object: "key" -> "colon" -> "value" -> "comma"; array: "value" -> "comma"
+        self.state = "key" if kind == "object" else "value"
+
+    def child_path(self) -> Path:
+        return self.path + ((self.key,) if self.kind == "object" else (self.index,))
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document as it streams in and reports every value the moment it closes.
+
+    `feed` returns (path, value) pairs, e.g. (("summary", "en"), "...") as soon as the
+    closing quote of `summary.en` arrives, then (("summary",), {...}) when its object
+    closes. Text before the first `{` or `[` (a markdown fence, a preamble) is skipped.
+    Values are decoded with `json.loads`, so escapes and numbers follow the standard.
+    `partial()` rebuilds what has completed so far when the stream stops early.
+    """
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.pos = 0
+        self.stack: List[_Frame] = []
+        self.started = False
+        self.done = False
+        self.value: Any = None
+        self._in_string = False
+        self._escape = False
+        self._token_start = -1   # start of the string or scalar being read
+        self._scalar = False
+        self._partial: Any = None
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        """Consume the next piece of text; returns the values completed by it, innermost first."""
+        self.buffer += chunk
+        events: List[Tuple[Path, Any]] = []
+        while self.pos < len(self.buffer) and not self.done:
+            char = self.buffer[self.pos]
+            if not self.started:
+                if char in "{[":
+                    self.started = True
+                    self._open(char)
+                self.pos += 1
+            elif self._in_string:
+                self._read_string(char, events)
+                self.pos += 1
+            elif self._scalar:
+                if char in ",}] \t\r\n":
+                    self._scalar = False
+                    self._complete(self.buffer[self._token_start:self.pos], events)
+                    continue  # the delimiter still has to be handled
+                self.pos += 1
+            else:
+                self._read_structure(char, events)
+                self.pos += 1
+        return events
+
+    def _open(self, char: str) -> None:
+        path = self.stack[-1].child_path() if self.stack else ()
+        self.stack.append(_Frame("object" if char == "{" else "array", path, self.pos))
+
+    def _read_string(self, char: str, events: List[Tuple[Path, Any]]) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            text = self.buffer[self._token_start:self.pos + 1]
+            frame = self.stack[-1]
+            if frame.kind == "object" and frame.state == "key":
+                frame.key = json.loads(text)
+                frame.state = "colon"
+            else:
+                self._complete(text, events)
+
+    def _read_structure(self, char: str, events: List[Tuple[Path, Any]]) -> None:
+        frame = self.stack[-1]
+        if char in " \t\r\n":
+            return
+        if char == '"':
+            self._in_string = True
+            self._token_start = self.pos
+        elif char in "{[":
+            self._open(char)
+        elif char in "}]":
+            self.stack.pop()
+            value = json.loads(self.buffer[frame.start:self.pos + 1])
+            self._emit(frame.path, value, events)
+            if self.stack:
+                self.stack[-1].state = "comma"
+            else:
+                self.done = True
+                self.value = value
+        elif char == ":":
+            frame.state = "value"
+        elif char == ",":
+            if frame.kind == "array":
+                frame.index += 1
+                frame.state = "value"
+            else:
+                frame.state = "key"
+        else:
+            self._scalar = True
+            self._token_start = self.pos
+
+    def _complete(self, text: str, events: List[Tuple[Path, Any]]) -> None:
+        frame = self.stack[-1]
+        self._emit(frame.child_path(), json.loads(text), events)
+        frame.state = "comma"
+
+    def _emit(self, path: Path, value: Any, events: List[Tuple[Path, Any]]) -> None:
+        events.append((path, value))
+        self._partial = _assign(self._partial, path, value)
+
+    def partial(self, include_open_string: bool = False) -> Any:
+        """
+        Everything completed so far (the full value once `done`); None before any value closes.
+
+        Args:
+            include_open_string (bool): Also keep the text of a string value cut off mid-way,
+                e.g. the first paragraphs of a translation that hit max_tokens.
+        """
+        if self.done:
+            return self.value
+        frame = self.stack[-1] if self.stack else None
+        if not (include_open_string and self._in_string and frame is not None):
+            return self._partial
+        if frame.kind == "object" and frame.state == "key":
+            return self._partial
+        text = self.buffer[self._token_start:]
+        if self._escape:
+            text = text[:-1]
+        try:
+            value = json.loads(text + '"')
+        except ValueError:
+            return self._partial  # cut inside a \uXXXX escape
+        return _assign(json.loads(json.dumps(self._partial)), frame.child_path(), value)
+
+def _assign(container: Any, path: Path, value: Any) -> Any:
+    if not path:
+        return value
+    head, rest = path[0], path[1:]
+    if isinstance(head, int):
+        container = container if isinstance(container, list) else []
+        container.extend([None] * (head + 1 - len(container)))
+    else:
+        container = container if isinstance(container, dict) else {}
+        container.setdefault(head, None)
+    container[head] = _assign(container[head], rest, value)
+    return container
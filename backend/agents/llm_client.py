@@ -0,0 +1,218 @@
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Dict, Tuple
+import httpx
+from langchain_groq import ChatGroq
+from config import settings
+from .rate_limiter import RateLimitScheduler
+
+# Per-model keys consumed by the registry itself rather than passed to ChatGroq
+REGISTRY_KEYS = ("max_in_flight", "rpm", "tpm")
+
+class LLMClientRegistry:
+    """
+    Hands out ChatGroq clients that share one keep-alive HTTP connection pool.
+
+    Agents ask the registry for a client instead of constructing their own, so every
+    request goes through the same pool and the same in-flight limit. Clients are cached
+    per (model, parameters); models are picked per agent via LLM_AGENT_MODELS and tuned
+    via LLM_MODEL_SETTINGS.
+
+    Each model also gets a RateLimitScheduler enforcing its RPM/TPM budget. The Groq SDK's
+    own retries are off by default (`max_retries=0`) so rate limits are handled once, there.
+    Schedulers live in process memory, so with `processes` > 1 (the API plus separate
+    workers sharing one API key) each process enforces an equal share of the budget.
+    """
+    def __init__(
+        self,
+        api_key: str,
+        default_model: str,
+        agent_models: Dict[str, str] | None = None,
+        model_settings: Dict[str, Dict[str, Any]] | None = None,
+        max_in_flight: int = 16,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        keepalive_expiry: float = 30.0,
+        rpm: int = 0,
+        tpm: int = 0,
+        processes: int = 1,
+        base_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.api_key = api_key
+        self.default_model = default_model
+        self.agent_models = agent_models or {}
+        self.model_settings = model_settings or {}
+        self.max_in_flight = max(1, max_in_flight)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.rpm = rpm
+        self.tpm = tpm
+        self.processes = max(1, processes)
+        self.base_url = base_url
+        self.transport = transport
+        self._schedulers: Dict[str, RateLimitScheduler] = {}
+        self._http_client: httpx.AsyncClient | None = None
+        self._clients: Dict[Tuple, ChatGroq] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._model_slots: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+        self.requests = 0
+
+    @classmethod
+    def from_settings(cls) -> "LLMClientRegistry":
+        return cls(
+            api_key=settings.GROQ_API_KEY,
+            default_model=settings.LLM_DEFAULT_MODEL,
+            agent_models=settings.LLM_AGENT_MODELS,
+            model_settings=settings.LLM_MODEL_SETTINGS,
+            max_in_flight=settings.LLM_MAX_INFLIGHT,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive=settings.LLM_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_KEEPALIVE_SECONDS,
+            rpm=settings.LLM_RPM,
+            tpm=settings.LLM_TPM,
+            processes=settings.LLM_RATE_LIMIT_PROCESSES,
+            base_url=settings.GROQ_BASE_URL,
+        )
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        # Recreated after aclose() so an app restarted in-process gets a fresh pool
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(limits=self.limits, transport=self.transport)
+            self._clients.clear()
+        return self._http_client
+
+    def _bind_loop(self) -> None:
+        # Pooled connections and semaphores belong to one event loop; scripts and tests
+        # that call asyncio.run() repeatedly get a fresh pool per loop
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is self._loop:
+            return
+        if self._loop is not None:
+            self._http_client = None
+            self._clients.clear()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._model_slots.clear()
+        self._loop = loop
+
+    def model_for(self, agent_name: str) -> str:
+        return self.agent_models.get(agent_name, self.default_model)
+
+    def get(self, model: str | None = None, **params: Any) -> ChatGroq:
+        """
+        Return the shared client for a model and parameter set.
+
+        Args:
+            model (str, optional): Groq model name, defaults to LLM_DEFAULT_MODEL.
+            **params (Any): ChatGroq parameters (temperature, max_tokens, ...); they override
+                the model's LLM_MODEL_SETTINGS entry.
+
+        Returns:
+            ChatGroq: Client bound to the shared connection pool.
+        """
+        self._bind_loop()
+        model = model or self.default_model
+        options = {"max_retries": 0}
+        if self.base_url:
+            options["base_url"] = self.base_url
+        options.update((k, v) for k, v in self.model_settings.get(model, {}).items() if k not in REGISTRY_KEYS)
+        options.update(params)
+        http_client = self.http_client
+        key = (model, tuple(sorted((k, repr(v)) for k, v in options.items())))
+        if key not in self._clients:
+            self._clients[key] = ChatGroq(
+                model=model,
+                api_key=self.api_key,
+                http_async_client=http_client,
+                **options
+            )
+        return self._clients[key]
+
+    def for_agent(self, agent_name: str, **params: Any) -> ChatGroq:
+        """Return the client for the model configured for `agent_name`."""
+        return self.get(self.model_for(agent_name), **params)
+
+    def scheduler(self, model: str | None = None) -> RateLimitScheduler:
+        """
+        The RPM/TPM scheduler for `model`; per-model `rpm`/`tpm` settings override LLM_RPM/LLM_TPM.
+
+        Budgets are divided by `processes`, never below one unit, since 0 means unlimited.
+        """
+        model = model or self.default_model
+        if model not in self._schedulers:
+            overrides = self.model_settings.get(model, {})
+            rpm, tpm = (
+                max(1, budget // self.processes) if budget else 0
+                for budget in (overrides.get("rpm", self.rpm), overrides.get("tpm", self.tpm))
+            )
+            self._schedulers[model] = RateLimitScheduler(rpm, tpm)
+        return self._schedulers[model]
+
+    def _model_slot(self, model: str) -> asyncio.Semaphore | None:
+        limit = self.model_settings.get(model, {}).get("max_in_flight")
+        if not limit:
+            return None
+        if model not in self._model_slots:
+            self._model_slots[model] = asyncio.Semaphore(max(1, int(limit)))
+        return self._model_slots[model]
+
+    @asynccontextmanager
+    async def slot(self, model: str | None = None) -> AsyncIterator[None]:
+        """Hold one of the LLM_MAX_INFLIGHT request slots (and the model's own limit, if set)."""
+        self._bind_loop()
+        async with self._slots, self._model_slot(model or self.default_model) or nullcontext():
+            self.in_flight += 1
+            self.requests += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+    async def open_connections(self, count: int = 2) -> int:
+        """
+        Open `count` pooled connections ahead of the first completion, so it skips DNS and TLS setup.
+
+        Uses the models listing, which costs no completion budget. Failures are only logged;
+        the pool then connects lazily as before.
+
+        Returns:
+            int: Connections that answered.
+        """
+        self._bind_loop()
+        url = f"{(self.base_url or 'https://api.groq.com').rstrip('/')}/openai/v1/models"
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        responses = await asyncio.gather(
+            *[self.http_client.get(url, headers=headers) for _ in range(max(0, count))],
+            return_exceptions=True
+        )
+        failures = [r for r in responses if isinstance(r, Exception)]
+        if failures:
+            print(f"LLM connection warm-up failed for {len(failures)} of {len(responses)}: {failures[0]}")
+        return len(responses) - len(failures)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "requests": self.requests,
+            "clients": len(self._clients),
+            "models": sorted({key[0] for key in self._clients}),
+            "schedulers": {model: scheduler.stats() for model, scheduler in self._schedulers.items()},
+        }
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool; called on application shutdown."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._clients.clear()
+
+llm_registry = LLMClientRegistry.from_settings()
@@ -0,0 +1,192 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Used when a 429 carries no usable Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = 2.0
+
+class Priority(IntEnum):
+    """Order in which queued LLM requests are granted; lower goes first."""
+    INTERACTIVE = 0  # a user waiting on a single upload or /agents/process
+    PIPELINE = 1     # queued pipeline jobs without an explicit priority
+    BACKFILL = 2     # bulk reprocessing: batch endpoint, rerun_pipeline.py, update_geo_real.py
+
+# Inherited by every task the caller spawns, so a whole pipeline run shares one priority
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.PIPELINE)
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+@contextmanager
+def llm_priority(level: Priority | str) -> Iterator[Priority]:
+    """Run every LLM request made inside the block at `level` ('interactive', 'pipeline' or 'backfill')."""
+    level = Priority[level.upper()] if isinstance(level, str) else Priority(level)
+    token = _priority.set(level)
+    try:
+        yield level
+    finally:
+        _priority.reset(token)
+
+def estimate_tokens(inputs: Dict[str, Any], output_tokens: int) -> int:
+    """Rough request size for the TPM budget: ~4 characters per prompt token plus the expected output."""
+    prompt_chars = sum(len(str(value)) for value in inputs.values())
+    return prompt_chars // 4 + output_tokens
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """
+    Seconds to wait before retrying, if `error` is a provider rate-limit (HTTP 429) response.
+
+    Returns:
+        float | None: The Retry-After delay (DEFAULT_RETRY_AFTER_SECONDS when the header is
+            missing), or None when the error is not a rate limit.
+    """
+    if getattr(error, "status_code", None) != 429:
+        return None
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return DEFAULT_RETRY_AFTER_SECONDS
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+class TokenBucket:
+    """Budget of `per_minute` units refilled continuously; 0 means unlimited."""
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = max(0, per_minute)
+        self.rate = self.capacity / 60.0
+        self.clock = clock
+        self.available = float(self.capacity)
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` units are available (requests larger than the bucket wait for a full one)."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        needed = min(amount, self.capacity) - self.available
+        return max(0.0, needed / self.rate)
+
+    def consume(self, amount: float) -> None:
+        if self.capacity:
+            self._refill()
+            self.available -= amount
+
+    def refund(self, amount: float) -> None:
+        """Give back (or, when negative, charge) the difference between an estimate and actual usage."""
+        if self.capacity:
+            self._refill()
+            self.available = min(self.capacity, self.available + amount)
+
+class RateLimitScheduler:
+    """
+    Grants outbound LLM requests against requests-per-minute and tokens-per-minute budgets.
+
+    Waiting requests are served strictly by priority, then arrival order, so interactive
+    work never queues behind a backfill. A 429 pauses every request for the provider's
+    Retry-After instead of letting each caller retry on its own.
+    """
+    def __init__(self, rpm: int, tpm: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.blocked_until = 0.0
+        self._waiters: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed: asyncio.Condition | None = None
+        self.granted = 0
+        self.rate_limited = 0
+        self.total_wait = 0.0
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Waiters from a finished event loop can never be woken; start over
+            self._loop = loop
+            self._changed = asyncio.Condition()
+            self._waiters.clear()
+        return self._changed
+
+    def _delay(self, tokens: int) -> float:
+        return max(self.blocked_until - self.clock(), self.requests.delay(1), self.tokens.delay(tokens))
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait until this request is next in line and both budgets allow it, then charge them.
+
+        Args:
+            tokens (int): Estimated tokens for the request; settle() corrects the charge afterwards.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        changed = self._condition()
+        entry = (int(current_priority()), next(self._seq))
+        start = self.clock()
+        async with changed:
+            heapq.heappush(self._waiters, entry)
+            changed.notify_all()  # a higher priority arrival takes over the head of the queue
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry:
+                        timeout = self._delay(tokens)
+                        if timeout <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                changed.notify_all()
+        waited = self.clock() - start
+        self.granted += 1
+        self.total_wait += waited
+        return waited
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the TPM charge once the response reports its real usage."""
+        self.tokens.refund(estimated - actual)
+
+    def backoff(self, seconds: float) -> None:
+        """Hold every queued request for `seconds` after the provider answered 429."""
+        self.rate_limited += 1
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        queued = {level.name.lower(): 0 for level in Priority}
+        for level, _ in self._waiters:
+            queued[Priority(level).name.lower()] += 1
+        return {
+            "queued": queued,
+            "queue_depth": len(self._waiters),
+            "rpm_limit": self.requests.capacity,
+            "tpm_limit": self.tokens.capacity,
+            "rpm_available": round(self.requests.available, 1) if self.requests.capacity else None,
+            "tpm_available": round(self.tokens.available) if self.tokens.capacity else None,
+            "blocked_for_seconds": round(max(0.0, self.blocked_until - self.clock()), 2),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "avg_wait_ms": round(self.total_wait / self.granted * 1000, 1) if self.granted else 0.0,
+        }
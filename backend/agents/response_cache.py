@@ -0,0 +1,182 @@
+import copy
+import hashlib
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+from config import settings
+from db.mongo import db
+
+# Keys agents add to a result when the LLM failed, was cut off, or its output could not be parsed
+UNCACHEABLE_KEYS = ("error", "fallback", "raw", "raw_output", "truncated")
+
+def normalize_input(value: Any) -> Any:
+    """Canonical form of an agent input: NFC text with collapsed whitespace, dicts key-sorted."""
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFC", value).split())
+    if isinstance(value, dict):
+        return {str(k): normalize_input(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize_input(v) for v in value]
+    return value
+
+def hash_input(value: Any) -> str:
+    canonical = json.dumps(normalize_input(value), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def is_cacheable(result: Any) -> bool:
+    if isinstance(result, str):
+        return bool(result)
+    return isinstance(result, dict) and not any(key in result for key in UNCACHEABLE_KEYS)
+
+class AgentResponseCache:
+    """
+    Cache of agent results keyed by (agent, model, prompt version, normalised input hash).
+
+    Entries live in the `agent_cache` collection, expiring after AGENT_CACHE_TTL_HOURS,
+    with a small in-process LRU in front of it. Agents whose output is sampled (temperature
+    above 0) or depends on more than their input (`cacheable = False`) are passed through
+    unless listed in AGENT_CACHE_NONDETERMINISTIC.
+    """
+    def __init__(
+        self,
+        lru_size: int = settings.AGENT_CACHE_LRU_SIZE,
+        ttl_hours: float = settings.AGENT_CACHE_TTL_HOURS,
+        enabled: bool = settings.AGENT_CACHE_ENABLED,
+    ) -> None:
+        self.lru_size = lru_size
+        self.ttl = timedelta(hours=ttl_hours)
+        self.enabled = enabled
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def make_key(agent: str, model: str, prompt_version: str, input_hash: str) -> str:
+        return f"{agent}:{model}:{prompt_version}:{input_hash}"
+
+    def should_cache(self, agent: Any) -> bool:
+        if not self.enabled or not agent.cacheable:
+            return False
+        return agent.deterministic or agent.name in settings.AGENT_CACHE_NONDETERMINISTIC
+
+    def _count(self, name: str, field: str, amount: float = 1) -> None:
+        counters = self._stats.setdefault(name, {"hits": 0, "lru_hits": 0, "misses": 0, "bypassed": 0, "saved_latency_ms": 0.0})
+        counters[field] += amount
+
+    def _remember(self, key: str, entry: dict) -> None:
+        if self.lru_size <= 0:
+            return
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    async def get(self, key: str) -> tuple[dict | None, bool]:
+        """
+        Look up a cached entry.
+
+        Returns:
+            tuple[dict | None, bool]: ({"value", "latency_ms"} or None, whether the LRU answered).
+        """
+        if (entry := self._lru.get(key)) is not None:
+            if entry["expires_at"] > datetime.utcnow():
+                self._lru.move_to_end(key)
+                return entry, True
+            del self._lru[key]
+
+        if db.db is None:
+            return None, False
+        try:
+            doc = await db.db.agent_cache.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        except Exception as e:
+            print(f"Agent cache lookup failed for {key}: {e}")
+            return None, False
+        if not doc:
+            return None, False
+        entry = {"value": doc["value"], "latency_ms": doc.get("latency_ms", 0.0), "expires_at": doc["expires_at"]}
+        self._remember(key, entry)
+        return entry, False
+
+    async def put(self, key: str, agent: str, model: str, prompt_version: str, value: Any, latency_ms: float) -> None:
+        """Store a result; a failing write only costs the next call a miss."""
+        expires_at = datetime.utcnow() + self.ttl
+        self._remember(key, {"value": copy.deepcopy(value), "latency_ms": latency_ms, "expires_at": expires_at})
+        if db.db is None:
+            return
+        try:
+            await db.db.agent_cache.update_one(
+                {"_id": key},
+                {"$set": {
+                    "agent": agent,
+                    "model": model,
+                    "prompt_version": prompt_version,
+                    "value": value,
+                    "latency_ms": latency_ms,
+                    "created_at": datetime.utcnow(),
+                    "expires_at": expires_at
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"Agent cache write failed for {key}: {e}")
+
+    async def run(self, agent: Any, input_data: Any, compute: Callable[[], Awaitable[Any]], scope: str | None = None) -> Any:
+        """
+        Return the cached result for `agent` on `input_data`, or compute and store it.
+
+        Args:
+            agent (BaseAgent): Agent whose name, model and prompt version scope the key.
+            input_data (Any): Everything the prompt is built from (text, payload dict, kwargs).
+            compute (Callable[[], Awaitable[Any]]): Produces the result on a miss.
+            scope (str, optional): Sub-call of the agent being cached, e.g. "disclaimer".
+
+        Returns:
+            Any: The agent result; failures and parse errors are returned but never stored.
+        """
+        name = f"{agent.name}:{scope}" if scope else agent.name
+        if not self.should_cache(agent):
+            self._count(name, "bypassed")
+            return await compute()
+
+        model = agent.llm_registry.model_for(agent.name)
+        key = self.make_key(name, model, agent.prompt_version, hash_input(input_data))
+        entry, from_lru = await self.get(key)
+        if entry is not None:
+            self._count(name, "hits")
+            self._count(name, "lru_hits", from_lru)
+            self._count(name, "saved_latency_ms", entry["latency_ms"])
+            return copy.deepcopy(entry["value"])
+
+        self._count(name, "misses")
+        start = time.perf_counter()
+        result = await compute()
+        if is_cacheable(result):
+            latency_ms = round((time.perf_counter() - start) * 1000, 1)
+            await self.put(key, name, model, agent.prompt_version, result, latency_ms)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and latency saved, overall and per agent."""
+        def summarize(counters: Dict[str, float]) -> Dict[str, Any]:
+            lookups = counters["hits"] + counters["misses"]
+            return {
+                **counters,
+                "saved_latency_ms": round(counters["saved_latency_ms"], 1),
+                "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+        totals = {"hits": 0, "lru_hits": 0, "misses": 0, "bypassed": 0, "saved_latency_ms": 0.0}
+        for counters in self._stats.values():
+            for field, amount in counters.items():
+                totals[field] += amount
+        return {
+            **summarize(totals),
+            "enabled": self.enabled,
+            "lru_entries": len(self._lru),
+            "agents": {name: summarize(counters) for name, counters in sorted(self._stats.items())},
+        }
+
+agent_response_cache = AgentResponseCache()
@@ -0,0 +1,183 @@
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+# Markdown fences the models wrap JSON in despite being told not to
+_FENCE_START = re.compile(r"^\s*```(?:json)?\s*", re.IGNORECASE)
+_FENCE_END = re.compile(r"\s*```\s*$")
+# Python literals that sneak into "JSON" outside of strings
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_PY_LITERAL = re.compile(r"\b(True|False|None)\b")
+
+NUMBER = (int, float)
+OPTIONAL_NUMBER = (int, float, type(None))
+
+@dataclass(frozen=True)
+class OutputSchema:
+    """
+    Shape an agent's JSON response must have.
+
+    `required` and `optional` map keys to the accepted type(s). Numbers given as numeric
+    strings are coerced. `check` adds agent-specific rules and returns problems.
+    """
+    required: Dict[str, Any] = field(default_factory=dict)
+    optional: Dict[str, Any] = field(default_factory=dict)
+    check: Callable[[Dict[str, Any]], List[str]] | None = None
+
+    def describe(self) -> str:
+        """Key list for the re-ask prompt."""
+        lines = [f"- {key} ({self.describe_key(key)})" for key in self.required]
+        lines += [f"- {key} ({self.describe_key(key)}, optional)" for key in self.optional]
+        return "\n".join(lines) or "- any keys"
+
+    def validate(self, data: Any) -> List[str]:
+        """Check (and coerce numeric strings in) `data`; returns the problems found."""
+        if not isinstance(data, dict):
+            return ["response is not a JSON object"]
+        problems = []
+        for key, types in [*self.required.items(), *self.optional.items()]:
+            if key not in data:
+                if key in self.required:
+                    problems.append(f"missing '{key}'")
+                continue
+            data[key] = _coerce(data[key], types)
+            value = data[key]
+            if not isinstance(value, types) or isinstance(value, bool) and bool not in _as_tuple(types):
+                problems.append(f"'{key}' must be {self.describe_key(key)}")
+        if self.check is not None and not problems:
+            problems.extend(self.check(data))
+        return problems
+
+    def describe_key(self, key: str) -> str:
+        types = _as_tuple(self.required.get(key, self.optional.get(key)))
+        return " or ".join("null" if t is type(None) else t.__name__ for t in types)
+
+def _as_tuple(types: Any) -> tuple:
+    return types if isinstance(types, tuple) else (types,)
+
+def _coerce(value: Any, types: Any) -> Any:
+    types = _as_tuple(types)
+    if isinstance(value, str) and float in types and not isinstance(value, types):
+        try:
+            return float(value.strip().rstrip("%"))
+        except ValueError:
+            return value
+    return value
+
+def strip_fences(text: str) -> str:
+    return _FENCE_END.sub("", _FENCE_START.sub("", text.strip())).strip()
+
+def repair_json(text: str) -> str:
+    """
+    Fix the breakages LLMs commonly produce, without another model call.
+
+    Drops fences and text around the JSON, escapes raw newlines inside strings, replaces Python literals, removes trailing commas and closes strings,
+    arrays and objects left open by a cut-off response.
+    """
+    text = strip_fences(text)
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return text
+    text = text[start:]
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    bare = ""  # text outside strings since the last quote, for literal replacement
+
+    def flush_bare() -> None:
+        nonlocal bare
+        out.append(_PY_LITERAL.sub(lambda m: _PY_LITERALS[m.group()], bare))
+        bare = ""
+
+    def drop_trailing_comma() -> None:
+        nonlocal bare
+        stripped = bare.rstrip()
+        if stripped.endswith(","):
+            bare = stripped[:-1]
+
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                char = "\\n"
+            out.append(char)
+            continue
+        if char == '"':
+            flush_bare()
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            bare += char
+        elif char in "}]":
+            drop_trailing_comma()
+            if stack:
+                stack.pop()
+            bare += char
+            if not stack:
+                break  # anything after the top-level value is commentary
+        else:
+            bare += char
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    bare = bare.rstrip()
+    if bare.endswith(":"):
+        bare += " null"
+    drop_trailing_comma()
+    flush_bare()
+    return "".join(out) + "".join(reversed(stack))
+
+def parse_json(text: str) -> Tuple[Any, bool]:
+    """
+    Parse model output as JSON, repairing it locally if needed.
+
+    Returns:
+        Tuple[Any, bool]: (parsed value, whether local repair was needed).
+
+    Raises:
+        ValueError: When even the repaired text is not JSON.
+    """
+    try:
+        return json.loads(strip_fences(text)), False
+    except json.JSONDecodeError:
+        pass
+    return json.loads(repair_json(text)), True
+
+class ParseStats:
+    """Per-agent counts of clean parses, local repairs, re-asks and failures."""
+    FIELDS = ("parsed", "repaired", "reasked", "failed")
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def count(self, agent: str, outcome: str) -> None:
+        counters = self._counts.setdefault(agent, dict.fromkeys(self.FIELDS, 0))
+        counters[outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        def summarize(counters: Dict[str, int]) -> Dict[str, Any]:
+            total = counters["parsed"] + counters["repaired"] + counters["reasked"] + counters["failed"]
+            return {
+                **counters,
+                "responses": total,
+                "failure_rate": round(counters["failed"] / total, 3) if total else 0.0,
+                # Responses that were not clean JSON of the right shape on the first try
+                "malformed_rate": round((total - counters["parsed"]) / total, 3) if total else 0.0,
+            }
+
+        totals = dict.fromkeys(self.FIELDS, 0)
+        for counters in self._counts.values():
+            for name, amount in counters.items():
+                totals[name] += amount
+        return {**summarize(totals), "agents": {name: summarize(c) for name, c in sorted(self._counts.items())}}
+
+parse_stats = ParseStats()
@@ -0,0 +1,63 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, Iterator
+
+@dataclass
+class AgentTiming:
+    """Latency, retry and token accounting for one agent run."""
+    agent: str
+    latency_ms: float = 0.0
+    attempts: int = 0
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    status: str = "success"
+    error: str | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+# Set per agent run; each asyncio task gets its own copy, so concurrent agents don't mix stats
+_current: ContextVar[AgentTiming | None] = ContextVar("agent_timing", default=None)
+
+@contextmanager
+def track(agent: str) -> Iterator[AgentTiming]:
+    """Collect timing, attempts and token usage for everything awaited inside the block."""
+    timing = AgentTiming(agent=agent)
+    token = _current.set(timing)
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        _current.reset(token)
+
+def record_attempt() -> None:
+    """Count one (re)try of the agent being tracked, if any."""
+    if (timing := _current.get()) is not None:
+        timing.attempts += 1
+
+def usage_tokens(message: Any) -> tuple[int, int, int]:
+    """Return (input, output, total) tokens reported on an LLM response; zeros when absent."""
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        input_tokens, output_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        return input_tokens, output_tokens, usage.get("total_tokens", input_tokens + output_tokens)
+    # Older langchain-groq only fills the raw provider payload
+    usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    input_tokens, output_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return input_tokens, output_tokens, usage.get("total_tokens", input_tokens + output_tokens)
+
+def record_usage(message: Any) -> None:
+    """Add the token usage reported on an LLM response to the agent being tracked, if any."""
+    timing = _current.get()
+    if timing is None:
+        return
+    timing.llm_calls += 1
+    input_tokens, output_tokens, total_tokens = usage_tokens(message)
+    timing.input_tokens += input_tokens
+    timing.output_tokens += output_tokens
+    timing.total_tokens += total_tokens
@@ -1,59 +1,85 @@
-from typing import Dict, Any
-from .base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
+from typing import Dict, Any, Awaitable, Callable
 from config import settings
+from .base_agent import BaseAgent
+from .chunking import split_text, map_chunks, concat_translations
+from .json_stream import Path
+from .llm_client import LLMClientRegistry
+from .structured_output import OutputSchema
+
+TRANSLATION_SCHEMA = OutputSchema(required={"en": str})
 
 class TranslationAgent(BaseAgent):
     """
     Multilingual globalization agent executing robust string mappings and corpus transformations.
     """
-    def __init__(self) -> None:
+    PROMPTS = {
+        "main": """
+            Translate the following text into English completely and in full.
+            If the text is already in English, return it exactly as is.
+            Do NOT truncate, summarize, or omit any part of the text.
+            Translate every single sentence from start to finish.
+
+            Text: {text}
+
+            Return the output in STRICT JSON format with the following key:
+            - en (str): The complete, full English translation without any truncation.
+
+            Do not add any markdown formatting.
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
         """Initialize the TranslationAgent focusing on maximized token spaces to manage whole transcriptions."""
-        super().__init__("translation")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0.3,
-            max_tokens=8192,
-            api_key=settings.GROQ_API_KEY
-        )
+        super().__init__("translation", llm_registry, temperature=0.3, max_tokens=8192)
 
-    async def process(self, input_data: str, **kwargs: Any) -> Dict[str, Any]:
+    async def process(
+        self, input_data: str,
+        on_section: Callable[[Path, Any], Awaitable[None]] | None = None, **kwargs: Any
+    ) -> Dict[str, Any]:
         """
         Migrates any native string context linearly towards standardized English structural formatting.
 
         Args:
             input_data (str): Unknown cultural language string corpus.
+            on_section (Callable, optional): Awaited with (("en",), text) once the translation has streamed in.
             **kwargs (Any): Extensible variable parameters for general base compatibility.
 
         Returns:
-            Dict[str, Any]: English mapped dictionary returning the comprehensive corpus.
+            Dict[str, Any]: English mapped dictionary returning the comprehensive corpus. When
+                the output hits max_tokens, the text translated so far is kept and marked `truncated`.
         """
-        prompt = ChatPromptTemplate.from_template(
-            """
-            Translate the following text into English completely and in full.
-            If the text is already in English, return it exactly as is.
-            Do NOT truncate, summarize, or omit any part of the text.
-            Translate every single sentence from start to finish.
+        chunks = split_text(input_data)
+        if len(chunks) == 1:
+            return await self.translate(input_data, on_section)
 
-            Text: {text}
+        # Long transcripts are translated chunk by chunk; the text translated so far is
+        # reported each time the next chunk in order completes
+        done: Dict[int, Dict[str, Any]] = {}
+        reported = 0
 
-            Return the output in STRICT JSON format with the following key:
-            - en (str): The complete, full English translation without any truncation.
+        async def translate_chunk(item: tuple[int, str]) -> Dict[str, Any]:
+            index, chunk = item
+            nonlocal reported
+            done[index] = await self.translate(chunk)
+            if on_section is not None and index == reported:
+                while reported in done:
+                    reported += 1
+                await on_section(("en",), concat_translations([done[i] for i in range(reported)])["en"])
+            return done[index]
 
-            Do not add any markdown formatting.
-            """
+        return concat_translations(await map_chunks(enumerate(chunks), translate_chunk))
+
+    async def translate(
+        self, text: str, on_section: Callable[[Path, Any], Awaitable[None]] | None = None
+    ) -> Dict[str, Any]:
+        """Translate one chunk of text in a single LLM call (see `process`)."""
+        chain = self.chain("main")
+        if not settings.AGENT_STREAMING:
+            response, data = await self._invoke(chain, {"text": text}), None
+        else:
+            response, data = await self._stream_json(chain, {"text": text}, section_depth=1, on_section=on_section)
+        return await self._parse_output(
+            response, TRANSLATION_SCHEMA,
+            {"en": "Translation failed", "error": "JSON parse error", "raw": getattr(response, "content", "")},
+            parsed=data
         )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({"text": input_data})
-        
-        import json
-        try:
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            return json.loads(content.strip())
-        except:
-            return {"en": "Translation failed", "error": "JSON parse error", "raw": response.content}
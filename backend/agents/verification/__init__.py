@@ -1,11 +1,11 @@
-import json
 from tenacity import retry, stop_after_attempt, wait_exponential
-from typing import Dict, Any
+from typing import Dict, Any, List
 from ..base_agent import BaseAgent
+from ..structured_output import OutputSchema, NUMBER
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
 async def _run_with_retry(agent: BaseAgent, input_data: Any) -> Dict[str, Any]:
-    return await agent.process(input_data)
+    return await agent.run(input_data)
 
 async def execute_with_fallback(agent: BaseAgent, input_data: Any) -> Dict[str, Any]:
     try:
@@ -16,24 +16,33 @@ async def execute_with_fallback(agent: BaseAgent, input_data: Any) -> Dict[str,
             "agent": agent.name, 
             "score": 50, 
             "flags": [], 
-            "reasoning": f"Agent {agent.name} failed: {str(e)}"
+            "reasoning": f"Agent {agent.name} failed: {str(e)}",
+            # Lets the pipeline avoid checkpointing a neutral placeholder score
+            "fallback": True
         }
 
-def safe_parse_json(content: str, default_agent_name: str) -> Dict[str, Any]:
-    content = content.strip()
-    if content.startswith("```json"):
-        content = content[7:]
-    elif content.startswith("```"):
-        content = content[3:]
-    if content.endswith("```"):
-        content = content[:-3]
-    try:
-        return json.loads(content.strip())
-    except json.JSONDecodeError as e:
-        print(f"JSON Parsing failed for {default_agent_name}: {e}\nRaw output: {content}")
-        return {
-            "agent": default_agent_name,
-            "score": 50,
-            "flags": [],
-            "reasoning": "Failed to parse JSON output"
-        }
+# Keys the per-agent `normalize` methods need; flags and extra keys are coerced or defaulted there
+VERIFICATION_SCHEMA = OutputSchema(required={"score": NUMBER}, optional={"reasoning": str})
+
+def parse_failure(agent_name: str) -> Dict[str, Any]:
+    """Neutral result for a verification response that could not be parsed."""
+    return {
+        "agent": agent_name,
+        "score": 50,
+        "flags": [],
+        "reasoning": "Failed to parse JSON output",
+        # Keeps the neutral placeholder out of checkpoints and the response cache
+        "error": "Failed to parse JSON output"
+    }
+
+def standardize_flags(flags: Any, agent_name: str) -> List[Dict[str, str]]:
+    """Coerce LLM flag output into [{"agent", "issue", "segment"}], dropping malformed entries."""
+    standardized = []
+    for flag in flags if isinstance(flags, list) else []:
+        if isinstance(flag, dict):
+            standardized.append({
+                "agent": agent_name,
+                "issue": flag.get("issue", "Unspecified issue"),
+                "segment": flag.get("segment", "")
+            })
+    return standardized
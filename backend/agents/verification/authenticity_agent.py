@@ -1,22 +1,11 @@
 from typing import Dict, Any
 from ..base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import settings
-from . import safe_parse_json
+from ..llm_client import LLMClientRegistry
+from . import VERIFICATION_SCHEMA, parse_failure, standardize_flags
 
 class AuthenticityAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("authenticity")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
-
-    async def process(self, input_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
-        prompt = ChatPromptTemplate.from_template(
-            """
+    PROMPTS = {
+        "main": """
             Evaluate whether the following cultural knowledge is genuine oral tradition vs fabricated, anachronistic, or internally inconsistent.
             
             Instructions:
@@ -43,17 +32,25 @@ class AuthenticityAgent(BaseAgent):
             - reasoning (str, explanation for the score)
             
             Do not include any other text except the JSON.
-            """
-        )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
+        super().__init__("authenticity", llm_registry, temperature=0)
+
+    async def process(self, input_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        chain = self.chain("main")
+        response = await self._invoke(chain, {
             "transcript": input_data.get("transcript", ""),
             "category": input_data.get("category", ""),
             "context_analysis": str(input_data.get("context_analysis", "")),
             "region": input_data.get("region", "")
         })
         
-        result = safe_parse_json(response.content, self.name)
+        return self.normalize(await self._parse_output(response, VERIFICATION_SCHEMA, parse_failure(self.name)))
+
+    def normalize(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Invert the authenticity score into a risk score (shared with fused verification)."""
         result["agent"] = self.name
         
         raw_authenticity = float(result.get("score", 50))
@@ -62,15 +59,6 @@ class AuthenticityAgent(BaseAgent):
         result["raw_authenticity"] = raw_authenticity
         result["score"] = 100.0 - raw_authenticity
         
-        # Standardize flags format
-        standardized_flags = []
-        for flag in result.get("flags", []):
-            if isinstance(flag, dict):
-                standardized_flags.append({
-                    "agent": self.name,
-                    "issue": flag.get("issue", "Unspecified issue"),
-                    "segment": flag.get("segment", "")
-                })
-        result["flags"] = standardized_flags
+        result["flags"] = standardize_flags(result.get("flags", []), self.name)
         
         return result
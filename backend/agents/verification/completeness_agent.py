@@ -1,22 +1,11 @@
 from typing import Dict, Any
 from ..base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import settings
-from . import safe_parse_json
+from ..llm_client import LLMClientRegistry
+from . import VERIFICATION_SCHEMA, parse_failure, standardize_flags
 
 class CompletenessAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("completeness")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
-
-    async def process(self, input_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
-        prompt = ChatPromptTemplate.from_template(
-            """
+    PROMPTS = {
+        "main": """
             Evaluate whether the knowledge entry is actionable and coherent on its own, or a fragment that would mislead without more context.
             
             Instructions:
@@ -42,16 +31,24 @@ class CompletenessAgent(BaseAgent):
             - reasoning (str, explanation for the score)
             
             Do not include any other text except the JSON.
-            """
-        )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
+        super().__init__("completeness", llm_registry, temperature=0)
+
+    async def process(self, input_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        chain = self.chain("main")
+        response = await self._invoke(chain, {
             "transcript": input_data.get("transcript", ""),
             "category": input_data.get("category", ""),
             "context_analysis": str(input_data.get("context_analysis", ""))
         })
         
-        result = safe_parse_json(response.content, self.name)
+        return self.normalize(await self._parse_output(response, VERIFICATION_SCHEMA, parse_failure(self.name)))
+
+    def normalize(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply defaults and flag formatting to a raw completeness response (shared with fused verification)."""
         result["agent"] = self.name
         
         if "score" not in result:
@@ -59,14 +56,6 @@ class CompletenessAgent(BaseAgent):
         if "missing_elements" not in result:
             result["missing_elements"] = []
             
-        standardized_flags = []
-        for flag in result.get("flags", []):
-            if isinstance(flag, dict):
-                standardized_flags.append({
-                    "agent": self.name,
-                    "issue": flag.get("issue", "Unspecified issue"),
-                    "segment": flag.get("segment", "")
-                })
-        result["flags"] = standardized_flags
+        result["flags"] = standardize_flags(result.get("flags", []), self.name)
         
         return result
@@ -1,10 +1,15 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from ..base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
+from ..llm_client import LLMClientRegistry
+from ..chunking import split_text, pack, map_chunks, max_scores
+from . import VERIFICATION_SCHEMA, parse_failure, standardize_flags
 from config import settings
-from . import safe_parse_json
 from db.mongo import db
+from services.embedding_index import embedding_index
+from services import minhash
+
+# Characters of existing-record summaries compared in one LLM call
+DUPLICATION_BATCH_CHARS = 4000
 
 class DuplicationAgent(BaseAgent):
     """
@@ -12,15 +17,70 @@ class DuplicationAgent(BaseAgent):
 
     Extracts core conversational entities as a fingerprint and compares them against 
     existing categorical MongoDB records, restricting redundancy inside the archives.
+
+    With DUPLICATION_MODE=embedding the transcript is instead searched in the local
+    embedding index of its category: clearly unique and clearly duplicate records are
+    decided by cosine similarity alone, and only borderline candidates reach the LLM.
+    Categories with nothing indexed yet (e.g. before `rebuild`) use the LLM comparison.
+    In both modes, re-uploads of a recording already in the archive are caught first by
+    their MinHash signature, without any model.
     """
-    def __init__(self) -> None:
+    # The verdict depends on the archive at the time of the call, not just the input
+    cacheable = False
+
+    PROMPTS = {
+        "fingerprint": """
+            Generate a compact semantic fingerprint for the following cultural knowledge transcript.
+            Extract 3-5 key themes, entities, or concepts as a comma-separated string.
+            
+            Knowledge text:
+            {transcript}
+            
+            Do not include any other text, just the comma-separated string.
+            """,
+        "compare": """
+            Evaluate if the incoming cultural knowledge is a semantic near-duplicate of any existing archive entries.
+            If any match exceeds 80% semantic similarity, flag it as a duplicate and include the matching knowledge_id.
+            
+            Incoming Fingerprint:
+            {fingerprint}
+            
+            Incoming Transcript Extract:
+            {transcript_snippet}
+            
+            Existing Records Summaries:
+            {existing_summaries}
+            
+            Return the result in STRICT JSON format with the following keys:
+            - score (float 0-100, where 0 = completely unique, 100 = exact duplicate)
+            - flags (list of objects, each containing: {{"issue": "description", "segment": "the matching knowledge_id that it duplicates"}})
+            - reasoning (str, explanation for the score and any matches)
+            
+            Do not include any other text except the JSON.
+            """,
+        "compare_candidates": """
+            Evaluate if the incoming cultural knowledge is a semantic near-duplicate of any of the candidate archive entries.
+            The candidates were found by embedding search; their similarity to the incoming transcript is given (0-1).
+            Flag a candidate only if it records the same story, practice or knowledge, not merely the same topic.
+            
+            Incoming Transcript Extract:
+            {transcript_snippet}
+            
+            Candidate Records:
+            {candidate_summaries}
+            
+            Return the result in STRICT JSON format with the following keys:
+            - score (float 0-100, where 0 = completely unique, 100 = exact duplicate)
+            - flags (list of objects, each containing: {{"issue": "description", "segment": "the matching knowledge_id that it duplicates"}})
+            - reasoning (str, explanation for the score and any matches)
+            
+            Do not include any other text except the JSON.
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
         """Initializes the deduplication structural check against LLaMA3."""
-        super().__init__("duplication")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
+        super().__init__("duplication", llm_registry, temperature=0)
 
     async def process(self, input_data: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
         """
@@ -33,28 +93,154 @@ class DuplicationAgent(BaseAgent):
         Returns:
             Dict[str, Any]: Redundancy risk evaluation mapping duplicated records.
         """
+        reupload = await self.match_reuploads(input_data)
+        if reupload is not None:
+            return reupload
+
+        if await self.uses_embedding_index(input_data):
+            return await self.process_embedding(input_data)
+
         transcript = input_data.get("transcript", "")
-        category = input_data.get("category", "")
-        region = input_data.get("region", "")
-        knowledge_id = input_data.get("knowledge_id", "")
+
+        # 1. Load comparable records first; no LLM call is needed if there are none
+        existing_summaries_text, skipped = await self.find_candidates(input_data)
+        if skipped is not None:
+            return skipped
         
-        # 1. Generate semantic fingerprint
-        fingerprint_prompt = ChatPromptTemplate.from_template(
-            """
-            Generate a compact semantic fingerprint for the following cultural knowledge transcript.
-            Extract 3-5 key themes, entities, or concepts as a comma-separated string.
-            
-            Knowledge text:
-            {transcript}
-            
-            Do not include any other text, just the comma-separated string.
-            """
+        # 2. Generate semantic fingerprint (per chunk for long transcripts)
+        fingerprint_chain = self.chain("fingerprint")
+
+        async def fingerprint_chunk(chunk: str) -> str:
+            fingerprint_res = await self._invoke(fingerprint_chain, {"transcript": chunk})
+            return fingerprint_res.content.strip()
+
+        fingerprints = await map_chunks(split_text(transcript), fingerprint_chunk)
+        fingerprint = ", ".join(dict.fromkeys(fingerprints))
+        
+        # 3. Compare with fingerprint using LLM, one batch of existing records per call
+        compare_chain = self.chain("compare")
+
+        async def compare_batch(existing_summaries: str) -> Dict[str, Any]:
+            compare_res = await self._invoke(compare_chain, {
+                "fingerprint": fingerprint,
+                "transcript_snippet": transcript[:500], # limit context
+                "existing_summaries": existing_summaries
+            })
+            return await self._parse_output(compare_res, VERIFICATION_SCHEMA, parse_failure(self.name))
+
+        # Whole records per batch, so an ID is never separated from its summary
+        batches = pack(existing_summaries_text.split("\n"), DUPLICATION_BATCH_CHARS, "\n")
+        return self.normalize(max_scores(await map_chunks(batches, compare_batch)))
+
+    async def match_reuploads(self, input_data: Dict[str, Any]) -> Dict[str, Any] | None:
+        """Final result when the transcript's MinHash signature matches existing records, else None."""
+        matches = await minhash.find_near_duplicates(input_data.get("transcript", ""), exclude_id=input_data.get("knowledge_id"))
+        if not matches:
+            return None
+        return self.normalize({
+            "score": round(matches[0][1] * 100, 1),
+            "flags": [
+                {"issue": f"Re-upload of an existing record ({similarity:.0%} of word shingles shared)", "segment": knowledge_id}
+                for knowledge_id, similarity in matches
+            ],
+            "reasoning": f"The transcript is a near-exact copy of {len(matches)} existing record(s)."
+        })
+
+    async def uses_embedding_index(self, input_data: Dict[str, Any]) -> bool:
+        """Whether to check with the embedding index: enabled, and the category has indexed records."""
+        return settings.DUPLICATION_MODE == "embedding" and await embedding_index.count(input_data.get("category", "")) > 0
+
+    async def process_embedding(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Embedding-index check: the LLM only compares candidates in the borderline similarity band."""
+        candidates, decided = await self.screen(input_data)
+        if decided is not None:
+            return decided
+
+        summaries = await self._summaries([knowledge_id for knowledge_id, _ in candidates], dict(candidates))
+        if not summaries:
+            return self.normalize({
+                "score": round(candidates[0][1] * 100, 1),
+                "flags": [],
+                "reasoning": "Borderline embedding matches have no extraction data to compare; not flagged."
+            })
+        compare_res = await self._invoke(self.chain("compare_candidates"), {
+            "transcript_snippet": input_data.get("transcript", "")[:500],
+            "candidate_summaries": "\n".join(summaries)
+        })
+        return self.normalize(await self._parse_output(compare_res, VERIFICATION_SCHEMA, parse_failure(self.name)))
+
+    async def screen(self, input_data: Dict[str, Any]) -> Tuple[List[Tuple[str, float]], Dict[str, Any] | None]:
+        """
+        Search the category's embedding index and decide the check where similarity is conclusive.
+
+        Args:
+            input_data (Dict[str, Any]): Verification payload containing category, transcript and knowledge_id.
+
+        Returns:
+            Tuple[List[Tuple[str, float]], Dict[str, Any] | None]: (borderline (knowledge_id, similarity)
+                candidates, None), or ([], final result) when no LLM comparison is needed.
+        """
+        matches = await embedding_index.search(
+            input_data.get("category", ""),
+            input_data.get("transcript", ""),
+            settings.DUPLICATION_TOP_K,
+            exclude_id=input_data.get("knowledge_id")
         )
-        fingerprint_chain = fingerprint_prompt | self.llm
-        fingerprint_res = await fingerprint_chain.ainvoke({"transcript": transcript})
-        fingerprint = fingerprint_res.content.strip()
+        thresholds = embedding_index.thresholds()
+        if not matches or matches[0][1] < thresholds["borderline"]:
+            top = f"{matches[0][1]:.2f}" if matches else "none"
+            return [], self.normalize({
+                "score": 0.0,
+                "flags": [],
+                "reasoning": f"No indexed record in the category is similar (highest cosine similarity: {top})."
+            })
 
-        # 2. Query MongoDB for records in same category 
+        duplicates = [(knowledge_id, similarity) for knowledge_id, similarity in matches if similarity >= thresholds["match"]]
+        if duplicates:
+            return [], self.normalize({
+                "score": round(duplicates[0][1] * 100, 1),
+                "flags": [
+                    {"issue": f"Near-duplicate of an existing record (cosine similarity {similarity:.2f})", "segment": knowledge_id}
+                    for knowledge_id, similarity in duplicates
+                ],
+                "reasoning": f"{len(duplicates)} indexed record(s) are near-identical by embedding similarity."
+            })
+
+        return [m for m in matches if m[1] >= thresholds["borderline"]], None
+
+    async def _summaries(self, knowledge_ids: List[str], similarities: Dict[str, float] | None = None) -> List[str]:
+        """One-line summaries (ID, title, context) from the records' extraction data."""
+        content_cursor = db.db.knowledge_content.find(
+            {"knowledge_id": {"$in": knowledge_ids}},
+            {"knowledge_id": 1, "extraction_data": 1}
+        )
+        contents = await content_cursor.to_list(length=len(knowledge_ids))
+
+        existing_summaries = []
+        for c in contents:
+            ed = c.get("extraction_data", {})
+            if ed and isinstance(ed, dict):
+                summary_text = f"ID: {c['knowledge_id']} - Title: {ed.get('title', '')} - Context: {ed.get('cultural_context', '')}"
+                if similarities is not None:
+                    summary_text += f" - Similarity: {similarities[c['knowledge_id']]:.2f}"
+                existing_summaries.append(summary_text)
+        return existing_summaries
+
+    async def find_candidates(self, input_data: Dict[str, Any]) -> Tuple[str | None, Dict[str, Any] | None]:
+        """
+        Summaries of existing records in the same category to compare against.
+
+        Args:
+            input_data (Dict[str, Any]): Verification payload containing category and knowledge_id.
+
+        Returns:
+            Tuple[str | None, Dict[str, Any] | None]: (summaries text, None), or (None, final result)
+                when there is too little to compare against and the check is skipped.
+        """
+        category = input_data.get("category", "")
+        knowledge_id = input_data.get("knowledge_id", "")
+
+        # Query MongoDB for records in same category 
         cursor = db.db.knowledge.find(
             {"category": category, "_id": {"$ne": knowledge_id}},
             {"_id": 1}
@@ -62,83 +248,33 @@ class DuplicationAgent(BaseAgent):
         matching_docs = await cursor.to_list(length=100) # limit for safety
         
         if len(matching_docs) < 3:
-            return {
+            return None, {
                 "agent": self.name,
                 "score": 0.0,
                 "flags": [],
                 "reasoning": "Fewer than 3 existing records in same category/region. Skipping duplication check."
             }
             
-        matching_ids = [doc["_id"] for doc in matching_docs]
-        
         # Fetch their extraction_data
-        content_cursor = db.db.knowledge_content.find(
-            {"knowledge_id": {"$in": matching_ids}},
-            {"knowledge_id": 1, "extraction_data": 1}
-        )
-        contents = await content_cursor.to_list(length=100)
-        
-        existing_summaries = []
-        for c in contents:
-            ed = c.get("extraction_data", {})
-            if ed and isinstance(ed, dict):
-                summary_text = f"ID: {c['knowledge_id']} - Title: {ed.get('title', '')} - Context: {ed.get('cultural_context', '')}"
-                existing_summaries.append(summary_text)
+        existing_summaries = await self._summaries([doc["_id"] for doc in matching_docs])
                 
         if not existing_summaries:
-            return {
+            return None, {
                 "agent": self.name,
                 "score": 0.0,
                 "flags": [],
                 "reasoning": "No valid existing extraction data found to compare."
             }
 
-        existing_summaries_text = "\n".join(existing_summaries)
-        
-        # 3. Compare with fingerprint using LLM
-        compare_prompt = ChatPromptTemplate.from_template(
-            """
-            Evaluate if the incoming cultural knowledge is a semantic near-duplicate of any existing archive entries.
-            If any match exceeds 80% semantic similarity, flag it as a duplicate and include the matching knowledge_id.
-            
-            Incoming Fingerprint:
-            {fingerprint}
-            
-            Incoming Transcript Extract:
-            {transcript_snippet}
-            
-            Existing Records Summaries:
-            {existing_summaries}
-            
-            Return the result in STRICT JSON format with the following keys:
-            - score (float 0-100, where 0 = completely unique, 100 = exact duplicate)
-            - flags (list of objects, each containing: {{"issue": "description", "segment": "the matching knowledge_id that it duplicates"}})
-            - reasoning (str, explanation for the score and any matches)
-            
-            Do not include any other text except the JSON.
-            """
-        )
-        compare_chain = compare_prompt | self.llm
-        compare_res = await compare_chain.ainvoke({
-            "fingerprint": fingerprint,
-            "transcript_snippet": transcript[:500], # limit context
-            "existing_summaries": existing_summaries_text[:4000] # limit context
-        })
-        
-        result = safe_parse_json(compare_res.content, self.name)
+        return "\n".join(existing_summaries), None
+
+    def normalize(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply defaults and flag formatting to a raw duplication response (shared with fused verification)."""
         result["agent"] = self.name
         
         if "score" not in result:
             result["score"] = 0.0
             
-        standardized_flags = []
-        for flag in result.get("flags", []):
-            if isinstance(flag, dict):
-                standardized_flags.append({
-                    "agent": self.name,
-                    "issue": flag.get("issue", "Unspecified issue"),
-                    "segment": flag.get("segment", "")
-                })
-        result["flags"] = standardized_flags
+        result["flags"] = standardize_flags(result.get("flags", []), self.name)
         
         return result
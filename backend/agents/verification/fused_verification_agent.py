@@ -0,0 +1,153 @@
+from typing import Dict, Any, List
+from ..base_agent import BaseAgent
+from ..llm_client import LLMClientRegistry
+from ..chunking import split_text, pack
+from ..structured_output import OutputSchema
+from . import parse_failure, _run_with_retry
+from .duplication_agent import DUPLICATION_BATCH_CHARS
+
+# Order matches the agent_results list handed to ScoreAggregatorAgent
+VERIFICATION_AGENTS = ("safety", "authenticity", "sensitivity", "completeness", "duplication")
+
+class FusedVerificationAgent(BaseAgent):
+    """
+    Runs all five verification checks in a single structured LLM response.
+
+    Each section of the response is passed through the owning agent's `normalize`,
+    so the results are interchangeable with the per-agent mode and feed the same
+    ScoreAggregatorAgent contract. Sections that are missing or malformed are
+    reported back so the caller can run just those agents individually.
+    """
+    # Includes the archive-dependent duplication check
+    cacheable = False
+
+    PROMPTS = {
+        "main": """
+            Run five independent verification checks on the following cultural knowledge entry.
+
+            Knowledge text:
+            {transcript}
+
+            Category:
+            {category}
+
+            Context Analysis:
+            {context_analysis}
+
+            Region:
+            {region}
+
+            1. "safety": physical safety risks if followed without supervision or medical context.
+               Flag harmful imperative instructions (ingest X, apply directly to wound, burn Y), unverified
+               medical/herbal dosage claims, and content appropriate only under expert supervision. Be especially
+               strict for medicine or remedy categories.
+               score: 0-100 where 100 is highly dangerous and 0 is completely safe.
+            2. "authenticity": genuine oral tradition vs fabricated, anachronistic, or internally inconsistent.
+               Check anachronisms, internal consistency, plausibility for the region and category, and generic
+               content lacking cultural specificity.
+               score: 0-100 where 0 = clearly inauthentic/fabricated and 100 = highly authentic.
+            3. "sensitivity": culturally restricted, sacred, or community-specific content that should not be public.
+               Look for restricted-access language ("only elders", "secret ritual", "initiation only", "women/men only")
+               and typically sacred topics (burial rites, initiation, shamanic practices, ancestor communication).
+               score: 0-100 where 0 = fully public and 100 = must be strictly restricted.
+               Also return access_level: "public" | "community_only" | "restricted".
+            4. "completeness": whether the entry is actionable and coherent on its own. Check remedies with
+               ingredients but no preparation, rituals without occasion or purpose, stories without resolution,
+               and references to undefined external elements. Apply looser rules to stories and folklore.
+               score: 0-100 where 0 = fully complete and 100 = severely incomplete.
+               Also return missing_elements (list of str).
+            5. "duplication": whether the entry is a semantic near-duplicate (over 80% similar) of an existing entry.
+               score: 0-100 where 0 = completely unique and 100 = exact duplicate; put the matching knowledge_id in the flag segment.
+               {duplication_section}
+
+            Return the result in STRICT JSON format with one key per check ("safety", "authenticity",
+            "sensitivity", "completeness", "duplication"), each an object with:
+            - score (float)
+            - flags (list of objects, each containing: {{"issue": "description", "segment": "excerpt that triggered it"}})
+            - reasoning (str, explanation for the score)
+            plus the extra keys listed for sensitivity and completeness.
+
+            Do not include any other text except the JSON.
+            """,
+    }
+
+    def __init__(self, agents: Dict[str, BaseAgent], llm_registry: LLMClientRegistry | None = None) -> None:
+        """
+        Args:
+            agents (Dict[str, BaseAgent]): The per-agent verifiers keyed by name; their
+                `normalize` methods post-process the fused sections.
+            llm_registry (LLMClientRegistry, optional): Source of the LLM client, defaults to the shared registry.
+        """
+        super().__init__("verification", llm_registry, temperature=0)
+        self.agents = agents
+
+    async def process(self, input_data: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        """
+        Score safety, authenticity, sensitivity, completeness and duplication in one call.
+
+        Args:
+            input_data (Dict[str, Any]): Verification payload (transcript, category, context, region, knowledge_id).
+            kwargs (Any): Overflow generic execution params.
+
+        Returns:
+            Dict[str, Any]: {"results": {agent name: normalized result}, "missing": [agent names]}.
+        """
+        # A transcript that needs chunking is left to the per-agent checks, which map-reduce over it
+        if len(split_text(input_data.get("transcript", ""))) > 1:
+            return {"results": {}, "missing": list(VERIFICATION_AGENTS)}
+
+        # Duplication candidates come from MongoDB; when there are too few the check is already decided,
+        # and when they need more than one comparison batch the duplication agent runs on its own.
+        # With the embedding index, similarity decides most records and borderline ones are left to it.
+        # Re-uploads are decided before either.
+        duplication_skipped = await self.agents["duplication"].match_reuploads(input_data)
+        if duplication_skipped is not None:
+            duplication_fused = False
+        elif await self.agents["duplication"].uses_embedding_index(input_data):
+            _, duplication_skipped = await self.agents["duplication"].screen(input_data)
+            duplication_fused = False
+        else:
+            existing_summaries, duplication_skipped = await self.agents["duplication"].find_candidates(input_data)
+            duplication_fused = duplication_skipped is None and len(
+                pack(existing_summaries.split("\n"), DUPLICATION_BATCH_CHARS, "\n")
+            ) == 1
+        duplication_section = (
+            "Existing archive entries to compare against for duplication:\n" + existing_summaries
+            if duplication_fused else
+            "Do not evaluate duplication; omit the \"duplication\" key."
+        )
+
+        chain = self.chain("main")
+        response = await self._invoke(chain, {
+            "transcript": input_data.get("transcript", ""),
+            "category": input_data.get("category", ""),
+            "context_analysis": str(input_data.get("context_analysis", "")),
+            "region": input_data.get("region", ""),
+            "duplication_section": duplication_section
+        })
+        # Sections are validated one by one below, so any object is accepted here
+        parsed = await self._parse_output(response, OutputSchema(), parse_failure(self.name))
+
+        results: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for name in VERIFICATION_AGENTS:
+            if name == "duplication" and duplication_skipped is not None:
+                results[name] = duplication_skipped
+                continue
+            if name == "duplication" and not duplication_fused:
+                missing.append(name)
+                continue
+            section = parsed.get(name)
+            if not isinstance(section, dict) or not isinstance(section.get("score"), (int, float)):
+                missing.append(name)
+                continue
+            results[name] = self.agents[name].normalize(dict(section))
+        return {"results": results, "missing": missing}
+
+async def execute_fused_verification(agent: FusedVerificationAgent, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fused counterpart of execute_with_fallback: after retries, every agent is reported missing."""
+    try:
+        return await _run_with_retry(agent, input_data)
+    except Exception as e:
+        print(f"Fused verification failed after retries, falling back to per-agent mode: {e}")
+        return {"results": {}, "missing": list(VERIFICATION_AGENTS), "fallback": True}
@@ -1,8 +1,7 @@
 from typing import Dict, Any, List
 from ..base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import settings
+from ..llm_client import LLMClientRegistry
+from ..response_cache import agent_response_cache
 
 class ScoreAggregatorAgent(BaseAgent):
     """
@@ -12,14 +11,19 @@ class ScoreAggregatorAgent(BaseAgent):
     and duplication. Generates intelligent disclaimers for medium thresholds and 
     implements unilateral veto rules against extreme danger risks.
     """
-    def __init__(self) -> None:
+    PROMPTS = {
+        "disclaimer": """
+            Write a 2-sentence plain-English disclaimer for a cultural knowledge entry.
+            The entry has been flagged for medium risk due to these specific concerns: {issues}
+
+            Make it professional, objective, and clearly state to consult experts if needed.
+            Do not include quotes around the disclaimer. Just return the 2 sentences.
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
         """Initializes the accumulator logic allocating weighted priority structures."""
-        super().__init__("score_aggregator")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
+        super().__init__("score_aggregator", llm_registry, temperature=0)
         self.weights = {
             "safety": 0.35,
             "authenticity": 0.25,
@@ -40,7 +44,52 @@ class ScoreAggregatorAgent(BaseAgent):
             Dict[str, Any]: Re-mapped aggregation holding the risk_level and total composite indices.
         """
         agent_results: List[Dict[str, Any]] = input_data.get("agent_results", [])
-        
+        scored = self.compute(agent_results)
+        risk_level, veto_triggered, all_flags = scored["risk_level"], scored["veto_triggered"], scored["all_flags"]
+                
+        # Generate disclaimer for medium risk
+        disclaimer = None
+        if risk_level == "medium" and not veto_triggered:
+            # Generate disclaimer based on flags; records raising the same concerns share one
+            flag_issues = sorted({f['issue'] for f in all_flags})
+            disclaimer = await agent_response_cache.run(
+                self, {"issues": flag_issues},
+                lambda: self.write_disclaimer(flag_issues),
+                scope="disclaimer"
+            )
+                
+        return {**scored, "disclaimer": disclaimer}
+
+    async def write_disclaimer(self, flag_issues: List[str]) -> str:
+        """
+        Ask the LLM for a short disclaimer naming the flagged concerns.
+
+        Args:
+            flag_issues (List[str]): Issues raised by the verification agents.
+
+        Returns:
+            str: Two plain-English sentences.
+        """
+        issues_str = "; ".join(flag_issues) if flag_issues else "General potential inaccuracies"
+
+        disclaimer_chain = self.chain("disclaimer")
+        res = await self._invoke(disclaimer_chain, {"issues": issues_str})
+        disclaimer = res.content.strip()
+        # Clean up quotes if LLM added them
+        if disclaimer.startswith('"') and disclaimer.endswith('"'):
+            disclaimer = disclaimer[1:-1]
+        return disclaimer
+
+    def compute(self, agent_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Deterministic part of the aggregation: weighted composite, risk level and veto.
+
+        Args:
+            agent_results (List[Dict[str, Any]]): One result per verification agent.
+
+        Returns:
+            Dict[str, Any]: risk_level, composite_score, agent_scores, all_flags and veto_triggered.
+        """
         # 1. Extract scores and merge flags
         agent_scores = {
             "safety": 0.0,
@@ -72,35 +121,11 @@ class ScoreAggregatorAgent(BaseAgent):
                 risk_level = "medium"
             else:
                 risk_level = "high"
-                
-        # 4. Generate disclaimer for medium risk
-        disclaimer = None
-        if risk_level == "medium" and not veto_triggered:
-            # Generate disclaimer based on flags
-            flag_issues = [f['issue'] for f in all_flags]
-            issues_str = "; ".join(flag_issues) if flag_issues else "General potential inaccuracies"
-            
-            disclaimer_prompt = ChatPromptTemplate.from_template(
-                """
-                Write a 2-sentence plain-English disclaimer for a cultural knowledge entry.
-                The entry has been flagged for medium risk due to these specific concerns: {issues}
-                
-                Make it professional, objective, and clearly state to consult experts if needed.
-                Do not include quotes around the disclaimer. Just return the 2 sentences.
-                """
-            )
-            disclaimer_chain = disclaimer_prompt | self.llm
-            res = await disclaimer_chain.ainvoke({"issues": issues_str})
-            disclaimer = res.content.strip()
-            # Clean up quotes if LLM added them
-            if disclaimer.startswith('"') and disclaimer.endswith('"'):
-                disclaimer = disclaimer[1:-1]
-                
+
         return {
             "risk_level": risk_level,
             "composite_score": round(composite_score, 2),
             "agent_scores": agent_scores,
             "all_flags": all_flags,
-            "disclaimer": disclaimer,
             "veto_triggered": veto_triggered
         }
@@ -1,22 +1,12 @@
 from typing import Dict, Any
 from ..base_agent import BaseAgent
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import settings
-from . import safe_parse_json
+from ..llm_client import LLMClientRegistry
+from ..chunking import split_text, map_chunks, max_scores
+from . import VERIFICATION_SCHEMA, parse_failure, standardize_flags
 
 class SensitivityAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("sensitivity")
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=settings.GROQ_API_KEY
-        )
-
-    async def process(self, input_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
-        prompt = ChatPromptTemplate.from_template(
-            """
+    PROMPTS = {
+        "main": """
             Identify culturally restricted, sacred, or community-specific content that should not be publicly accessible.
             
             Instructions:
@@ -43,17 +33,34 @@ class SensitivityAgent(BaseAgent):
             - reasoning (str, explanation for the score)
             
             Do not include any other text except the JSON.
-            """
-        )
-        chain = prompt | self.llm
-        response = await chain.ainvoke({
+            """,
+    }
+
+    def __init__(self, llm_registry: LLMClientRegistry | None = None) -> None:
+        super().__init__("sensitivity", llm_registry, temperature=0)
+
+    async def process(self, input_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        chunks = split_text(input_data.get("transcript", ""))
+        if len(chunks) == 1:
+            return self.normalize(await self.score(input_data))
+        # Scored chunk by chunk; the riskiest chunk decides
+        chunk_results = await map_chunks(chunks, lambda chunk: self.score({**input_data, "transcript": chunk}))
+        return self.normalize(max_scores(chunk_results))
+
+    async def score(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Score one transcript (chunk) in a single LLM call; the raw response before `normalize`."""
+        chain = self.chain("main")
+        response = await self._invoke(chain, {
             "transcript": input_data.get("transcript", ""),
             "category": input_data.get("category", ""),
             "context_analysis": str(input_data.get("context_analysis", "")),
             "region": input_data.get("region", "")
         })
         
-        result = safe_parse_json(response.content, self.name)
+        return await self._parse_output(response, VERIFICATION_SCHEMA, parse_failure(self.name))
+
+    def normalize(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply defaults, access level and flag formatting (shared with fused verification)."""
         result["agent"] = self.name
         
         if "score" not in result:
@@ -61,14 +68,6 @@ class SensitivityAgent(BaseAgent):
         if "access_level" not in result:
             result["access_level"] = "restricted" if float(result["score"]) > 65 else "community_only" if float(result["score"]) > 35 else "public"
             
-        standardized_flags = []
-        for flag in result.get("flags", []):
-            if isinstance(flag, dict):
-                standardized_flags.append({
-                    "agent": self.name,
-                    "issue": flag.get("issue", "Unspecified issue"),
-                    "segment": flag.get("segment", "")
-                })
-        result["flags"] = standardized_flags
+        result["flags"] = standardize_flags(result.get("flags", []), self.name)
         
         return result
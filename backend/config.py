@@ -12,9 +12,85 @@ class Settings(BaseSettings):
     MONGODB_URL: str
     DB_NAME: str = "heritix_db"
     GROQ_API_KEY: str
+    GROQ_BASE_URL: str | None = None  # e.g. http://localhost:8001 for tests/fake_llm_server.py
     HUGGINGFACEHUB_API_TOKEN: str
     CLERK_SECRET_KEY: SecretStr | None = None
 
+    # Speech-to-text worker pool
+    STT_BACKEND: str = "whisper"  # "whisper" | "faster-whisper"
+    STT_MODEL: str = "small"
+    STT_COMPUTE_TYPE: str = "int8"  # faster-whisper quantisation
+    STT_WORKERS: int = 2
+    STT_WORKER_MAX_MODELS: int = 2  # models each worker keeps loaded; least recently used is unloaded
+    STT_QUEUE_SIZE: int = 16
+    STT_PRELOAD: bool = False
+    STT_STREAMING: bool = True
+    STT_STREAMING_MIN_SECONDS: float = 120.0
+    STT_CHUNK_SECONDS: float = 30.0
+    STT_CHUNK_MAX_SECONDS: float = 45.0
+    STT_CACHE_LRU_SIZE: int = 256
+
+    # Durable pipeline job queue
+    JOB_MAX_CONCURRENCY: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    JOB_RETRY_BASE_SECONDS: int = 30
+    JOB_RETRY_MAX_SECONDS: int = 600
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_EMBEDDED_WORKER: bool = True  # run a worker inside the API process
+
+    # Pipeline scheduling
+    PIPELINE_SPECULATIVE: bool = True  # start education/translation before the verification verdict
+
+    # LLM agents
+    LLM_DEFAULT_MODEL: str = "llama-3.3-70b-versatile"
+    LLM_AGENT_MODELS: dict[str, str] = {}  # agent name -> model, e.g. {"translation": "llama-3.1-8b-instant"}
+    LLM_MODEL_SETTINGS: dict[str, dict] = {}  # model -> ChatGroq params (timeout, max_retries, ...) plus max_in_flight
+    LLM_MAX_INFLIGHT: int = 16  # LLM requests in flight across all agents
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE: int = 10
+    LLM_KEEPALIVE_SECONDS: float = 30.0
+    LLM_RPM: int = 30  # requests per minute per model (Groq free tier for llama-3.3-70b); 0 disables
+    LLM_TPM: int = 12000  # tokens per minute per model; 0 disables
+    LLM_RATE_LIMIT_PROCESSES: int = 1  # processes sharing the API key; each enforces 1/N of LLM_RPM/LLM_TPM
+    LLM_OUTPUT_TOKEN_ESTIMATE: int = 512  # reserved per request until the real usage is known
+    LLM_RATE_LIMIT_RETRIES: int = 5  # 429 retries per call, after waiting out Retry-After
+    AGENT_STREAMING: bool = True  # stream education/translation and save sections as they complete
+    AGENT_WARMUP_ON_STARTUP: bool = False  # build agent chains and open LLM connections at boot
+    AGENT_JSON_REASK: bool = True  # ask the model to fix JSON that local repair could not
+    AGENT_CACHE_ENABLED: bool = True
+    AGENT_CACHE_TTL_HOURS: float = 24 * 7
+    AGENT_CACHE_LRU_SIZE: int = 512
+    AGENT_CACHE_NONDETERMINISTIC: list[str] = []  # agents cached despite temperature > 0, e.g. ["education"]
+    AGENT_CHUNK_TOKENS: int = 3000  # transcripts longer than this are split and map-reduced per chunk
+    AGENT_MAX_CONCURRENCY: int = 5  # agents run_pipeline keeps in flight at once
+    AGENT_ANALYSIS_MODE: str = "separate"  # "separate" | "fused" (extraction+categorization+context in one call)
+    DUPLICATION_MODE: str = "llm"  # "llm" (fingerprint + compare) | "embedding" (local index, LLM for borderline only)
+    DUPLICATION_TOP_K: int = 5
+    DUPLICATION_MINHASH_SIMILARITY: float = 0.8  # estimated word-shingle Jaccard that marks a re-upload; above 1 disables
+    # Cosine similarity per embedder: below "borderline" a record is unique and at "match" or above a
+    # duplicate, both without an LLM call. Hashed n-grams score paraphrases far lower than a sentence model.
+    DUPLICATION_SIMILARITY: dict[str, dict[str, float]] = {
+        "sentence-transformers": {"borderline": 0.75, "match": 0.93},
+        "hashing": {"borderline": 0.45, "match": 0.9},
+    }
+    EMBEDDING_BACKEND: str = "sentence-transformers"  # "sentence-transformers" | "hashing" (no model download)
+    EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    EMBEDDING_INDEX_DIR: str = "data/embeddings"
+    EMBEDDING_CHUNK_CHARS: int = 1000  # transcripts are embedded per chunk and mean-pooled
+    EDUCATION_MODE: str = "single"  # "single" (one trilingual call) | "staged" (English, then hi/native concurrently)
+    VERIFICATION_MODE: str = "per_agent"  # "per_agent" | "fused" (all five checks in one call)
+    AGENT_BATCH_CONCURRENCY: int = 4  # default texts in flight per /agents/process/batch request
+    AGENT_BATCH_MAX_INFLIGHT: int = 8  # texts in flight across all batch requests
+    AGENT_BATCH_MAX_ITEMS: int = 5000
+
+    # Resumable uploads
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    UPLOAD_CHUNK_MAX_BYTES: int = 8 * 1024 * 1024
+    UPLOAD_CHUNK_LEASE_SECONDS: int = 300  # a PUT holding the session longer is presumed dead
+    UPLOAD_FINALIZE_STALE_SECONDS: int = 300  # a finalize this old may be taken over by a retry
+    UPLOAD_CLEANUP_INTERVAL_SECONDS: int = 3600
+
     model_config = SettingsConfigDict(
         env_file=BACKEND_ENV_FILE,
         env_file_encoding="utf-8",
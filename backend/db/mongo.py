@@ -18,10 +18,30 @@ class MongoDB:
             await self.db.knowledge.create_index("detected_language")
             await self.db.knowledge.create_index("processing_status")
             await self.db.knowledge.create_index([("location", "2dsphere")])
+            await self.db.knowledge.create_index("audio_sha256")
+            await self.db.knowledge.create_index("lsh_buckets")
             
             # Knowledge Content Indices
             await self.db.knowledge_content.create_index("knowledge_id", unique=True)
             
+            # STT Cache Indices (entries are keyed by content hash in _id)
+            await self.db.stt_cache.create_index("audio_sha256")
+
+            # Resumable upload sessions expire on their own
+            await self.db.upload_sessions.create_index("expires_at", expireAfterSeconds=0)
+
+            # Job Queue Indices
+            await self.db.jobs.create_index([("status", 1), ("run_at", 1)])
+            await self.db.jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+            await self.db.jobs.create_index("dedupe_key")
+
+            # Agent response cache entries are keyed in _id and expire on their own
+            await self.db.agent_cache.create_index("expires_at", expireAfterSeconds=0)
+            await self.db.agent_cache.create_index("agent")
+
+            # Pipeline checkpoints are keyed by record and stage in _id
+            await self.db.pipeline_checkpoints.create_index("knowledge_id")
+
             # Processing Log Indices
             await self.db.processing_logs.create_index("knowledge_id")
             await self.db.processing_logs.create_index("stage")
@@ -30,6 +50,21 @@ class MongoDB:
         except Exception as e:
             print(f"Error creating indices: {e}")
 
+        # Created on its own so an older server only loses this index, not the ones above
+        try:
+            # At most one queued or running job per dedupe key (partial $in needs MongoDB 6.0+)
+            await self.db.jobs.create_index(
+                "dedupe_key",
+                name="dedupe_key_active",
+                unique=True,
+                partialFilterExpression={"dedupe_key": {"$type": "string"}, "status": {"$in": ["queued", "leased"]}}
+            )
+        except Exception as e:
+            print(
+                f"WARNING: could not create the jobs.dedupe_key_active index ({e}). "
+                "Concurrent enqueues of the same record can start duplicate pipeline runs; MongoDB 6.0+ is required."
+            )
+
     async def close_database_connection(self):
         self.client.close()
         print("Closed MongoDB connection")
@@ -2,11 +2,15 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from db.mongo import db
 from config import settings
-from routers import processing, archive, agents
+from routers import processing, archive, agents, uploads
+from services.stt_service import stt_service
+from services.job_queue import job_queue, JobWorker
+from agents.llm_client import llm_registry
 from fastapi.staticfiles import StaticFiles
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from limiter import limiter
+import asyncio
 import os
 
 # Create uploads directory if it doesn't exist
@@ -15,7 +19,23 @@ os.makedirs("uploads", exist_ok=True)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await db.connect_to_database()
+    if settings.STT_PRELOAD:
+        # Load models in the background so the API keeps booting instantly
+        app.state.stt_warmup = asyncio.create_task(stt_service.warm_up())
+    if settings.AGENT_WARMUP_ON_STARTUP:
+        app.state.agent_warmup = asyncio.create_task(processing.warm_up_agents())
+    worker_stop = asyncio.Event()
+    worker_task = None
+    if settings.JOB_EMBEDDED_WORKER:
+        # Single-process deployments; scaled setups run worker.py instead
+        worker = JobWorker(job_queue, processing.JOB_HANDLERS, processing.JOB_FAILURE_HOOKS)
+        worker_task = asyncio.create_task(worker.run(worker_stop))
     yield
+    worker_stop.set()
+    if worker_task:
+        await worker_task
+    stt_service.shutdown()
+    await llm_registry.aclose()
     await db.close_database_connection()
 
 app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
@@ -24,6 +44,8 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 from fastapi.middleware.cors import CORSMiddleware
 
+# Added before CORS so the early rejection still carries CORS headers
+app.middleware("http")(processing.reject_oversized_upload)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -42,6 +64,7 @@ async def root():
     return {"message": "Welcome to Heritix API"}
 
 app.include_router(processing.router, prefix="/api", tags=["Processing"])
+app.include_router(uploads.router, prefix="/api", tags=["Uploads"])
 app.include_router(archive.router, prefix="/archive", tags=["Archive"])
 app.include_router(agents.router, prefix="/agents", tags=["Agents"])
 
@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+# Ensure the backend directory is in the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.mongo import db
+from models.knowledge_model import ProcessingStatus
+from services.job_queue import job_queue, JobAlreadyRunningError
+from services.checkpoint_service import checkpoint_service
+from routers.processing import PROCESSING_PIPELINE, forced_stages
+
+async def rerun(record_ids: list[str], from_stage: str | None, list_only: bool) -> None:
+    """
+    Re-queue records on the pipeline job queue. Checkpointed stages are reused,
+    except `from_stage` and every stage depending on it.
+    """
+    forced_stages(from_stage)  # Fail fast on a typo before touching the database
+    await db.connect_to_database()
+    try:
+        for record_id in record_ids:
+            doc = await db.db.knowledge.find_one({"_id": record_id}, {"audio_url": 1})
+            if not doc:
+                print(f"Skipping {record_id}: record not found.")
+                continue
+
+            if list_only:
+                stages = await checkpoint_service.list_stages(record_id)
+                print(f"{record_id}: {', '.join(s['stage'] for s in stages) or 'no checkpoints'}")
+                continue
+
+            await db.db.knowledge.update_one(
+                {"_id": record_id},
+                {"$set": {
+                    "processing_status": ProcessingStatus.PROCESSING,
+                    "processing_error": None,
+                    "updated_at": datetime.utcnow()
+                }}
+            )
+            try:
+                job_id = await job_queue.enqueue(
+                    "process_record",
+                    {"record_id": record_id, "audio_url": doc["audio_url"], "from_stage": from_stage, "priority": "backfill"},
+                    dedupe_key=record_id
+                )
+            except JobAlreadyRunningError as e:
+                print(f"Skipped {record_id}: {e}")
+                continue
+            print(f"Queued {record_id} (from stage: {from_stage or 'first incomplete'}) as job {job_id}")
+    finally:
+        await db.close_database_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run the processing pipeline, resuming from checkpoints")
+    parser.add_argument("record_ids", nargs="+", help="Knowledge record IDs")
+    parser.add_argument("--from-stage", choices=PROCESSING_PIPELINE.stage_names,
+                        help="Recompute this stage and every stage depending on it instead of resuming")
+    parser.add_argument("--list", action="store_true", help="Only show the checkpointed stages")
+    args = parser.parse_args()
+    asyncio.run(rerun(args.record_ids, args.from_stage, args.list))
@@ -1,25 +1,154 @@
-from fastapi import APIRouter
-from agents.agent_manager import AgentManager
-from pydantic import BaseModel
-from typing import Dict, Any
+import json
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from agents.agent_manager import get_agent_manager
+from agents.llm_client import llm_registry
+from agents.rate_limiter import llm_priority, Priority
+from agents.response_cache import agent_response_cache
+from agents.structured_output import parse_stats
+from config import settings
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, AsyncIterator, List
 
 router = APIRouter()
-agent_manager = AgentManager()
+agent_manager = get_agent_manager()
 
 class AgentRequest(BaseModel):
     """Pydantic model representing the expected request body for agent processing."""
     text: str
 
+class AgentBatchRequest(BaseModel):
+    """JSON body for /process/batch; NDJSON bodies carry one AgentRequest (or bare string) per line."""
+    texts: List[str]
+
+NDJSON_TYPES = {"application/x-ndjson", "application/jsonl", "application/json-lines"}
+
+def _parse_ndjson_line(line: bytes) -> str | Exception:
+    try:
+        item = json.loads(line)
+        text = item.get("text") if isinstance(item, dict) else item
+        if not isinstance(text, str):
+            raise ValueError("each line must be a JSON string or an object with a 'text' field")
+        return text
+    except ValueError as e:
+        return ValueError(f"Invalid NDJSON line: {e}")
+
+async def _read_ndjson(request: Request) -> List[str | Exception]:
+    """
+    Parse an NDJSON body line by line as it arrives, keeping only the parsed texts.
+
+    The body has to be fully received before the response starts streaming: servers
+    on ASGI spec < 2.4 consume `receive()` to watch for disconnects while a
+    StreamingResponse is running, which would swallow the remaining body chunks.
+    """
+    items: List[str | Exception] = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        items.extend(_parse_ndjson_line(line) for line in lines if line.strip())
+        if len(items) > settings.AGENT_BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Batch limit is {settings.AGENT_BATCH_MAX_ITEMS} texts")
+    if buffer.strip():
+        items.append(_parse_ndjson_line(buffer))
+    return items
+
+async def _iter_items(items: List[str | Exception]) -> AsyncIterator[str | Exception]:
+    for item in items:
+        yield item
+
 @router.post("/process")
-async def process_text_with_agents(request: AgentRequest) -> Dict[str, Any]:
+async def process_text_with_agents(
+    request: AgentRequest,
+    max_concurrency: int = Query(None, ge=1, description="Agents run at once, defaults to AGENT_MAX_CONCURRENCY")
+) -> Dict[str, Any]:
     """
     Process the input text through the agent manager's full pipeline.
 
     Args:
         request (AgentRequest): The text request payload.
+        max_concurrency (int, optional): Concurrency cap for this request.
 
     Returns:
-        Dict[str, Any]: Execution results from all pipeline agents.
+        Dict[str, Any]: Execution results from all pipeline agents, with per-agent `timings`
+            and an `errors` map when some agents failed.
     """
-    results = await agent_manager.run_pipeline(request.text)
+    with llm_priority(Priority.INTERACTIVE):
+        results = await agent_manager.run_pipeline(request.text, max_concurrency=max_concurrency)
     return results
+
+@router.post("/process/batch")
+async def process_batch_with_agents(
+    request: Request,
+    concurrency: int = Query(None, ge=1, description="Texts processed at once, defaults to AGENT_BATCH_CONCURRENCY")
+) -> StreamingResponse:
+    """
+    Process many texts through the agent pipeline in one call.
+
+    Accepts either a JSON body `{"texts": [...]}` or an NDJSON stream (`Content-Type:
+    application/x-ndjson`) with one `{"text": ...}` per line. Results stream back as
+    NDJSON in completion order, each tagged with the `index` of its input.
+
+    Args:
+        request (Request): Request carrying the JSON or NDJSON body.
+        concurrency (int, optional): Texts processed at once, capped by AGENT_BATCH_MAX_INFLIGHT.
+
+    Returns:
+        StreamingResponse: One JSON object per line: {"index", "status", "result" | "error"}.
+
+    Raises:
+        HTTPException: If a JSON body is malformed or the batch exceeds AGENT_BATCH_MAX_ITEMS.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        items = await _read_ndjson(request)
+    else:
+        try:
+            items = AgentBatchRequest.model_validate_json(await request.body()).texts
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    if len(items) > settings.AGENT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch limit is {settings.AGENT_BATCH_MAX_ITEMS} texts")
+
+    concurrency = min(concurrency or settings.AGENT_BATCH_CONCURRENCY, settings.AGENT_BATCH_MAX_INFLIGHT)
+
+    async def stream_results() -> AsyncIterator[bytes]:
+        # Bulk work: queued behind interactive requests for LLM capacity
+        with llm_priority(Priority.BACKFILL):
+            async for item in agent_manager.run_batch(_iter_items(items), concurrency):
+                yield (json.dumps(item, default=str) + "\n").encode("utf-8")
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.get("/llm/stats")
+async def get_llm_stats() -> Dict[str, Any]:
+    """
+    Report the shared LLM client registry's load and each model's rate-limit queue.
+
+    Returns:
+        Dict[str, Any]: Requests in flight and the limit, total requests, the cached clients' models,
+            and per-model `schedulers` (queue depth by priority, RPM/TPM headroom, 429 count, mean wait).
+    """
+    return llm_registry.stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """
+    Report the agent response cache's effectiveness since startup.
+
+    Returns:
+        Dict[str, Any]: Hits (and how many the in-process LRU answered), misses, bypassed calls,
+            hit rate and LLM latency saved, overall and per agent.
+    """
+    return agent_response_cache.stats()
+
+@router.get("/parse/stats")
+async def get_parse_stats() -> Dict[str, Any]:
+    """
+    Report how often agent responses needed fixing before they matched their schema.
+
+    Returns:
+        Dict[str, Any]: Clean parses, local repairs, re-asks and failures with the failure and
+            malformed rates, overall and per agent.
+    """
+    return parse_stats.stats()
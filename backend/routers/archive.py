@@ -4,6 +4,29 @@ from typing import List, Optional
 
 router = APIRouter()
 
+# Fields the archive list endpoints return; internal processing state (audio_prep with
+# server paths, audio_sha256, MinHash signatures, stage timings) stays on the server
+RECORD_LIST_PROJECTION = {
+    "title": 1,
+    "category": 1,
+    "contributor": 1,
+    "transcript": 1,
+    "audio_url": 1,
+    "playback_url": 1,
+    "duration_seconds": 1,
+    "created_at": 1,
+    "processing_status": 1,
+    "detected_language": 1,
+    "location": 1,
+    "latitude": 1,
+    "longitude": 1,
+    "region_name": 1,
+    "state": 1,
+    "city": 1,
+    "distance": 1,
+    "content.education_data.summary": 1,
+}
+
 def serialize_object_ids(data):
     if isinstance(data, dict):
         return {k: serialize_object_ids(v) for k, v in data.items()}
@@ -41,7 +64,8 @@ async def get_all_records() -> List[dict]:
                 "as": "content"
             }
         },
-        {"$unwind": {"path": "$content", "preserveNullAndEmptyArrays": True}}
+        {"$unwind": {"path": "$content", "preserveNullAndEmptyArrays": True}},
+        {"$project": RECORD_LIST_PROJECTION}
     ]
     
     records = await db.db.knowledge.aggregate(pipeline).to_list(100)
@@ -159,6 +183,7 @@ async def search_records(
 
     # 4. Unwind content (optional, but makes access easier)
     pipeline.append({"$unwind": {"path": "$content", "preserveNullAndEmptyArrays": True}})
+    pipeline.append({"$project": RECORD_LIST_PROJECTION})
 
     # 5. Sort and Limit
     pipeline.append({"$sort": {"created_at": -1}})
@@ -238,7 +263,8 @@ async def get_nearby_records(
                 "as": "content"
             }
         },
-        {"$unwind": {"path": "$content", "preserveNullAndEmptyArrays": True}}
+        {"$unwind": {"path": "$content", "preserveNullAndEmptyArrays": True}},
+        {"$project": RECORD_LIST_PROJECTION}
     ]
     
     records = await db.db.knowledge.aggregate(pipeline).to_list(100)
@@ -300,6 +326,8 @@ async def get_record_by_id(record_id: str) -> dict:
         "contributor": metadata.get("contributor"),
         "transcript": metadata.get("transcript"),
         "audio_url": metadata.get("audio_url"),
+        "playback_url": metadata.get("playback_url"),
+        "duration_seconds": metadata.get("duration_seconds"),
         "created_at": metadata.get("created_at"),
         "processing_status": metadata.get("processing_status"),
         # Content fields
@@ -364,7 +392,8 @@ async def get_by_region(
                 "as": "content"
             }
         },
-        {"$unwind": {"path": "$content", "preserveNullAndEmptyArrays": True}}
+        {"$unwind": {"path": "$content", "preserveNullAndEmptyArrays": True}},
+        {"$project": RECORD_LIST_PROJECTION}
     ]
     
     records = await db.db.knowledge.aggregate(pipeline).to_list(50)
@@ -1,10 +1,20 @@
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Form, Depends, Request
-from services.audio_service import audio_service
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends, Request, Query
+from fastapi.responses import JSONResponse
+from services.audio_service import audio_service, UploadTooSmallError, UploadTooLargeError
 from services.stt_service import stt_service
-from agents.agent_manager import AgentManager
+from services.stt_cache import stt_cache, hash_file
+from services.job_queue import job_queue, NonRetryableJobError, JobAlreadyRunningError
+from services.checkpoint_service import checkpoint_service
+from services.pipeline_dag import PipelineDAG, Stage
+from services.embedding_index import embedding_index
+from services import minhash
+from agents.agent_manager import get_agent_manager
+from agents.rate_limiter import llm_priority
 from db.mongo import db
+from config import settings
 from models.knowledge_model import KnowledgeMetadata, KnowledgeContent, ProcessingLog, ProcessingStatus
 from datetime import datetime
+from typing import Any, Dict
 import asyncio
 import uuid
 import os
@@ -19,9 +29,10 @@ from agents.verification.completeness_agent import CompletenessAgent
 from agents.verification.duplication_agent import DuplicationAgent
 from agents.verification.score_aggregator_agent import ScoreAggregatorAgent
 from agents.verification.decision_router_agent import DecisionRouterAgent
+from agents.verification.fused_verification_agent import FusedVerificationAgent, execute_fused_verification
 
 router = APIRouter()
-agent_manager = AgentManager()
+agent_manager = get_agent_manager()
 
 safety_agent = SafetyAgent()
 authenticity_agent = AuthenticityAgent()
@@ -30,10 +41,19 @@ completeness_agent = CompletenessAgent()
 duplication_agent = DuplicationAgent()
 score_aggregator_agent = ScoreAggregatorAgent()
 decision_router_agent = DecisionRouterAgent()
+verification_agents = [safety_agent, authenticity_agent, sensitivity_agent, completeness_agent, duplication_agent]
+fused_verification_agent = FusedVerificationAgent({agent.name: agent for agent in verification_agents})
+
+async def warm_up_agents() -> Dict[str, Any]:
+    """Build every pipeline agent's chains and open LLM connections (AGENT_WARMUP_ON_STARTUP)."""
+    return await agent_manager.warm_up([*verification_agents, score_aggregator_agent, fused_verification_agent])
 
 MIN_FILE_SIZE = 1024
 MAX_FILE_SIZE = 25 * 1024 * 1024 # 25MB
+# Multipart framing (boundary lines, part headers, the small form fields) around the audio
+MULTIPART_OVERHEAD = 64 * 1024
 MIN_TRANSCRIPT_WORDS = 3
+TRANSCRIPT_PREVIEW_CHARS = 100
 
 # Base MIME types (strip codec suffix like ';codecs=opus' before checking)
 ALLOWED_BASE_TYPES = {"audio/mpeg", "audio/wav", "audio/x-wav", "audio/mp4", "audio/webm", "audio/ogg"}
@@ -67,6 +87,72 @@ async def log_stage(knowledge_id: str, stage: str, status: str, error: str = Non
     }
     await db.db.processing_logs.insert_one(log_entry)
 
+async def reject_oversized_upload(request: Request, call_next):
+    """
+    HTTP middleware refusing a single-shot upload whose Content-Length is already over MAX_FILE_SIZE.
+
+    Starlette spools the whole multipart body before /upload-audio runs, so the size check
+    in save_upload_stream only fires once the bytes are on disk. Requests sent without a
+    Content-Length (chunked) still only hit that later check.
+    """
+    if request.method == "POST" and request.url.path == "/api/upload-audio":
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+            return JSONResponse(status_code=413, content={"detail": f"File too large. Limit: {MAX_FILE_SIZE/1024/1024}MB"})
+    return await call_next(request)
+
+async def create_knowledge_records(
+    audio_url: str,
+    filename: str,
+    audio_hash: str,
+    file_size: int,
+    contributor: str,
+    state: str | None,
+    city: str | None,
+    consent: bool,
+    record_id: str | None = None
+) -> str:
+    """
+    Register a stored recording: insert its knowledge metadata, an empty content record and the upload log.
+
+    Shared by the single-shot upload and the resumable upload finalize step. Passing a
+    `record_id` makes the call safe to repeat after an interrupted attempt: documents
+    that already exist are left untouched.
+
+    Returns:
+        str: The knowledge record ID.
+    """
+    record_id = record_id or str(uuid.uuid4())
+    metadata = {
+        "_id": record_id,
+        "title": f"Recording {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
+        "processing_status": ProcessingStatus.UPLOADED,
+        "audio_url": audio_url,
+        "original_filename": filename,
+        "audio_sha256": audio_hash,
+        "file_size": file_size,
+        "contributor": contributor,
+        "state": state,
+        "city": city,
+        "consent": consent,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    inserted = await db.db.knowledge.update_one({"_id": record_id}, {"$setOnInsert": metadata}, upsert=True)
+    if inserted.upserted_id is None:
+        # Registered by an earlier attempt that failed before the session was marked finalized
+        await db.db.knowledge_content.update_one(
+            {"knowledge_id": record_id},
+            {"$setOnInsert": {"processed_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return record_id
+
+    await db.db.knowledge_content.insert_one({"knowledge_id": record_id, "processed_at": datetime.utcnow()})
+
+    await log_stage(record_id, "upload", "success")
+    return record_id
+
 @router.post("/upload-audio")
 @limiter.limit("5/minute")
 async def upload_audio(
@@ -103,39 +189,32 @@ async def upload_audio(
     if base_type not in ALLOWED_BASE_TYPES:
         raise HTTPException(status_code=400, detail=f"Invalid file type '{file.content_type}'. Allowed base types: {sorted(ALLOWED_BASE_TYPES)}")
 
-    content = await file.read()
-    if len(content) < MIN_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="Audio recording is too short or empty. Please record a longer clip and try again.")
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail=f"File too large. Limit: {MAX_FILE_SIZE/1024/1024}MB")
-
-    # 3. Save file with the correct extension derived from MIME type (not the client filename)
+    # 3. Stream the file to disk with the correct extension derived from MIME type (not the client filename)
     #    This is critical so ffmpeg / Whisper can detect the container format.
+    #    Size limits are checked chunk by chunk and the content hash (used by the
+    #    STT cache) is computed on the fly, so the upload is never held in memory.
     ext = MIME_TO_EXT.get(base_type, "webm")
     filename = f"{uuid.uuid4()}_recording.{ext}"
-    audio_url = await audio_service.upload_audio(content, filename)
-    
-    # 4. Create Metadata Record
-    record_id = str(uuid.uuid4())
-    metadata = {
-        "_id": record_id,
-        "title": f"Recording {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
-        "processing_status": ProcessingStatus.UPLOADED,
-        "audio_url": audio_url,
-        "original_filename": filename,
-        "contributor": contributor,
-        "state": state,
-        "city": city,
-        "consent": consent,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
-    }
-    await db.db.knowledge.insert_one(metadata)
-    
-    # 5. Initialize Content Record
-    await db.db.knowledge_content.insert_one({"knowledge_id": record_id, "processed_at": datetime.utcnow()})
+    try:
+        saved = await audio_service.save_upload_stream(file, filename, MIN_FILE_SIZE, MAX_FILE_SIZE)
+    except UploadTooSmallError:
+        raise HTTPException(status_code=400, detail="Audio recording is too short or empty. Please record a longer clip and try again.")
+    except UploadTooLargeError:
+        raise HTTPException(status_code=400, detail=f"File too large. Limit: {MAX_FILE_SIZE/1024/1024}MB")
+    audio_url = saved["audio_url"]
+    audio_hash = saved["sha256"]
     
-    await log_stage(record_id, "upload", "success")
+    # 4. Create Metadata and Content Records
+    record_id = await create_knowledge_records(
+        audio_url=audio_url,
+        filename=filename,
+        audio_hash=audio_hash,
+        file_size=saved["size"],
+        contributor=contributor,
+        state=state,
+        city=city,
+        consent=consent
+    )
 
     return {
         "message": "Upload successful", 
@@ -143,14 +222,62 @@ async def upload_audio(
         "status": "uploaded"
     }
 
-async def process_record_task(record_id: str, audio_url: str) -> dict | None:
+# Stage graph of the processing pipeline. Categorization, context, education and
+# translation only need the transcript, so they run alongside extraction; education
+# and translation run speculatively and are discarded if routing quarantines the record.
+# 'analysis' is the fused extraction+categorization+context call (AGENT_ANALYSIS_MODE=fused)
+# and is a no-op in the default separate mode.
+PROCESSING_PIPELINE = PipelineDAG([
+    Stage("audio_prep"),
+    Stage("stt", depends_on=("audio_prep",)),
+    Stage("analysis", depends_on=("stt",)),
+    Stage("extraction", depends_on=("stt", "analysis")),
+    Stage("categorization", depends_on=("stt", "analysis")),
+    Stage("context", depends_on=("stt", "analysis")),
+    Stage("verification", depends_on=("stt", "extraction", "categorization", "context")),
+    Stage("aggregation", depends_on=("stt", "categorization", "verification")),
+    Stage("routing", depends_on=("aggregation",), opens=lambda routing: routing["continue_pipeline"]),
+    Stage("education", depends_on=("stt",), gated_by="routing"),
+    Stage("translation", depends_on=("stt",), gated_by="routing"),
+])
+
+def forced_stages(from_stage: str | None) -> set[str]:
     """
-    Background Task executing the standard pipeline and updating status iteratively,
+    Stages whose checkpoints are ignored when rerunning from `from_stage`: the stage and its descendants.
+
+    Raises:
+        ValueError: If `from_stage` is not a pipeline stage.
+    """
+    return PROCESSING_PIPELINE.descendants(from_stage) if from_stage else set()
+
+def is_forced(stage: str, forced: set[str]) -> bool:
+    """Whether a checkpoint is ignored; sub-stages like 'verification:safety' follow their parent."""
+    return stage.split(":")[0] in forced
+
+async def process_record_task(
+    record_id: str,
+    audio_url: str,
+    stt_backend: str = None,
+    stt_model: str = None,
+    from_stage: str = None,
+    priority: str = "pipeline"
+) -> dict | None:
+    """
+    Job-queue handler executing the standard pipeline and updating status iteratively,
     orchestrating extraction, contexts, translated models, and agent verification.
+    Errors are re-raised so the queue can retry; see on_processing_job_failed.
+
+    Stages are scheduled from PROCESSING_PIPELINE, each starting as soon as its inputs
+    are ready. Every LLM stage is checkpointed in `pipeline_checkpoints`, so a retry
+    resumes at the first stage without a valid checkpoint instead of starting over.
 
     Args:
         record_id (str): Reference string correlating to the uploaded blob ID.
         audio_url (str): Derived logical routing indicating the filesystem endpoint.
+        stt_backend (str, optional): Per-job STT backend override, defaults to STT_BACKEND.
+        stt_model (str, optional): Per-job STT model size override (e.g. 'tiny' for a preview pass).
+        from_stage (str, optional): Ignore checkpoints for this stage and every stage depending on it.
+        priority (str, optional): LLM scheduling priority: 'interactive', 'pipeline' or 'backfill'.
         
     Returns:
         dict | None: For quarantined pipelines early return dictionary with summary, None for success paths.
@@ -158,125 +285,351 @@ async def process_record_task(record_id: str, audio_url: str) -> dict | None:
     try:
         print(f"Starting pipeline for {record_id}")
         await log_stage(record_id, "pipeline_start", "success")
+        forced = forced_stages(from_stage)
+
+        async def checkpointed(stage: str, inputs: Any, compute, persist: bool = True) -> Any:
+            output, reused = await checkpoint_service.run(
+                record_id, stage, inputs, compute,
+                force=is_forced(stage, forced), persist=persist
+            )
+            if reused:
+                await log_stage(record_id, stage.replace(":", "_"), "reused")
+            return output
         
-        # 1. Locate audio file
+        # Locate audio file
         filename = audio_url.split("/")[-1]
         file_path = os.path.join("uploads", filename)
 
-        # 2. STT — pass the file path directly so Whisper/ffmpeg reads the
-        #    correct container format from the file extension (.webm, .ogg ...)
-        await log_stage(record_id, "stt", "started")
-        stt_result = await stt_service.transcribe(file_path)
-        transcript = stt_result["text"].strip()
-        transcript_word_count = len(transcript.split())
-
-        if not transcript:
-            raise ValueError("No speech detected in the recording. Please speak clearly and try again.")
-        if transcript_word_count < MIN_TRANSCRIPT_WORDS:
-            raise ValueError("The recording was too short to understand. Please record at least a short sentence and try again.")
+        record = await db.db.knowledge.find_one({"_id": record_id}, {"audio_sha256": 1, "audio_prep": 1})
+
+        async def run_audio_prep(results: dict) -> dict:
+            # Decode the upload once into a 16 kHz mono PCM artefact for STT and an
+            # Opus rendition for playback; reruns reuse both.
+            audio_prep = (record or {}).get("audio_prep")
+            if audio_prep and "audio_prep" not in forced and os.path.exists(audio_prep["pcm_path"]):
+                await log_stage(record_id, "audio_prep", "reused")
+                return audio_prep
+
+            await log_stage(record_id, "audio_prep", "started")
+            audio_prep = await audio_service.prepare_audio(file_path)
+            await db.db.knowledge.update_one(
+                {"_id": record_id},
+                {"$set": {
+                    "audio_prep": audio_prep,
+                    "duration_seconds": audio_prep["duration_seconds"],
+                    "playback_url": audio_prep["playback_url"]
+                }}
+            )
+            await log_stage(record_id, "audio_prep", "success")
+            return audio_prep
+
+        async def run_stt(results: dict) -> dict:
+            # Reads the prepared PCM, so the workers never have to run ffmpeg again
+            await log_stage(record_id, "stt", "started")
+            backend, model = stt_service.resolve_options(stt_backend, stt_model)
+            stt_params = stt_service.cache_params(backend, settings.STT_STREAMING)
+            stt_input_path = results["audio_prep"]["pcm_path"]
+
+            audio_hash = (record or {}).get("audio_sha256")
+            if not audio_hash:
+                # Records uploaded before hashing was introduced
+                audio_hash = await asyncio.to_thread(hash_file, file_path)
+                await db.db.knowledge.update_one({"_id": record_id}, {"$set": {"audio_sha256": audio_hash}})
+
+            if "stt" in forced:
+                # A forced re-transcription must not keep serving the old transcript meanwhile
+                await db.db.knowledge.update_one(
+                    {"_id": record_id},
+                    {"$unset": {"transcript": "", "transcript_partial": "", "transcript_progress": ""}}
+                )
+
+            try:
+                # The STT cache doubles as this stage's checkpoint
+                stt_result = None
+                if "stt" not in forced:
+                    stt_result = await stt_cache.get(audio_hash, backend, model, stt_params)
+                if stt_result is not None:
+                    stt_result = {**stt_result, "backend": backend, "model": model}
+                    await log_stage(record_id, "stt", "cache_hit")
+                elif settings.STT_STREAMING:
+                    async def publish_partial(text: str, chunks_done: int, chunks_total: int) -> None:
+                        await db.db.knowledge.update_one(
+                            {"_id": record_id},
+                            {"$set": {
+                                "transcript_partial": text,
+                                "transcript_progress": {"chunks_done": chunks_done, "chunks_total": chunks_total},
+                                "updated_at": datetime.utcnow()
+                            }}
+                        )
+
+                    stt_result = await stt_service.transcribe_stream(
+                        stt_input_path, on_partial=publish_partial, backend=backend, model=model
+                    )
+                    await stt_cache.put(audio_hash, backend, model, stt_params, stt_result)
+                else:
+                    stt_future = await stt_service.submit(stt_input_path, backend=backend, model=model)
+                    stt_result = await stt_future
+                    await stt_cache.put(audio_hash, backend, model, stt_params, stt_result)
+                transcript = stt_result["text"].strip()
+                transcript_word_count = len(transcript.split())
+
+                if not transcript:
+                    raise ValueError("No speech detected in the recording. Please speak clearly and try again.")
+                if transcript_word_count < MIN_TRANSCRIPT_WORDS:
+                    raise ValueError("The recording was too short to understand. Please record at least a short sentence and try again.")
+            except Exception:
+                # Don't leave a stale partial transcript on a record whose STT failed
+                await db.db.knowledge.update_one(
+                    {"_id": record_id}, {"$unset": {"transcript_partial": "", "transcript_progress": ""}}
+                )
+                raise
+
+            language = stt_result["language"]
             
-        language = stt_result["language"]
-        
-        await db.db.knowledge.update_one(
-            {"_id": record_id},
-            {"$set": {"transcript": transcript, "detected_language": language}}
-        )
-        await log_stage(record_id, "stt", "success")
-        
-        # Stage 1: Extraction
-        await log_stage(record_id, "extraction", "started")
-        extraction_data = await agent_manager.process_extraction(transcript)
-        
-        # Extract title and location from extraction_data
-        update_fields = {}
-        region_val = "unknown"
-        if isinstance(extraction_data, dict):
-            if generated_title := extraction_data.get("title"):
-                update_fields["title"] = generated_title
-                
-            region = extraction_data.get("region")
-            if region and region.lower() != "unknown":
-                update_fields["region"] = region
-                region_val = region
-                
-            lat = extraction_data.get("latitude")
-            lng = extraction_data.get("longitude")
-            if lat is not None and lng is not None:
-                try:
-                    update_fields["location"] = {
-                        "type": "Point",
-                        "coordinates": [float(lng), float(lat)]
-                    }
-                except (ValueError, TypeError):
-                    pass
-        
-        # Update metadata fields if present
-        if update_fields:
             await db.db.knowledge.update_one(
                 {"_id": record_id},
-                {"$set": update_fields}
+                {
+                    "$set": {
+                        "transcript": transcript,
+                        "detected_language": language,
+                        "stt_backend": stt_result.get("backend"),
+                        "stt_model": stt_result.get("model"),
+                        # Lets the duplication check find re-uploads of the same story cheaply
+                        **minhash.to_fields(transcript)
+                    },
+                    "$unset": {"transcript_partial": "", "transcript_progress": ""}
+                }
             )
+            await log_stage(record_id, "stt", "success")
+            return {"transcript": transcript, "language": language}
+
+        async def run_analysis(results: dict) -> dict | None:
+            if settings.AGENT_ANALYSIS_MODE != "fused":
+                return None
+            transcript = results["stt"]["transcript"]
+            await log_stage(record_id, "analysis", "started")
+            analysis = await checkpointed(
+                "analysis", {"transcript": transcript},
+                lambda: agent_manager.process_fused_analysis(transcript)
+            )
+            # None means the fused response was invalid; the three stages then run separately
+            await log_stage(record_id, "analysis", "success" if analysis else "fallback")
+            return analysis
+
+        async def run_extraction(results: dict) -> dict:
+            transcript = results["stt"]["transcript"]
+            await log_stage(record_id, "extraction", "started")
+            if results["analysis"]:
+                extraction_data = results["analysis"]["extraction"]
+            else:
+                extraction_data = await checkpointed(
+                    "extraction", {"transcript": transcript},
+                    lambda: agent_manager.process_extraction(transcript)
+                )
             
-        await log_stage(record_id, "extraction", "success")
-
-        # Stage 2: Categorization and Context (Parallelized)
-        await log_stage(record_id, "categorization", "started")
-        await log_stage(record_id, "context", "started")
-        
-        cat_data, context_data = await asyncio.gather(
-            agent_manager.process_categorization(transcript),
-            agent_manager.process_context(transcript)
-        )
-        category = cat_data.get("category", "Uncategorized")
-        
-        # Update metadata (for filtering)
-        await db.db.knowledge.update_one({"_id": record_id}, {"$set": {"category": category}})
-        
-        await log_stage(record_id, "categorization", "success")
-        await log_stage(record_id, "context", "success")
-
-        # --- VERIFICATION LAYER ---
-        verification_input = {
-            "transcript": transcript,
-            "extraction_data": extraction_data,
-            "category": category,
-            "context_analysis": context_data,
-            "region": region_val, 
-            "language": language,
-            "knowledge_id": record_id
-        }
-
-        await log_stage(record_id, "verification_started", "in_progress")
+            # Extract title and location from extraction_data
+            update_fields = {}
+            if isinstance(extraction_data, dict):
+                if generated_title := extraction_data.get("title"):
+                    update_fields["title"] = generated_title
+                    
+                region = extraction_data.get("region")
+                if region and region.lower() != "unknown":
+                    update_fields["region"] = region
+                    
+                lat = extraction_data.get("latitude")
+                lng = extraction_data.get("longitude")
+                if lat is not None and lng is not None:
+                    try:
+                        update_fields["location"] = {
+                            "type": "Point",
+                            "coordinates": [float(lng), float(lat)]
+                        }
+                    except (ValueError, TypeError):
+                        pass
+            
+            # Update metadata fields if present
+            if update_fields:
+                await db.db.knowledge.update_one(
+                    {"_id": record_id},
+                    {"$set": update_fields}
+                )
+                
+            await log_stage(record_id, "extraction", "success")
+            return extraction_data
+
+        async def run_categorization(results: dict) -> dict:
+            transcript = results["stt"]["transcript"]
+            await log_stage(record_id, "categorization", "started")
+            if results["analysis"]:
+                cat_data = results["analysis"]["categorization"]
+            else:
+                cat_data = await checkpointed(
+                    "categorization", {"transcript": transcript},
+                    lambda: agent_manager.process_categorization(transcript)
+                )
+            # Update metadata (for filtering)
+            await db.db.knowledge.update_one(
+                {"_id": record_id}, {"$set": {"category": cat_data.get("category", "Uncategorized")}}
+            )
+            await log_stage(record_id, "categorization", "success")
+            return cat_data
+
+        async def run_context(results: dict) -> dict:
+            transcript = results["stt"]["transcript"]
+            await log_stage(record_id, "context", "started")
+            if results["analysis"]:
+                context_data = results["analysis"]["context"]
+            else:
+                context_data = await checkpointed(
+                    "context", {"transcript": transcript},
+                    lambda: agent_manager.process_context(transcript)
+                )
+            await log_stage(record_id, "context", "success")
+            return context_data
+
+        async def run_verification(results: dict) -> list:
+            extraction_data = results["extraction"]
+            region_val = "unknown"
+            if isinstance(extraction_data, dict):
+                region = extraction_data.get("region")
+                if region and region.lower() != "unknown":
+                    region_val = region
+
+            verification_input = {
+                "transcript": results["stt"]["transcript"],
+                "extraction_data": extraction_data,
+                "category": results["categorization"].get("category", "Uncategorized"),
+                "context_analysis": results["context"],
+                "region": region_val, 
+                "language": results["stt"]["language"],
+                "knowledge_id": record_id
+            }
 
-        safety_r, auth_r, sens_r, comp_r, dup_r = await asyncio.gather(
-            execute_with_fallback(safety_agent, verification_input),
-            execute_with_fallback(authenticity_agent, verification_input),
-            execute_with_fallback(sensitivity_agent, verification_input),
-            execute_with_fallback(completeness_agent, verification_input),
-            execute_with_fallback(duplication_agent, verification_input)
+            await log_stage(record_id, "verification_started", "in_progress")
+
+            # Fused mode asks for all five checks in one call; any check it misses runs on its own
+            fused_results = {}
+            if settings.VERIFICATION_MODE == "fused":
+                fused = await checkpointed(
+                    "verification:fused", verification_input,
+                    lambda: execute_fused_verification(fused_verification_agent, verification_input)
+                )
+                fused_results = fused["results"]
+                if fused["missing"]:
+                    await log_stage(record_id, "verification_fused", "partial", f"Per-agent fallback: {fused['missing']}")
+
+            async def verify(agent) -> dict:
+                if agent.name in fused_results:
+                    return fused_results[agent.name]
+                # One checkpoint per agent: a rerun only repeats the agents that fell back last time
+                return await checkpointed(
+                    f"verification:{agent.name}", verification_input,
+                    lambda: execute_with_fallback(agent, verification_input)
+                )
+
+            agent_results = await asyncio.gather(*[verify(agent) for agent in verification_agents])
+            for agent in verification_agents:
+                await log_stage(record_id, f"verification_{agent.name}_complete", "success")
+            return list(agent_results)
+
+        async def run_aggregation(results: dict) -> dict:
+            aggregation_input = {
+                "agent_results": results["verification"],
+                "transcript": results["stt"]["transcript"],
+                "category": results["categorization"].get("category", "Uncategorized")
+            }
+            aggregation = await checkpointed(
+                "aggregation", aggregation_input,
+                lambda: score_aggregator_agent.process(aggregation_input),
+                persist=not any(r.get("fallback") for r in aggregation_input["agent_results"])
+            )
+            await log_stage(record_id, "verification_aggregated", "success")
+            return aggregation
+
+        async def run_routing(results: dict) -> dict:
+            return await decision_router_agent.process({
+                **results["aggregation"],
+                "knowledge_id": record_id
+            })
+
+        def persist_section(field: str):
+            # Streamed sections (e.g. education_data.summary.en) show up on the record page
+            # before the stage finishes; the final save below overwrites them with the full result
+            async def save(path: tuple, value: Any) -> None:
+                await db.db.knowledge_content.update_one(
+                    {"knowledge_id": record_id},
+                    {"$set": {".".join([field, *map(str, path)]): value}}
+                )
+            return save
+
+        async def run_education(results: dict) -> dict:
+            transcript, language = results["stt"]["transcript"], results["stt"]["language"]
+            await log_stage(record_id, "education", "started")
+            if settings.EDUCATION_MODE == "staged":
+                # English, Hindi and native renditions checkpoint separately, so a failed
+                # rendition reruns alone
+                compute = lambda: agent_manager.process_education_staged(
+                    transcript, language, on_section=persist_section("education_data"),
+                    run_step=lambda step, inputs, run: checkpointed(f"education:{step}", inputs, run)
+                )
+            else:
+                compute = lambda: agent_manager.process_education(
+                    transcript, language, on_section=persist_section("education_data"), mode="single"
+                )
+            edu_result = await checkpointed("education", {"transcript": transcript, "language": language}, compute)
+            await log_stage(record_id, "education", "success")
+            return edu_result
+
+        async def run_translation(results: dict) -> dict:
+            transcript = results["stt"]["transcript"]
+            if results["stt"]["language"] == "en":
+                print(f"Skipping translation for English content (record {record_id})")
+                await log_stage(record_id, "translation", "skipped_en")
+                return {}
+            await log_stage(record_id, "translation", "started")
+            trans_result = await checkpointed(
+                "translation", {"transcript": transcript},
+                lambda: agent_manager.process_translation(transcript, on_section=persist_section("translations"))
+            )
+            await log_stage(record_id, "translation", "success")
+            return trans_result
+
+        # Stage tasks inherit the priority, so every LLM call of this run queues at it
+        with llm_priority(priority):
+            pipeline_run = await PROCESSING_PIPELINE.execute(
+                {
+                    "audio_prep": run_audio_prep,
+                    "stt": run_stt,
+                    "analysis": run_analysis,
+                    "extraction": run_extraction,
+                    "categorization": run_categorization,
+                    "context": run_context,
+                    "verification": run_verification,
+                    "aggregation": run_aggregation,
+                    "routing": run_routing,
+                    "education": run_education,
+                    "translation": run_translation,
+                },
+                speculative=settings.PIPELINE_SPECULATIVE
+            )
+        results = pipeline_run.results
+        aggregation, routing = results["aggregation"], results["routing"]
+        await db.db.knowledge.update_one(
+            {"_id": record_id},
+            {"$set": {"stage_timings": {**pipeline_run.timings, "total": pipeline_run.elapsed}}}
         )
-        
-        await log_stage(record_id, "verification_safety_complete", "success")
-        await log_stage(record_id, "verification_authenticity_complete", "success")
-        await log_stage(record_id, "verification_sensitivity_complete", "success")
-        await log_stage(record_id, "verification_completeness_complete", "success")
-        await log_stage(record_id, "verification_duplication_complete", "success")
-
-        aggregation = await score_aggregator_agent.process({
-            "agent_results": [safety_r, auth_r, sens_r, comp_r, dup_r],
-            "transcript": transcript,
-            "category": category
-        })
-        
-        await log_stage(record_id, "verification_aggregated", "success")
-
-        routing = await decision_router_agent.process({
-            **aggregation,
-            "knowledge_id": record_id
-        })
 
         # Early exit for quarantined entries
         if not routing["continue_pipeline"]:
+            for stage in sorted(pipeline_run.discarded):
+                await log_stage(record_id, stage, "discarded")
+            # Speculative education/translation may already have streamed sections in
+            await db.db.knowledge_content.update_one(
+                {"knowledge_id": record_id},
+                {"$unset": {"education_data": "", "translations": ""}}
+            )
+            await unindex_record(record_id)
             print(f"Pipeline quarantined at verification for {record_id}")
             return {
                 "status": "quarantined",
@@ -284,36 +637,16 @@ async def process_record_task(record_id: str, audio_url: str) -> dict | None:
                 "risk_level": aggregation["risk_level"],
                 "composite_score": aggregation["composite_score"]
             }
-        # --------------------------
-
-        # Stage 3: Education and Translation (Parallelized)
-        await log_stage(record_id, "education", "started")
-        edu_coro = agent_manager.process_education(transcript, language)
-        
-        if language == "en":
-            print(f"Skipping translation for English content (record {record_id})")
-            edu_result = await edu_coro
-            trans_result = {}
-            await log_stage(record_id, "translation", "skipped_en")
-        else:
-            await log_stage(record_id, "translation", "started")
-            edu_result, trans_result = await asyncio.gather(
-                edu_coro,
-                agent_manager.process_translation(transcript)
-            )
-            await log_stage(record_id, "translation", "success")
-            
-        await log_stage(record_id, "education", "success")
 
         # Save all outputs to knowledge_content
         await db.db.knowledge_content.update_one(
             {"knowledge_id": record_id},
             {"$set": {
-                "extraction_data": extraction_data,
-                "categorization": cat_data,
-                "context_data": context_data,
-                "education_data": edu_result,
-                "translations": trans_result,
+                "extraction_data": results["extraction"],
+                "categorization": results["categorization"],
+                "context_data": results["context"],
+                "education_data": results["education"],
+                "translations": results["translation"],
                 "verification_summary": {
                     "risk_level": aggregation["risk_level"],
                     "composite_score": aggregation["composite_score"],
@@ -339,6 +672,11 @@ async def process_record_task(record_id: str, audio_url: str) -> dict | None:
             }}
         )
         
+        if final_status == "quarantined":
+            await unindex_record(record_id)
+        else:
+            await index_record(record_id, results["categorization"].get("category", "Uncategorized"), results["stt"]["transcript"])
+
         if final_status == "flagged":
             await log_stage(record_id, "verification_flagged", "completed")
         else:
@@ -350,39 +688,99 @@ async def process_record_task(record_id: str, audio_url: str) -> dict | None:
     except Exception as e:
         error_message = str(e)
         print(f"Pipeline failed for {record_id}: {e}")
+        await log_stage(record_id, "pipeline", "failed", error_message)
+        # The job queue decides between retrying and marking the record failed.
+        # Validation errors (no speech, unknown STT model...) won't change on retry.
+        if isinstance(e, ValueError):
+            raise NonRetryableJobError(error_message) from e
+        raise
+
+async def index_record(record_id: str, category: str, transcript: str) -> None:
+    """Make a completed record a duplicate-search candidate; a failure only weakens later duplication checks."""
+    if settings.DUPLICATION_MODE != "embedding":
+        return
+    try:
+        await embedding_index.add(record_id, category, transcript)
+    except Exception as e:
+        print(f"Embedding index update failed for {record_id}: {e}")
+
+async def unindex_record(record_id: str) -> None:
+    """Drop a (re)processed record that ended up quarantined from the embedding index."""
+    if settings.DUPLICATION_MODE != "embedding":
+        return
+    try:
+        await embedding_index.remove(record_id)
+    except Exception as e:
+        print(f"Embedding index removal failed for {record_id}: {e}")
+
+async def on_processing_job_failed(job: dict, error: str, will_retry: bool) -> None:
+    """
+    Job-queue failure hook: surface retries on the record, and mark it FAILED once attempts are exhausted.
+
+    Args:
+        job (dict): The failed `process_record` job document.
+        error (str): Error message from the failed attempt.
+        will_retry (bool): Whether the queue rescheduled the job.
+    """
+    record_id = job["payload"]["record_id"]
+    if will_retry:
         await db.db.knowledge.update_one(
             {"_id": record_id},
-            {"$set": {
-                "processing_status": ProcessingStatus.FAILED,
-                "processing_error": error_message,
-                "updated_at": datetime.utcnow()
-            }}
+            {"$set": {"processing_error": f"Retrying after error: {error}", "updated_at": datetime.utcnow()}}
         )
-        await log_stage(record_id, "pipeline", "failed", error_message)
+        await log_stage(record_id, "pipeline", "retry_scheduled", error)
+        return
+
+    await db.db.knowledge.update_one(
+        {"_id": record_id},
+        {"$set": {
+            "processing_status": ProcessingStatus.FAILED,
+            "processing_error": error,
+            "updated_at": datetime.utcnow()
+        }}
+    )
+
+# Job types executed by JobWorker, both embedded in the API and in worker.py
+JOB_HANDLERS = {"process_record": process_record_task}
+JOB_FAILURE_HOOKS = {"process_record": on_processing_job_failed}
 
 @router.post("/process/{record_id}")
 @limiter.limit("5/minute")
 async def start_processing(
     request: Request,
     record_id: str, 
-    background_tasks: BackgroundTasks,
+    stt_backend: str = Query(None, description="STT backend override for this run (e.g. 'faster-whisper')"),
+    stt_model: str = Query(None, description="STT model size override for this run (e.g. 'tiny', 'medium')"),
+    from_stage: str = Query(None, description="Recompute this stage and every stage depending on it, ignoring their checkpoints"),
     user_payload: dict = Depends(verify_token)
 ) -> dict:
     """
     Initiate parallelized background AI processing on a pre-uploaded recorded blob ID.
 
+    The run is persisted on the durable job queue, so it survives API restarts and is
+    picked up by whichever pipeline worker leases it first. Stages with a valid checkpoint
+    are reused unless `from_stage` forces them to run again.
+
     Args:
         request (Request): The request entity context.
         record_id (str): The valid mapped knowledge document ID requested to be processed.
-        background_tasks (BackgroundTasks): Native router structure allowing offloaded processing.
+        stt_backend (str, optional): Per-job STT backend override.
+        stt_model (str, optional): Per-job STT model size override.
+        from_stage (str, optional): Stage to force a rerun from (see PROCESSING_PIPELINE).
         user_payload (dict, optional): Injection resolution verifying active Clerk Auth sessions.
 
     Returns:
-        dict: Confirms successful enqueuing against background handlers.
+        dict: Confirms successful enqueuing, including the queued job ID.
     """
     doc = await db.db.knowledge.find_one({"_id": record_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Record not found")
+
+    try:
+        stt_service.resolve_options(stt_backend, stt_model)
+        forced_stages(from_stage)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
         
     await db.db.knowledge.update_one(
         {"_id": record_id},
@@ -393,9 +791,27 @@ async def start_processing(
         }}
     )
     
-    background_tasks.add_task(process_record_task, record_id, doc["audio_url"])
+    try:
+        job_id = await job_queue.enqueue(
+            "process_record",
+            {
+                "record_id": record_id,
+                "audio_url": doc["audio_url"],
+                "stt_backend": stt_backend,
+                "stt_model": stt_model,
+                "from_stage": from_stage,
+                # A user is waiting on this record; backfills queue behind it for LLM capacity
+                "priority": "interactive"
+            },
+            dedupe_key=record_id
+        )
+    except JobAlreadyRunningError:
+        raise HTTPException(
+            status_code=409,
+            detail="This record is already being processed with other options; retry once it finishes."
+        )
     
-    return {"message": "Processing started", "record_id": record_id, "status": "processing"}
+    return {"message": "Processing started", "record_id": record_id, "status": "processing", "job_id": job_id}
 
 @router.get("/status/{record_id}")
 async def get_status(record_id: str) -> dict:
@@ -424,11 +840,15 @@ async def get_status(record_id: str) -> dict:
             "title": metadata.get("title"),
             "language": metadata.get("detected_language"),
             "category": metadata.get("category"),
-            "transcript_preview": (metadata.get("transcript") or "")[:100],
+            # While a recording is being (re)transcribed, the partial text stitched so far
+            "transcript_preview": (metadata.get("transcript_partial") or metadata.get("transcript") or "")[:TRANSCRIPT_PREVIEW_CHARS],
+            "transcript_progress": metadata.get("transcript_progress"),
+            "stage_timings": metadata.get("stage_timings"),
             "processing_error": metadata.get("processing_error"),
             "verification_status": metadata.get("verification_status"),
             "disclaimer": metadata.get("disclaimer")
         },
+        "checkpoints": [c["stage"] for c in await checkpoint_service.list_stages(record_id)],
         "logs": [
             {
                 "stage": log["stage"], 
@@ -0,0 +1,172 @@
+from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from auth import verify_token
+from limiter import limiter
+from routers.processing import (
+    ALLOWED_BASE_TYPES, MIME_TO_EXT, MIN_FILE_SIZE, MAX_FILE_SIZE, create_knowledge_records
+)
+from services.upload_session_service import (
+    upload_session_service, UploadSessionError, UploadSessionNotFound, UploadOffsetMismatch, UploadIncomplete,
+    UploadChunkInProgress
+)
+
+router = APIRouter()
+
+class UploadSessionCreate(BaseModel):
+    """Request body opening a resumable upload; mirrors the /upload-audio form fields."""
+    content_type: str
+    total_size: int
+    contributor: str = "Anonymous"
+    state: str | None = None
+    city: str | None = None
+    consent: bool = False
+
+def _session_status(session: dict) -> dict:
+    return {
+        "session_id": session["_id"],
+        "offset": session["offset"],
+        "total_size": session["total_size"],
+        "status": session["status"],
+        "record_id": session.get("record_id"),
+    }
+
+async def _load_session(session_id: str, user_payload: dict) -> dict:
+    try:
+        return await upload_session_service.get_session(session_id, user_payload.get("sub"))
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/uploads")
+@limiter.limit("5/minute")
+async def create_upload_session(
+    request: Request,
+    body: UploadSessionCreate,
+    user_payload: dict = Depends(verify_token)
+) -> dict:
+    """
+    Open a resumable upload session. Validation matches /upload-audio so failures happen before any bytes are sent.
+
+    Args:
+        request (Request): Framework request object.
+        body (UploadSessionCreate): Declared MIME type, exact byte size and recording metadata.
+        user_payload (dict, optional): Resolves and authenticates from Depends injection.
+
+    Returns:
+        dict: Session ID and the offset to start sending from.
+
+    Raises:
+        HTTPException: For missing consent, invalid mime-types, or sizes out of bounds.
+    """
+    if not body.consent:
+        raise HTTPException(status_code=400, detail="User consent is required to process audio.")
+
+    base_type = (body.content_type or "").split(";")[0].strip().lower()
+    if base_type not in ALLOWED_BASE_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid file type '{body.content_type}'. Allowed base types: {sorted(ALLOWED_BASE_TYPES)}")
+    if body.total_size < MIN_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="Audio recording is too short or empty. Please record a longer clip and try again.")
+    if body.total_size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail=f"File too large. Limit: {MAX_FILE_SIZE/1024/1024}MB")
+
+    session = await upload_session_service.create_session(
+        owner=user_payload.get("sub"),
+        ext=MIME_TO_EXT.get(base_type, "webm"),
+        content_type=base_type,
+        total_size=body.total_size,
+        fields={"contributor": body.contributor, "state": body.state, "city": body.city, "consent": body.consent}
+    )
+    return _session_status(session)
+
+@router.get("/uploads/{session_id}")
+async def get_upload_session(session_id: str, user_payload: dict = Depends(verify_token)) -> dict:
+    """
+    Report the committed offset so a client can resume after a dropped connection.
+
+    Args:
+        session_id (str): Upload session ID.
+        user_payload (dict, optional): Resolves and authenticates from Depends injection.
+
+    Returns:
+        dict: Session status including the next expected `offset`.
+    """
+    session = await _load_session(session_id, user_payload)
+    return _session_status(session)
+
+@router.put("/uploads/{session_id}")
+@limiter.limit("120/minute")
+async def upload_chunk(
+    request: Request,
+    session_id: str,
+    offset: int = Query(..., ge=0, description="Byte offset of the first byte in this chunk"),
+    user_payload: dict = Depends(verify_token)
+):
+    """
+    Append a raw-bytes chunk at `offset`. The body is streamed straight to the session's part file.
+
+    Args:
+        request (Request): Request whose body is the chunk.
+        session_id (str): Upload session ID.
+        offset (int): Must equal the session's committed offset.
+        user_payload (dict, optional): Resolves and authenticates from Depends injection.
+
+    Returns:
+        dict | JSONResponse: New committed offset, or 409 with the expected offset on a mismatch
+            or while another request is still writing this chunk.
+    """
+    session = await _load_session(session_id, user_payload)
+    try:
+        new_offset = await upload_session_service.append_chunk(session, offset, request.stream())
+    except UploadOffsetMismatch as e:
+        return JSONResponse(status_code=409, content={"detail": str(e), "offset": e.expected_offset})
+    except UploadChunkInProgress as e:
+        return JSONResponse(status_code=409, content={"detail": str(e), "offset": offset})
+    except UploadSessionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"session_id": session_id, "offset": new_offset, "total_size": session["total_size"]}
+
+@router.post("/uploads/{session_id}/finalize")
+async def finalize_upload(session_id: str, user_payload: dict = Depends(verify_token)) -> dict:
+    """
+    Complete a resumable upload and register it exactly like /upload-audio does.
+    Retrying a finalize that already succeeded returns the same record.
+
+    Args:
+        session_id (str): Upload session ID.
+        user_payload (dict, optional): Resolves and authenticates from Depends injection.
+
+    Returns:
+        dict: Same payload as /upload-audio, including the new `record_id`.
+    """
+    session = await _load_session(session_id, user_payload)
+    if session["status"] == "finalized":
+        return {"message": "Upload successful", "record_id": session["record_id"], "status": "uploaded"}
+
+    try:
+        saved = await upload_session_service.complete(session, MIN_FILE_SIZE)
+    except UploadIncomplete as e:
+        return JSONResponse(status_code=409, content={"detail": str(e), "offset": session["offset"]})
+    except UploadSessionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    fields = session["fields"]
+    try:
+        record_id = await create_knowledge_records(
+            audio_url=saved["audio_url"],
+            filename=saved["filename"],
+            audio_hash=saved["sha256"],
+            file_size=saved["size"],
+            contributor=fields.get("contributor", "Anonymous"),
+            state=fields.get("state"),
+            city=fields.get("city"),
+            consent=fields.get("consent", False),
+            record_id=saved["record_id"]
+        )
+        await upload_session_service.mark_finalized(session_id, record_id)
+    except BaseException:
+        await upload_session_service.release(session_id)
+        raise
+
+    return {"message": "Upload successful", "record_id": record_id, "status": "uploaded"}
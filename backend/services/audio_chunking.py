@@ -0,0 +1,94 @@
+import subprocess
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def decode_audio(file_path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode any ffmpeg-readable file to a mono float32 waveform.
+
+    Independent of the STT backend, so chunk planning works the same for every engine.
+    Prepared 16-bit PCM WAVs at the target rate are read directly, without spawning ffmpeg.
+    """
+    if file_path.endswith(".wav"):
+        with wave.open(file_path, "rb") as f:
+            if f.getframerate() == sample_rate and f.getnchannels() == 1 and f.getsampwidth() == 2:
+                return np.frombuffer(f.readframes(f.getnframes()), np.int16).astype(np.float32) / 32768.0
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", file_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+def _frame_energies(audio: np.ndarray, frame_size: int) -> np.ndarray:
+    """Root-mean-square energy of consecutive non-overlapping frames."""
+    n_frames = len(audio) // frame_size
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * frame_size].reshape(n_frames, frame_size)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+def plan_chunks(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    target_seconds: float = 30.0,
+    max_seconds: float = 45.0,
+    frame_ms: int = 30,
+) -> list[tuple[int, int]]:
+    """
+    Split a mono waveform into silence-bounded spans for parallel transcription.
+
+    A lightweight energy VAD scores every frame; each cut is placed on the
+    quietest frame between half the target length and the hard maximum, so
+    chunk boundaries fall in pauses rather than mid-word whenever possible.
+
+    Args:
+        audio (np.ndarray): Mono float waveform.
+        sample_rate (int): Samples per second of `audio`.
+        target_seconds (float): Preferred chunk duration.
+        max_seconds (float): Hard upper bound on chunk duration.
+        frame_ms (int): VAD frame length in milliseconds.
+
+    Returns:
+        list[tuple[int, int]]: Ordered, contiguous (start, end) sample offsets covering the audio.
+    """
+    total = len(audio)
+    max_len = int(max_seconds * sample_rate)
+    if total <= max_len:
+        return [(0, total)] if total else []
+
+    frame_size = max(1, int(sample_rate * frame_ms / 1000))
+    energies = _frame_energies(audio, frame_size)
+    target_frames = int(target_seconds * sample_rate) // frame_size
+    max_frames = max(1, max_len // frame_size)
+    # A target above twice the maximum would leave no room to search; cut at the maximum then
+    min_frames = max(1, min(target_frames // 2, max_frames - 1))
+
+    spans = []
+    start_frame = 0
+    total_frames = len(energies)
+    while total - start_frame * frame_size > max_len:
+        window = energies[start_frame + min_frames : start_frame + max_frames]
+        if len(window) == 0:
+            # Nowhere to search (e.g. max_seconds shorter than a frame): hard cut at the maximum
+            cut_frame = min(start_frame + max_frames, total_frames)
+        else:
+            # Prefer the quietest frame; among near-equal candidates, the one closest to the target.
+            quiet = window.min()
+            candidates = np.flatnonzero(window <= quiet * 1.1 + 1e-6)
+            offset = candidates[np.argmin(np.abs(candidates + min_frames - target_frames))]
+            cut_frame = min(start_frame + min_frames + int(offset), total_frames)
+        if cut_frame <= start_frame:
+            break
+        spans.append((start_frame * frame_size, cut_frame * frame_size))
+        start_frame = cut_frame
+
+    spans.append((start_frame * frame_size, total))
+    return spans
@@ -1,17 +1,145 @@
 import os
+import uuid
+import wave
+import asyncio
+import hashlib
 import aiofiles
+from fastapi import UploadFile
+
+UPLOAD_DIR = "uploads"
+# Partial uploads are staged outside the static /uploads mount and renamed in atomically
+UPLOAD_TMP_DIR = "uploads_tmp"
+READ_CHUNK_SIZE = 256 * 1024
+# 16 kHz mono PCM artefacts for STT; kept off the static mount since they are large
+PREPARED_DIR = "prepared_audio"
+STT_SAMPLE_RATE = 16000
+PLAYBACK_BITRATE = "32k"
+
+class UploadTooSmallError(ValueError):
+    """Raised when a streamed upload ends below the minimum size."""
+
+class UploadTooLargeError(ValueError):
+    """Raised as soon as a streamed upload exceeds the maximum size."""
 
 class AudioService:
     async def upload_audio(self, file_content: bytes, filename: str) -> str:
-        upload_dir = "uploads"
+        upload_dir = UPLOAD_DIR
         os.makedirs(upload_dir, exist_ok=True)
         file_path = os.path.join(upload_dir, filename)
-        
+
         async with aiofiles.open(file_path, 'wb') as out_file:
             await out_file.write(file_content)
-            
+
         # Return URL accessible via static mount
         return f"http://localhost:8000/uploads/{filename}"
 
-audio_service = AudioService()
+    async def save_upload_stream(self, file: UploadFile, filename: str, min_size: int, max_size: int) -> dict:
+        """
+        Stream an UploadFile to disk in fixed-size chunks without holding it in memory.
+
+        Size limits are enforced while copying, the SHA-256 is computed on the fly, and the
+        file only appears under /uploads once complete, via an atomic rename. The multipart
+        parser has already spooled the whole body by the time this runs, so an oversized
+        upload is only stopped early by the Content-Length check in
+        `routers.processing.reject_oversized_upload`; large recordings belong on /api/uploads.
+
+        Args:
+            file (UploadFile): Incoming multipart file.
+            filename (str): Final name inside the uploads directory.
+            min_size (int): Minimum accepted size in bytes.
+            max_size (int): Maximum accepted size in bytes.
+
+        Returns:
+            dict: {"audio_url": str, "size": int, "sha256": str}
+
+        Raises:
+            UploadTooSmallError: If the stream ends below `min_size`.
+            UploadTooLargeError: If the stream grows beyond `max_size`.
+        """
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+        tmp_path = os.path.join(UPLOAD_TMP_DIR, f"{uuid.uuid4()}.part")
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as out_file:
+                while chunk := await file.read(READ_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise UploadTooLargeError(f"Upload exceeds {max_size} bytes")
+                    digest.update(chunk)
+                    await out_file.write(chunk)
+
+            if size < min_size:
+                raise UploadTooSmallError(f"Upload is only {size} bytes")
 
+            os.replace(tmp_path, os.path.join(UPLOAD_DIR, filename))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return {
+            "audio_url": f"http://localhost:8000/uploads/{filename}",
+            "size": size,
+            "sha256": digest.hexdigest(),
+        }
+
+    async def _run_ffmpeg(self, *args: str) -> None:
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-y", "-loglevel", "error", *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='ignore').strip()}")
+
+    async def prepare_audio(self, file_path: str) -> dict:
+        """
+        Decode an upload once into the artefacts the rest of the system uses.
+
+        Produces a 16 kHz mono PCM WAV for STT (reused by every reprocessing run) and a
+        compact Opus rendition for playback, both from a single ffmpeg decode. If the
+        local ffmpeg lacks libopus, the PCM artefact is still produced and playback
+        falls back to the original upload.
+
+        Args:
+            file_path (str): Path of the original upload inside UPLOAD_DIR.
+
+        Returns:
+            dict: Paths, sizes and duration of the prepared artefacts.
+        """
+        os.makedirs(PREPARED_DIR, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        pcm_path = os.path.join(PREPARED_DIR, f"{stem}.16k.wav")
+        playback_name = f"{stem}.opus"
+        playback_path = os.path.join(UPLOAD_DIR, playback_name)
+
+        pcm_args = ["-map", "0:a:0", "-ac", "1", "-ar", str(STT_SAMPLE_RATE), "-c:a", "pcm_s16le", pcm_path]
+        opus_args = ["-map", "0:a:0", "-ac", "1", "-c:a", "libopus", "-b:a", PLAYBACK_BITRATE, "-application", "voip", playback_path]
+        try:
+            await self._run_ffmpeg("-i", file_path, *pcm_args, *opus_args)
+        except RuntimeError as e:
+            print(f"Playback transcode failed for '{file_path}', preparing STT audio only: {e}")
+            if os.path.exists(playback_path):
+                os.remove(playback_path)
+            await self._run_ffmpeg("-i", file_path, *pcm_args)
+
+        with wave.open(pcm_path, "rb") as pcm:
+            duration = pcm.getnframes() / pcm.getframerate()
+
+        prepared = {
+            "pcm_path": pcm_path,
+            "pcm_size": os.path.getsize(pcm_path),
+            "duration_seconds": round(duration, 2),
+            "original_size": os.path.getsize(file_path),
+            "playback_url": None,
+            "playback_size": None,
+        }
+        if os.path.exists(playback_path):
+            prepared["playback_url"] = f"http://localhost:8000/uploads/{playback_name}"
+            prepared["playback_size"] = os.path.getsize(playback_path)
+        return prepared
+
+audio_service = AudioService()
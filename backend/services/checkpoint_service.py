@@ -0,0 +1,93 @@
+import json
+import hashlib
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from db.mongo import db
+
+def hash_inputs(inputs: Any) -> str:
+    """Stable SHA-256 of a JSON-serialisable stage input."""
+    encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def is_checkpointable(output: Any) -> bool:
+    """Fallback, error and truncated results are never persisted, so a rerun retries them."""
+    if not isinstance(output, dict):
+        return False
+    return not output.get("fallback") and not output.get("error") and not output.get("truncated")
+
+class CheckpointService:
+    """
+    Per-stage output checkpoints stored in the `pipeline_checkpoints` collection.
+
+    One document per (record, stage) holds the hash of the inputs the output was
+    computed from. A checkpoint is only reused when the current inputs hash to the
+    same value, so changing an upstream result (e.g. a re-transcription) naturally
+    invalidates every stage that consumed it.
+    """
+
+    @staticmethod
+    def _key(record_id: str, stage: str) -> str:
+        return f"{record_id}:{stage}"
+
+    async def load(self, record_id: str, stage: str, input_hash: str) -> dict | None:
+        doc = await db.db.pipeline_checkpoints.find_one(
+            {"_id": self._key(record_id, stage), "input_hash": input_hash}, {"output": 1}
+        )
+        return doc["output"] if doc else None
+
+    async def save(self, record_id: str, stage: str, input_hash: str, output: dict) -> None:
+        await db.db.pipeline_checkpoints.update_one(
+            {"_id": self._key(record_id, stage)},
+            {"$set": {
+                "knowledge_id": record_id,
+                "stage": stage,
+                "input_hash": input_hash,
+                "output": output,
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+
+    async def run(
+        self,
+        record_id: str,
+        stage: str,
+        inputs: Any,
+        compute: Callable[[], Awaitable[Any]],
+        force: bool = False,
+        persist: bool = True
+    ) -> tuple[Any, bool]:
+        """
+        Return the checkpointed output for `stage`, computing and storing it if missing.
+
+        Args:
+            record_id (str): Knowledge record being processed.
+            stage (str): Checkpoint name, e.g. 'extraction' or 'verification:safety'.
+            inputs (Any): Everything the stage output depends on; hashed into the key.
+            compute (Callable[[], Awaitable[Any]]): Produces the output on a miss.
+            force (bool, optional): Ignore any existing checkpoint and recompute.
+            persist (bool, optional): Set False when the inputs contain fallback results.
+
+        Returns:
+            tuple[Any, bool]: The stage output and whether it came from a checkpoint.
+        """
+        input_hash = hash_inputs(inputs)
+        if not force:
+            cached = await self.load(record_id, stage, input_hash)
+            if cached is not None:
+                return cached, True
+
+        output = await compute()
+        if persist and is_checkpointable(output):
+            await self.save(record_id, stage, input_hash, output)
+        return output, False
+
+    async def list_stages(self, record_id: str) -> list[dict]:
+        """Checkpointed stages for a record, for status and tooling."""
+        cursor = db.db.pipeline_checkpoints.find(
+            {"knowledge_id": record_id}, {"stage": 1, "input_hash": 1, "created_at": 1, "_id": 0}
+        )
+        return await cursor.to_list(length=None)
+
+checkpoint_service = CheckpointService()
@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from config import settings
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+class HashingEmbedder:
+    """
+    Dependency-free fallback: word unigrams, bigrams and character trigrams hashed into a
+    fixed-size vector with sublinear term frequency. Catches re-uploads, re-tellings that
+    share phrasing and transliteration variants, though not paraphrases across languages.
+    """
+    backend = "hashing"
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _index(self, feature: str) -> int:
+        return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little") % self.dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            features += [f"#{w[i:i + 3]}" for w in words for i in range(max(1, len(w) - 2))]
+            for feature in features:
+                vectors[row, self._index(feature)] += 1.0
+        np.log1p(vectors, out=vectors)
+        return _normalize(vectors)
+
+class SentenceTransformerEmbedder:
+    """Multilingual sentence embeddings on CPU; requires `pip install sentence-transformers`."""
+    backend = "sentence-transformers"
+
+    def __init__(self, model_name: str) -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError("The 'sentence-transformers' embedding backend requires `pip install sentence-transformers`.") from e
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = model_name
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+def load_embedder(backend: str, model_name: str):
+    """Instantiate the configured embedder, falling back to hashing when the model can't be loaded."""
+    if backend == "sentence-transformers":
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            print(f"Embedding model unavailable, using the hashing embedder: {e}")
+    return HashingEmbedder()
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+def _slug(category: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", (category or "uncategorized").lower()).strip("_") or "uncategorized"
+
+def _stamp(path: str) -> Tuple[int, int, int]:
+    """(inode, mtime in ns, size) of a file, or zeros when it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (0, 0, 0)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on `path`, held across processes (API, pipeline workers, rebuild)."""
+    with open(path, "a+b") as handle:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10 seconds
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+class _Partition:
+    """Immutable once published in `EmbeddingIndex._partitions`; writers build a new one."""
+    __slots__ = ("ids", "matrix", "stamp", "model")
+
+    def __init__(self, ids: List[str], matrix: np.ndarray, stamp: Tuple[int, int, int] = (0, 0, 0), model: str = "") -> None:
+        self.ids = ids
+        self.matrix = matrix
+        self.stamp = stamp
+        self.model = model
+
+class EmbeddingIndex:
+    """
+    Transcript embeddings for near-duplicate search, one on-disk numpy matrix per category.
+
+    Vectors are L2-normalised, so cosine similarity is one matrix-vector product; an
+    archive category of 100k records answers in a few milliseconds. Partitions are stored
+    as float16 and saved atomically after every change, and reloaded when another process
+    (API or worker) has written them since. Writers take a file lock and re-read the
+    partition under it, so concurrent workers don't lose each other's entries. An
+    append-only log records each record's partition. Long transcripts are embedded per
+    chunk and mean-pooled. Disk reads and embedding happen in worker threads; the
+    in-memory partitions are replaced, never mutated, so readers see a consistent snapshot.
+    Partitions written by a different embedding model are ignored; rebuild them with
+    `python -m services.embedding_index rebuild`.
+    """
+    def __init__(
+        self,
+        directory: str = settings.EMBEDDING_INDEX_DIR,
+        backend: str = settings.EMBEDDING_BACKEND,
+        model_name: str = settings.EMBEDDING_MODEL,
+        embedder=None,
+    ) -> None:
+        self.directory = directory
+        self.backend = backend
+        self.model_name = model_name
+        self._embedder = embedder
+        self._partitions: Dict[str, _Partition] = {}
+        self._lock = threading.Lock()  # guards _partitions between the event loop and writer threads
+        # knowledge_id -> partition slug, replayed from the locations log
+        self._locations: Dict[str, str] = {}
+        self._locations_read: Tuple[int, int] = (0, 0)  # (log inode, bytes consumed)
+
+    @property
+    def embedder(self):
+        # Loaded on first use so importing the module (and API startup) stays cheap
+        if self._embedder is None:
+            self._embedder = load_embedder(self.backend, self.model_name)
+        return self._embedder
+
+    @property
+    def _model(self) -> str:
+        """Model stamp partitions must carry; read from the configuration until the embedder is loaded."""
+        if self._embedder is not None:
+            return self._embedder.name
+        return self.model_name if self.backend == "sentence-transformers" else HashingEmbedder().name
+
+    def _path(self, slug: str) -> str:
+        return os.path.join(self.directory, f"{slug}.npz")
+
+    @property
+    def _locations_path(self) -> str:
+        return os.path.join(self.directory, "locations.log")
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        os.makedirs(self.directory, exist_ok=True)
+        with _file_lock(os.path.join(self.directory, ".lock")):
+            yield
+
+    def embed(self, text: str) -> np.ndarray:
+        """One normalised vector for a transcript (chunks of ~EMBEDDING_CHUNK_CHARS mean-pooled)."""
+        from agents.chunking import split_text
+        chunks = split_text(text or "", settings.EMBEDDING_CHUNK_CHARS)
+        vectors = self.embedder.embed(chunks)
+        return _normalize(vectors.mean(axis=0, keepdims=True))[0]
+
+    def _partition(self, category: str) -> _Partition:
+        """The category's partition, reloaded from disk when another process has written it. Blocking."""
+        slug = _slug(category)
+        path = self._path(slug)
+        model = self._model
+        stamp = _stamp(path)
+        with self._lock:
+            cached = self._partitions.get(slug)
+        if cached is not None and cached.stamp == stamp and cached.model == model:
+            return cached
+
+        partition = _Partition([], np.zeros((0, 0), dtype=np.float32), stamp, model)
+        if stamp[0]:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["model"]) == model:
+                    partition = _Partition([str(i) for i in data["ids"]], data["matrix"].astype(np.float32), stamp, model)
+                else:
+                    print(f"Embedding partition {path} was built with {data['model']}, ignoring it")
+        with self._lock:
+            self._partitions[slug] = partition
+        return partition
+
+    def _store(self, slug: str, ids: List[str], matrix: np.ndarray) -> None:
+        """Save a partition atomically, then publish it to readers."""
+        path = self._path(slug)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        model = self.embedder.name
+        np.savez(tmp_path, ids=np.array(ids, dtype=str), matrix=matrix.astype(np.float16), model=model)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._partitions[slug] = _Partition(ids, matrix, _stamp(path), model)
+
+    def _read_locations(self) -> Dict[str, str]:
+        """Replay lines appended to the locations log since the last read ("id<TAB>slug", empty slug = removed)."""
+        inode, _, size = _stamp(self._locations_path)
+        if inode != self._locations_read[0]:
+            self._locations, self._locations_read = {}, (inode, 0)  # new or rewritten by replace_all
+        consumed = self._locations_read[1]
+        if size > consumed:
+            with open(self._locations_path, "rb") as log:
+                log.seek(consumed)
+                data = log.read(size - consumed)
+            complete = data.rfind(b"\n") + 1
+            for line in data[:complete].decode("utf-8").splitlines():
+                knowledge_id, _, slug = line.partition("\t")
+                if slug:
+                    self._locations[knowledge_id] = slug
+                else:
+                    self._locations.pop(knowledge_id, None)
+            self._locations_read = (inode, consumed + complete)
+        return self._locations
+
+    def _log_location(self, knowledge_id: str, slug: str) -> None:
+        with open(self._locations_path, "a", encoding="utf-8") as log:
+            log.write(f"{knowledge_id}\t{slug}\n")
+
+    async def add(self, knowledge_id: str, category: str, text: str) -> None:
+        """Index (or re-index) a record's transcript under its category."""
+        vector = await asyncio.to_thread(self.embed, text)
+        await asyncio.to_thread(self._add, knowledge_id, category, vector)
+
+    def _add(self, knowledge_id: str, category: str, vector: np.ndarray) -> None:
+        with self._writing():
+            self._remove_locked(knowledge_id)
+            partition = self._partition(category)
+            matrix = partition.matrix if partition.matrix.size else np.zeros((0, vector.shape[0]), dtype=np.float32)
+            self._store(_slug(category), [*partition.ids, knowledge_id], np.vstack([matrix, vector[None, :]]))
+            self._log_location(knowledge_id, _slug(category))
+
+    def _remove_locked(self, knowledge_id: str) -> None:
+        # Records can change category on reprocessing; the log says which partition holds them
+        slug = self._read_locations().get(knowledge_id)
+        if slug is None:
+            return
+        partition = self._partition(slug)
+        if knowledge_id in partition.ids:
+            keep = [i for i, doc_id in enumerate(partition.ids) if doc_id != knowledge_id]
+            self._store(slug, [partition.ids[i] for i in keep], partition.matrix[keep])
+        self._log_location(knowledge_id, "")
+
+    async def remove(self, knowledge_id: str) -> None:
+        def remove() -> None:
+            with self._writing():
+                self._remove_locked(knowledge_id)
+
+        await asyncio.to_thread(remove)
+
+    async def search(self, category: str, text: str, k: int = 5, exclude_id: str | None = None) -> List[Tuple[str, float]]:
+        """
+        Most similar indexed records in `category`.
+
+        Returns:
+            List[Tuple[str, float]]: Up to `k` (knowledge_id, cosine similarity) pairs, most similar first.
+        """
+        return await asyncio.to_thread(lambda: self.search_vector(category, self.embed(text), k, exclude_id))
+
+    def search_vector(self, category: str, vector: np.ndarray, k: int = 5, exclude_id: str | None = None) -> List[Tuple[str, float]]:
+        """Blocking (may reload the partition from disk); call from a worker thread."""
+        partition = self._partition(category)
+        if not partition.ids:
+            return []
+        scores = partition.matrix @ vector
+        if exclude_id is not None and exclude_id in partition.ids:
+            scores[partition.ids.index(exclude_id)] = -np.inf
+        top = min(k, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [(partition.ids[i], float(scores[i])) for i in best if np.isfinite(scores[i])]
+
+    def replace_all(self, rows: List[Tuple[str, str, np.ndarray]]) -> None:
+        """Discard the index and write (knowledge_id, category, vector) rows, one save per category."""
+        grouped: Dict[str, List[Tuple[str, np.ndarray]]] = {}
+        for knowledge_id, category, vector in rows:
+            grouped.setdefault(_slug(category), []).append((knowledge_id, vector))
+
+        with self._writing():
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, name))
+            with self._lock:
+                self._partitions.clear()
+            for slug, members in grouped.items():
+                self._store(slug, [doc_id for doc_id, _ in members], np.vstack([v for _, v in members]))
+
+            tmp_path = f"{self._locations_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as log:
+                log.writelines(f"{doc_id}\t{slug}\n" for slug, members in grouped.items() for doc_id, _ in members)
+            os.replace(tmp_path, self._locations_path)
+
+    def size(self, category: str) -> int:
+        """Records indexed under `category` (0 before the first add or `rebuild`). Blocking; see `count`."""
+        return len(self._partition(category).ids)
+
+    async def count(self, category: str) -> int:
+        """`size` off the event loop, since it may reload the partition from disk."""
+        return await asyncio.to_thread(self.size, category)
+
+    def thresholds(self) -> Dict[str, float]:
+        """Similarity thresholds calibrated for the embedder in use (see DUPLICATION_SIMILARITY)."""
+        backend = self._embedder.backend if self._embedder is not None else self.backend
+        return settings.DUPLICATION_SIMILARITY[backend]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {slug: len(partition.ids) for slug, partition in self._partitions.items()}
+
+embedding_index = EmbeddingIndex()
+
+async def rebuild() -> int:
+    """Re-embed every completed, non-quarantined record from MongoDB into a fresh index."""
+    from db.mongo import db
+    from models.knowledge_model import ProcessingStatus
+
+    await db.connect_to_database()
+    try:
+        cursor = db.db.knowledge.find(
+            {"processing_status": ProcessingStatus.COMPLETED, "verification_status": {"$ne": "quarantined"},
+             "transcript": {"$nin": [None, ""]}},
+            {"transcript": 1, "category": 1}
+        )
+        rows = [
+            (doc["_id"], doc.get("category") or "Uncategorized", await asyncio.to_thread(embedding_index.embed, doc["transcript"]))
+            async for doc in cursor
+        ]
+        embedding_index.replace_all(rows)
+        return len(rows)
+    finally:
+        await db.close_database_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the duplicate-detection embedding index")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    print(f"Indexed {asyncio.run(rebuild())} records into {embedding_index.directory}")
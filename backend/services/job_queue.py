@@ -0,0 +1,279 @@
+import os
+import uuid
+import socket
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from config import settings
+from db.mongo import db
+
+ACTIVE_STATUSES = ["queued", "leased"]
+
+class NonRetryableJobError(Exception):
+    """Raised by a job handler when retrying cannot help (e.g. invalid input)."""
+
+class JobAlreadyRunningError(Exception):
+    """Raised by enqueue when a job with the same dedupe key is already running with other options."""
+
+class JobQueue:
+    """
+    Durable job queue stored in the `jobs` collection.
+
+    Workers lease jobs for a visibility timeout and extend the lease with
+    heartbeats while running. A job whose lease expires (crashed or restarted
+    worker) becomes visible again, and failures are retried with exponential
+    backoff until `max_attempts` is reached.
+    """
+
+    async def enqueue(self, job_type: str, payload: Dict[str, Any], dedupe_key: str | None = None,
+                      max_attempts: int = settings.JOB_MAX_ATTEMPTS) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            job_type (str): Handler name used by workers to dispatch the job.
+            payload (Dict[str, Any]): Keyword arguments for the handler.
+            dedupe_key (str, optional): If a queued or running job has the same key, it is reused.
+                A queued job takes the new payload; a running one must have the same payload.
+            max_attempts (int, optional): Attempts before the job is marked failed.
+
+        Returns:
+            str: The job ID.
+
+        Raises:
+            JobAlreadyRunningError: A job with `dedupe_key` is running with a different payload.
+        """
+        # The unique partial index on active dedupe keys settles concurrent enqueues
+        while True:
+            if dedupe_key and (existing_id := await self._reuse(dedupe_key, payload)):
+                return existing_id
+            try:
+                return await self._insert(job_type, payload, dedupe_key, max_attempts)
+            except DuplicateKeyError:
+                if not dedupe_key:
+                    raise
+
+    async def _reuse(self, dedupe_key: str, payload: Dict[str, Any]) -> str | None:
+        existing = await db.db.jobs.find_one(
+            {"dedupe_key": dedupe_key, "status": {"$in": ACTIVE_STATUSES}}, {"payload": 1}
+        )
+        if not existing:
+            return None
+        if existing["payload"] == payload:
+            return existing["_id"]
+        # A job that hasn't started yet runs with the latest options
+        result = await db.db.jobs.update_one(
+            {"_id": existing["_id"], "status": "queued"},
+            {"$set": {"payload": payload, "updated_at": datetime.utcnow()}}
+        )
+        if result.matched_count == 1:
+            return existing["_id"]
+        raise JobAlreadyRunningError(f"Job {existing['_id']} for '{dedupe_key}' is already running with other options")
+
+    async def _insert(self, job_type: str, payload: Dict[str, Any], dedupe_key: str | None, max_attempts: int) -> str:
+        now = datetime.utcnow()
+        job_id = str(uuid.uuid4())
+        await db.db.jobs.insert_one({
+            "_id": job_id,
+            "type": job_type,
+            "payload": payload,
+            "dedupe_key": dedupe_key,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "run_at": now,
+            "lease_expires_at": None,
+            "worker_id": None,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now
+        })
+        return job_id
+
+    async def lease(self, worker_id: str) -> dict | None:
+        """
+        Atomically claim the next runnable job: a queued job that is due, or a leased job whose lease expired.
+
+        Returns:
+            dict | None: The leased job document, or None if nothing is runnable.
+        """
+        now = datetime.utcnow()
+        return await db.db.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}},
+                {"status": "leased", "lease_expires_at": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": "leased",
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend a lease still held by `worker_id`. Returns False if the lease was lost."""
+        now = datetime.utcnow()
+        result = await db.db.jobs.update_one(
+            {"_id": job_id, "status": "leased", "worker_id": worker_id},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+                "updated_at": now
+            }}
+        )
+        return result.modified_count == 1
+
+    async def complete(self, job_id: str, worker_id: str) -> None:
+        """Mark a leased job as done."""
+        await db.db.jobs.update_one(
+            {"_id": job_id, "worker_id": worker_id},
+            {"$set": {"status": "done", "lease_expires_at": None, "updated_at": datetime.utcnow()}}
+        )
+
+    async def fail(self, job: dict, error: str, retryable: bool = True) -> bool | None:
+        """
+        Record a failed attempt, rescheduling it with exponential backoff when attempts remain.
+
+        Returns:
+            bool | None: True if the job will be retried, False if it is now permanently failed,
+                None if the lease was lost and the job now belongs to another worker.
+        """
+        now = datetime.utcnow()
+        leased_by_us = {"_id": job["_id"], "status": "leased", "worker_id": job["worker_id"]}
+        if retryable and job["attempts"] < job["max_attempts"]:
+            delay = min(
+                settings.JOB_RETRY_BASE_SECONDS * (2 ** (job["attempts"] - 1)),
+                settings.JOB_RETRY_MAX_SECONDS
+            )
+            result = await db.db.jobs.update_one(
+                leased_by_us,
+                {"$set": {
+                    "status": "queued",
+                    "run_at": now + timedelta(seconds=delay),
+                    "lease_expires_at": None,
+                    "worker_id": None,
+                    "last_error": error,
+                    "updated_at": now
+                }}
+            )
+            return True if result.modified_count == 1 else None
+
+        result = await db.db.jobs.update_one(
+            leased_by_us,
+            {"$set": {
+                "status": "failed",
+                "lease_expires_at": None,
+                "last_error": error,
+                "updated_at": now
+            }}
+        )
+        return False if result.modified_count == 1 else None
+
+class JobWorker:
+    """
+    Polls the JobQueue and runs up to `max_concurrency` jobs at once.
+
+    Handlers receive the job payload as keyword arguments. Optional failure hooks
+    are awaited as hook(job, error, will_retry) after every failed attempt.
+    """
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[..., Awaitable[Any]]],
+        failure_hooks: Dict[str, Callable[[dict, str, bool], Awaitable[None]]] | None = None,
+        max_concurrency: int = settings.JOB_MAX_CONCURRENCY,
+        poll_interval: float = settings.JOB_POLL_INTERVAL_SECONDS
+    ) -> None:
+        self.queue = queue
+        self.handlers = handlers
+        self.failure_hooks = failure_hooks or {}
+        self.max_concurrency = max(1, max_concurrency)
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: set[asyncio.Task] = set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Lease and execute jobs until `stop` is set, then wait for in-flight jobs."""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        print(f"Job worker {self.worker_id} started (max concurrency {self.max_concurrency})")
+        while not stop.is_set():
+            await slots.acquire()
+            try:
+                job = await self.queue.lease(self.worker_id)
+            except Exception as e:
+                print(f"Job worker {self.worker_id} failed to lease: {e}")
+                job = None
+
+            if job is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        print(f"Job worker {self.worker_id} stopped")
+
+    async def _heartbeat(self, job_id: str, handler_task: asyncio.Task) -> None:
+        interval = max(1.0, settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if not await self.queue.heartbeat(job_id, self.worker_id):
+                # Another worker may already have leased the job; stop rather than run it twice
+                print(f"Job {job_id} lease lost by {self.worker_id}, cancelling it")
+                handler_task.cancel()
+                return
+
+    async def _execute(self, job: dict) -> None:
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            await self.queue.fail(job, f"No handler registered for job type '{job['type']}'", retryable=False)
+            return
+
+        # A lease that expired on a crashed worker still counts as an attempt
+        if job["attempts"] > job["max_attempts"]:
+            handler_task = asyncio.create_task(self._exhausted(job))
+        else:
+            handler_task = asyncio.create_task(handler(**job["payload"]))
+        heartbeat = asyncio.create_task(self._heartbeat(job["_id"], handler_task))
+        try:
+            await handler_task
+            await self.queue.complete(job["_id"], self.worker_id)
+        except asyncio.CancelledError:
+            if not heartbeat.done() or heartbeat.cancelled():
+                raise  # the worker itself is shutting down
+            print(f"Job {job['_id']} ({job['type']}) abandoned after its lease was lost")
+        except Exception as e:
+            error = str(e)
+            print(f"Job {job['_id']} ({job['type']}) attempt {job['attempts']} failed: {error}")
+            will_retry = await self.queue.fail(job, error, retryable=not isinstance(e, NonRetryableJobError))
+            if will_retry is None:
+                print(f"Job {job['_id']} lease was lost, leaving it to its new worker")
+            elif hook := self.failure_hooks.get(job["type"]):
+                try:
+                    await hook(job, error, will_retry)
+                except Exception as hook_error:
+                    print(f"Failure hook for job {job['_id']} raised: {hook_error}")
+        finally:
+            heartbeat.cancel()
+
+    @staticmethod
+    async def _exhausted(job: dict) -> None:
+        raise NonRetryableJobError(job.get("last_error") or "Job exceeded its maximum attempts")
+
+job_queue = JobQueue()
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import hashlib
+import re
+import unicodedata
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+from config import settings
+from db.mongo import db
+from models.knowledge_model import ProcessingStatus
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# 128 permutations in 16 bands of 8 rows: records whose word shingles overlap by
+# Jaccard 0.8 share a bucket with probability ~0.95, records at 0.5 with ~0.06.
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_WORDS = 2
+
+# Multiply-shift hashing: odd 64-bit multipliers, wrapping arithmetic, top 32 bits kept.
+# Fixed seed, since stored signatures must stay comparable across processes.
+_rng = np.random.default_rng(20240611)
+_A = (_rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1))[:, None]
+_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)[:, None]
+_SHIFT = np.uint64(32)
+
+def shingles(text: str) -> np.ndarray:
+    """Hashes of the distinct SHINGLE_WORDS-word shingles of NFC-normalised, lower-cased text."""
+    words = _TOKEN.findall(unicodedata.normalize("NFC", text or "").lower())
+    grams = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature of a transcript: NUM_PERM uint32 minima, one per hash permutation."""
+    return ((_A * shingles(text)[None, :] + _B) >> _SHIFT).min(axis=1).astype(np.uint32)
+
+def lsh_buckets(sig: np.ndarray) -> List[str]:
+    """One "band:hash" key per band; records sharing any key are near-duplicate candidates."""
+    rows = NUM_PERM // BANDS
+    return [
+        f"{band}:{hashlib.blake2b(sig[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(a == b)) / len(a) if len(a) == len(b) else 0.0
+
+def to_fields(text: str) -> dict:
+    """
+    `minhash` and `lsh_buckets` fields to store on a knowledge document.
+
+    The signature is stored as hex rather than raw bytes, so documents that reach the API
+    unprojected still serialize to JSON.
+    """
+    sig = signature(text)
+    return {"minhash": sig.astype("<u4").tobytes().hex(), "lsh_buckets": lsh_buckets(sig)}
+
+async def find_near_duplicates(text: str, exclude_id: str | None = None, threshold: float | None = None) -> List[Tuple[str, float]]:
+    """
+    Records whose transcript is a near-exact copy of `text`, via the indexed `lsh_buckets`.
+
+    Signatures are stored at the STT stage, so only records that finished processing, or
+    were uploaded before the `exclude_id` record, count as originals; two copies uploaded
+    at the same time then flag only the later one. Quarantined and failed records are
+    ignored. Returns nothing without a database connection.
+
+    Returns:
+        List[Tuple[str, float]]: (knowledge_id, estimated Jaccard similarity) at or above
+            `threshold` (default DUPLICATION_MINHASH_SIMILARITY), most similar first.
+    """
+    if db.db is None:
+        return []
+    threshold = settings.DUPLICATION_MINHASH_SIMILARITY if threshold is None else threshold
+    sig = signature(text)
+    originals = [{"processing_status": ProcessingStatus.COMPLETED}]
+    current = await db.db.knowledge.find_one({"_id": exclude_id}, {"created_at": 1}) if exclude_id else None
+    if current and current.get("created_at"):
+        originals.append({"created_at": {"$lt": current["created_at"]}})
+    cursor = db.db.knowledge.find(
+        {
+            "lsh_buckets": {"$in": lsh_buckets(sig)},
+            "_id": {"$ne": exclude_id},
+            "processing_status": {"$ne": ProcessingStatus.FAILED},
+            "verification_status": {"$ne": "quarantined"},
+            "$or": originals
+        },
+        {"minhash": 1}
+    )
+    matches = []
+    async for doc in cursor:
+        score = similarity(sig, np.frombuffer(bytes.fromhex(doc["minhash"]), dtype="<u4"))
+        if score >= threshold:
+            matches.append((doc["_id"], score))
+    return sorted(matches, key=lambda match: -match[1])
+
+async def backfill() -> int:
+    """Store signatures on transcribed records processed before they were computed."""
+    await db.connect_to_database()
+    try:
+        cursor = db.db.knowledge.find(
+            {"lsh_buckets": {"$exists": False}, "transcript": {"$nin": [None, ""]}},
+            {"transcript": 1}
+        )
+        count = 0
+        async for doc in cursor:
+            await db.db.knowledge.update_one({"_id": doc["_id"]}, {"$set": to_fields(doc["transcript"])})
+            count += 1
+        return count
+    finally:
+        await db.close_database_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the MinHash re-upload signatures")
+    parser.add_argument("command", choices=["backfill"])
+    parser.parse_args()
+    print(f"Stored signatures for {asyncio.run(backfill())} records")
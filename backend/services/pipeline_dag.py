@@ -0,0 +1,195 @@
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+
+# A stage runner receives the outputs of every stage finished so far, keyed by stage name
+StageRunner = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A node in a pipeline graph.
+
+    Attributes:
+        name: Unique stage name (also used as its checkpoint and log name).
+        depends_on: Stages whose outputs this stage reads.
+        gated_by: Gate stage that must approve before this stage's output is kept.
+        opens: On a gate stage, decides from its output whether gated stages may continue.
+    """
+    name: str
+    depends_on: tuple[str, ...] = ()
+    gated_by: str | None = None
+    opens: Callable[[Any], bool] | None = None
+
+@dataclass
+class PipelineRun:
+    """Outcome of executing a PipelineDAG."""
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    discarded: set[str] = field(default_factory=set)
+    elapsed: float = 0.0
+
+class PipelineDAG:
+    """
+    Declarative stage graph executed by launching every stage as soon as its
+    dependencies have finished.
+
+    Gated stages either wait for their gate (speculative=False) or start as soon
+    as their own dependencies are met and are cancelled, with their output and any
+    error discarded, if the gate closes (speculative=True).
+    """
+    def __init__(self, stages: list[Stage]) -> None:
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            self.stages[stage.name] = stage
+
+        for stage in stages:
+            for dep in (*stage.depends_on, *([stage.gated_by] if stage.gated_by else [])):
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+            if stage.gated_by and self.stages[stage.gated_by].opens is None:
+                raise ValueError(f"Stage '{stage.gated_by}' gates '{stage.name}' but has no `opens` predicate")
+        self.order = self._topological_order()
+
+    @property
+    def stage_names(self) -> list[str]:
+        """Stage names in a valid execution order."""
+        return list(self.order)
+
+    def _topological_order(self) -> list[str]:
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in pipeline graph at stage '{name}'")
+            visiting.add(name)
+            stage = self.stages[name]
+            for dep in (*stage.depends_on, *([stage.gated_by] if stage.gated_by else [])):
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def descendants(self, name: str) -> set[str]:
+        """
+        `name` plus every stage that transitively consumes its output.
+
+        Raises:
+            ValueError: If `name` is not a stage of this graph.
+        """
+        if name not in self.stages:
+            raise ValueError(f"Unknown stage '{name}'. Available: {self.stage_names}")
+        found = {name}
+        for candidate in self.order:
+            if any(dep in found for dep in self.stages[candidate].depends_on):
+                found.add(candidate)
+        return found
+
+    def _gated(self, gate: str) -> set[str]:
+        gated = {name for name, stage in self.stages.items() if stage.gated_by == gate}
+        for name in list(gated):
+            gated |= self.descendants(name)
+        return gated
+
+    async def execute(self, runners: Dict[str, StageRunner], speculative: bool = True) -> PipelineRun:
+        """
+        Run every stage with maximal overlap.
+
+        Args:
+            runners (Dict[str, StageRunner]): Implementation for each stage name.
+            speculative (bool, optional): Start gated stages before their gate decides.
+
+        Returns:
+            PipelineRun: Outputs of kept stages, per-stage durations and discarded stage names.
+
+        Raises:
+            Exception: The first error raised by a stage that was not discarded;
+                remaining stages are cancelled.
+        """
+        missing = set(self.stages) - set(runners)
+        if missing:
+            raise ValueError(f"No runner for stages: {sorted(missing)}")
+
+        run = PipelineRun()
+        started_at = time.perf_counter()
+        pending = list(self.order)
+        running: Dict[asyncio.Task, str] = {}
+        gates: Dict[str, bool] = {}
+        held_errors: Dict[str, BaseException] = {}
+
+        def is_ready(stage: Stage) -> bool:
+            deps = list(stage.depends_on)
+            if stage.gated_by and not speculative:
+                deps.append(stage.gated_by)
+            return all(dep in run.results for dep in deps)
+
+        async def timed(name: str) -> Any:
+            stage_start = time.perf_counter()
+            try:
+                return await runners[name](run.results)
+            finally:
+                run.timings[name] = round(time.perf_counter() - stage_start, 3)
+
+        def discard(names: set[str]) -> None:
+            run.discarded |= names
+            pending[:] = [name for name in pending if name not in names]
+            for task, name in list(running.items()):
+                if name in names:
+                    task.cancel()
+            for name in names:
+                run.results.pop(name, None)
+                held_errors.pop(name, None)
+
+        try:
+            while pending or running:
+                for name in list(pending):
+                    if is_ready(self.stages[name]):
+                        pending.remove(name)
+                        running[asyncio.create_task(timed(name))] = name
+
+                if not running:
+                    if held_errors:
+                        break
+                    raise RuntimeError(f"Pipeline graph stalled with stages pending: {pending}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    if task.cancelled():
+                        continue
+                    stage = self.stages[name]
+                    if (error := task.exception()) is not None:
+                        if stage.gated_by and stage.gated_by not in gates:
+                            # A speculative failure only matters if the gate opens
+                            held_errors[name] = error
+                            continue
+                        raise error
+
+                    run.results[name] = task.result()
+                    if stage.opens is not None:
+                        gates[name] = bool(stage.opens(run.results[name]))
+                        if not gates[name]:
+                            discard(self._gated(name))
+                        else:
+                            for held, error in held_errors.items():
+                                if self.stages[held].gated_by == name:
+                                    raise error
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if held_errors:
+            raise next(iter(held_errors.values()))
+        run.elapsed = round(time.perf_counter() - started_at, 3)
+        return run
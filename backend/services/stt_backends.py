@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+# Model sizes accepted for per-job overrides. Both engines share Whisper's naming.
+MODEL_SIZES = {"tiny", "base", "small", "medium", "large-v2", "large-v3", "turbo"}
+
+class STTBackend(ABC):
+    """
+    Abstract speech-to-text engine loaded inside an STT pool worker.
+
+    Implementations import their heavy dependencies lazily in __init__ so the API
+    process can reference backends by name without loading torch or CTranslate2.
+    """
+    name: str = ""
+
+    def __init__(self, model_size: str) -> None:
+        """
+        Args:
+            model_size (str): Whisper model size to load (e.g. 'tiny', 'small').
+        """
+        self.model_size = model_size
+
+    @abstractmethod
+    def transcribe(self, audio: Any) -> Dict[str, Any]:
+        """
+        Transcribe a file path or a 16 kHz mono float32 waveform.
+
+        Returns:
+            Dict[str, Any]: {"text": str, "language": str, "segments": [{"start": float, "end": float, "text": str}]}
+        """
+        pass
+
+class WhisperBackend(STTBackend):
+    """Reference openai-whisper engine (PyTorch, fp32 on CPU)."""
+    name = "whisper"
+
+    def __init__(self, model_size: str) -> None:
+        super().__init__(model_size)
+        import whisper
+
+        self.model = whisper.load_model(model_size)
+
+    def transcribe(self, audio: Any) -> Dict[str, Any]:
+        result = self.model.transcribe(
+            audio,
+            fp16=False,                        # Required on CPU / Windows
+            task="transcribe",
+            condition_on_previous_text=False,  # Prevents hallucination loops on long audio
+            verbose=False,
+        )
+        segments = [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"].strip()}
+            for seg in result.get("segments", [])
+        ]
+        return {"text": result["text"].strip(), "language": result.get("language", "unknown"), "segments": segments}
+
+class FasterWhisperBackend(STTBackend):
+    """CTranslate2 engine via faster-whisper; int8 quantisation by default for fast CPU inference."""
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str, compute_type: str = "int8") -> None:
+        super().__init__(model_size)
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError("The 'faster-whisper' STT backend requires `pip install faster-whisper`.") from e
+
+        self.model = WhisperModel(model_size, device="cpu", compute_type=compute_type)
+
+    def transcribe(self, audio: Any) -> Dict[str, Any]:
+        segments, info = self.model.transcribe(
+            audio,
+            task="transcribe",
+            condition_on_previous_text=False,
+            beam_size=5,
+        )
+        # segments is a lazy generator: decoding happens while we consume it
+        segments = [{"start": seg.start, "end": seg.end, "text": seg.text.strip()} for seg in segments]
+        text = " ".join(seg["text"] for seg in segments)
+        return {"text": text.strip(), "language": info.language or "unknown", "segments": segments}
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+def load_backend(name: str, model_size: str, compute_type: str = "int8") -> STTBackend:
+    """
+    Instantiate an STT backend by registry name.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}'. Available: {sorted(BACKENDS)}")
+    if name == FasterWhisperBackend.name:
+        return FasterWhisperBackend(model_size, compute_type=compute_type)
+    return BACKENDS[name](model_size)
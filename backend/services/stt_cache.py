@@ -0,0 +1,85 @@
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from config import settings
+from db.mongo import db
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(HASH_CHUNK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+class STTCache:
+    """
+    Content-addressed cache of transcription results.
+
+    Keyed by (audio SHA-256, backend, model, decoding params) so byte-identical
+    re-uploads and reprocessing runs skip the STT workers entirely. Entries live in
+    the `stt_cache` collection with a small in-process LRU in front of it.
+    """
+    def __init__(self, lru_size: int = settings.STT_CACHE_LRU_SIZE) -> None:
+        self.lru_size = lru_size
+        self._lru: OrderedDict[str, dict] = OrderedDict()
+
+    @staticmethod
+    def make_key(audio_hash: str, backend: str, model: str, params: dict) -> str:
+        params_str = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        return f"{audio_hash}:{backend}:{model}:{params_str}"
+
+    def _remember(self, key: str, value: dict) -> None:
+        if self.lru_size <= 0:
+            return
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    async def get(self, audio_hash: str, backend: str, model: str, params: dict) -> dict | None:
+        """
+        Look up a cached transcription.
+
+        Returns:
+            dict | None: {"text", "language", "segments"} on a hit, None on a miss.
+        """
+        key = self.make_key(audio_hash, backend, model, params)
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            return self._lru[key]
+
+        doc = await db.db.stt_cache.find_one({"_id": key})
+        if not doc:
+            return None
+        value = {"text": doc["text"], "language": doc["language"], "segments": doc.get("segments", [])}
+        self._remember(key, value)
+        return value
+
+    async def put(self, audio_hash: str, backend: str, model: str, params: dict, result: dict) -> None:
+        """Store a transcription result under its content-addressed key."""
+        key = self.make_key(audio_hash, backend, model, params)
+        value = {
+            "text": result["text"],
+            "language": result["language"],
+            "segments": result.get("segments", []),
+        }
+        await db.db.stt_cache.update_one(
+            {"_id": key},
+            {"$set": {
+                **value,
+                "audio_sha256": audio_hash,
+                "backend": backend,
+                "model": model,
+                "params": params,
+                "created_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+        self._remember(key, value)
+
+stt_cache = STTCache()
@@ -4,39 +4,309 @@ ffmpeg_path = r"C:\ffmpeg\bin"
 if ffmpeg_path not in os.environ["PATH"]:
     os.environ["PATH"] += os.pathsep + ffmpeg_path
 
-import whisper
+import gc
+import asyncio
+import multiprocessing
+import tempfile
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import settings
+from services.stt_backends import BACKENDS, MODEL_SIZES, load_backend
+
+# Per-process backend cache, populated inside each pool worker. Engines (and
+# torch/CTranslate2) are only ever imported there, never in the API process.
+# Least recently used first; capped at STT_WORKER_MAX_MODELS so per-request
+# backend/model overrides can't pile up models until the worker runs out of memory.
+_worker_backends: OrderedDict = OrderedDict()
+
+def _get_backend(backend_name: str, model_size: str):
+    key = (backend_name, model_size)
+    if key in _worker_backends:
+        _worker_backends.move_to_end(key)
+        return _worker_backends[key]
+
+    while len(_worker_backends) >= max(1, settings.STT_WORKER_MAX_MODELS):
+        evicted, _ = _worker_backends.popitem(last=False)
+        print(f"[STT worker {os.getpid()}] Unloading {evicted[0]} model ({evicted[1]}).")
+        gc.collect()
+    print(f"[STT worker {os.getpid()}] Loading {backend_name} model ({model_size})...")
+    _worker_backends[key] = load_backend(backend_name, model_size, settings.STT_COMPUTE_TYPE)
+    print(f"[STT worker {os.getpid()}] {backend_name} model ({model_size}) loaded.")
+    return _worker_backends[key]
+
+def _init_worker(backend_name: str, model_size: str) -> None:
+    """Load the default backend once when a pool worker process starts."""
+    _get_backend(backend_name, model_size)
+
+def _transcribe_in_worker(file_path: str, span: tuple[int, int] | None = None,
+                          backend_name: str = settings.STT_BACKEND, model_size: str = settings.STT_MODEL) -> dict:
+    """
+    Run a blocking transcription inside a pool worker process.
+    With `span`, only that (start, end) sample range of a decoded .npy waveform is transcribed.
+    """
+    import numpy as np
+    from services.audio_chunking import decode_audio, SAMPLE_RATE
+
+    offset = 0.0
+    if span is not None:
+        audio = np.load(file_path, mmap_mode="r")[span[0]:span[1]].astype(np.float32)
+        offset = span[0] / SAMPLE_RATE
+    else:
+        # Prepared 16 kHz WAVs load without ffmpeg; anything else is decoded once here
+        audio = decode_audio(file_path, SAMPLE_RATE)
+
+    result = _get_backend(backend_name, model_size).transcribe(audio)
+    # Segment timestamps are relative to the chunk; shift them onto the recording's timeline
+    result["segments"] = [
+        {**seg, "start": seg["start"] + offset, "end": seg["end"] + offset} for seg in result.get("segments", [])
+    ]
+    return {**result, "backend": backend_name, "model": model_size}
+
+def _plan_chunks_in_worker(file_path: str, target_seconds: float, max_seconds: float) -> dict:
+    """
+    Decode the file once to 16 kHz mono, persist the waveform as .npy for the chunk
+    jobs to memory-map, and return silence-bounded chunk spans.
+    """
+    import numpy as np
+    from services.audio_chunking import decode_audio, plan_chunks, SAMPLE_RATE
+
+    audio = decode_audio(file_path, SAMPLE_RATE)
+    fd, waveform_path = tempfile.mkstemp(prefix="stt_", suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, audio)
+    return {
+        "waveform_path": waveform_path,
+        "duration": len(audio) / SAMPLE_RATE,
+        "spans": plan_chunks(audio, SAMPLE_RATE, target_seconds, max_seconds),
+    }
+
+def _ping_worker() -> int:
+    """No-op job used to force a worker (and its model) to start."""
+    return os.getpid()
 
 class STTService:
-    def __init__(self):
-        print("Loading Whisper model (small)...")
-        self.model = whisper.load_model("small")
-        print("Whisper model loaded.")
+    """
+    Transcription engine backed by a pool of worker processes.
+
+    Each worker loads the configured STT backend once (and any per-job model
+    override the first time it is requested). Jobs wait in a bounded asyncio
+    queue in front of the pool, so the event loop never blocks on inference and
+    producers are back-pressured once the queue is full.
+
+    Nothing is started at construction time: the pool is spawned by the first
+    transcription (or by warm_up), so importing this module costs nothing.
+    """
+    def __init__(self, backend_name: str = settings.STT_BACKEND, model_size: str = settings.STT_MODEL,
+                 workers: int = settings.STT_WORKERS, queue_size: int = settings.STT_QUEUE_SIZE) -> None:
+        self.backend_name = backend_name
+        self.model_size = model_size
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self._executor: ProcessPoolExecutor | None = None
+        self._queue: asyncio.Queue | None = None
+        self._dispatchers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.backend_name, self.model_size),
+        )
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = self._new_executor()
+        if self._loop is not loop:
+            # Queue and dispatcher tasks are bound to the loop that created them.
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._dispatchers = [loop.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, future = await self._queue.get()
+            file_path = args[0]
+            try:
+                if future.cancelled():
+                    continue
+                result = await loop.run_in_executor(self._executor, func, *args)
+                if not future.done():
+                    future.set_result(result)
+            except BrokenProcessPool as e:
+                print(f"STT worker pool crashed while transcribing '{file_path}': {e}")
+                self._executor = self._new_executor()
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Transcription failed: {str(e)}"))
+            except Exception as e:
+                print(f"Error in STT for file '{file_path}': {e}")
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Transcription failed: {str(e)}"))
+            finally:
+                self._queue.task_done()
+
+    async def _enqueue(self, func: Callable, *args) -> asyncio.Future:
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((func, args, future))
+        return future
+
+    def resolve_options(self, backend: str | None = None, model: str | None = None) -> tuple[str, str]:
+        """
+        Apply per-job overrides on top of the configured backend and model size.
+
+        Raises:
+            ValueError: If the backend or model size is not supported.
+        """
+        backend = backend or self.backend_name
+        model = model or self.model_size
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown STT backend '{backend}'. Available: {sorted(BACKENDS)}")
+        if model not in MODEL_SIZES:
+            raise ValueError(f"Unknown STT model '{model}'. Available: {sorted(MODEL_SIZES)}")
+        return backend, model
 
-    async def transcribe(self, file_path: str) -> dict:
+    def cache_params(self, backend: str, streaming: bool) -> dict:
+        """Decoding parameters that change the transcript, used as part of the STT cache key."""
+        params = {"streaming": streaming}
+        if streaming:
+            params["chunk_seconds"] = settings.STT_CHUNK_SECONDS
+            params["chunk_max_seconds"] = settings.STT_CHUNK_MAX_SECONDS
+        if backend == "faster-whisper":
+            params["compute_type"] = settings.STT_COMPUTE_TYPE
+        return params
+
+    async def submit(self, file_path: str, backend: str | None = None, model: str | None = None) -> asyncio.Future:
+        """
+        Enqueue a transcription job, waiting for room if the queue is full.
+        `backend` / `model` override STT_BACKEND / STT_MODEL for this job only.
+
+        Returns: an awaitable future resolving to {"text": str, "language": str, "segments": list, "backend": str, "model": str}
         """
-        Transcribes audio from a file path using the local Whisper model.
-        Accepts the actual file path so Whisper/ffmpeg can detect the format
+        if not os.path.exists(file_path):
+            raise RuntimeError(f"Audio file not found: {file_path}")
+        backend, model = self.resolve_options(backend, model)
+        return await self._enqueue(_transcribe_in_worker, file_path, None, backend, model)
+
+    async def transcribe(self, file_path: str, backend: str | None = None, model: str | None = None) -> dict:
+        """
+        Transcribes audio from a file path using the STT worker pool.
+        Accepts the actual file path so ffmpeg can detect the format
         from the file extension correctly (webm, ogg, mp4, wav, etc.)
 
-        Returns: {"text": str, "language": str}
+        Returns: {"text": str, "language": str, "segments": list, "backend": str, "model": str}
+        """
+        future = await self.submit(file_path, backend, model)
+        return await future
+
+    async def transcribe_stream(
+        self,
+        file_path: str,
+        on_partial: Callable[[str, int, int], Awaitable[None]] | None = None,
+        backend: str | None = None,
+        model: str | None = None,
+    ) -> dict:
+        """
+        Transcribe long recordings as silence-bounded chunks spread across all workers.
+
+        Chunks are stitched back in order; every time the contiguous prefix of finished
+        chunks grows, `on_partial(text_so_far, chunks_done, chunks_total)` is awaited so
+        callers can surface progress. Recordings shorter than STT_STREAMING_MIN_SECONDS
+        are transcribed in a single job.
+
+        Returns: {"text": str, "language": str, "segments": list, "backend": str, "model": str, "chunks": int}
         """
         if not os.path.exists(file_path):
             raise RuntimeError(f"Audio file not found: {file_path}")
+        backend, model = self.resolve_options(backend, model)
 
+        plan_future = await self._enqueue(
+            _plan_chunks_in_worker, file_path, settings.STT_CHUNK_SECONDS, settings.STT_CHUNK_MAX_SECONDS
+        )
+        plan = await plan_future
+        waveform_path = plan["waveform_path"]
+        spans = plan["spans"]
         try:
-            result = self.model.transcribe(
-                file_path,
-                fp16=False,                        # Required on CPU / Windows
-                task="transcribe",
-                condition_on_previous_text=False,  # Prevents hallucination loops on long audio
-                verbose=False,
-            )
-            transcript = result["text"]
-            language = result.get("language", "unknown")
-            return {"text": transcript.strip(), "language": language}
-
-        except Exception as e:
-            print(f"Error in STT for file '{file_path}': {e}")
-            raise RuntimeError(f"Transcription failed: {str(e)}") from e
+            if plan["duration"] < settings.STT_STREAMING_MIN_SECONDS or len(spans) <= 1:
+                whole = await self._enqueue(
+                    _transcribe_in_worker, waveform_path, (0, spans[-1][1] if spans else 0), backend, model
+                )
+                result = await whole
+                return {**result, "chunks": 1}
+
+            async def run_chunk(index: int, span: tuple[int, int]) -> tuple[int, dict]:
+                future = await self._enqueue(_transcribe_in_worker, waveform_path, span, backend, model)
+                return index, await future
+
+            tasks = [asyncio.create_task(run_chunk(i, span)) for i, span in enumerate(spans)]
+            texts: list[str | None] = [None] * len(spans)
+            chunk_segments: list[list] = [[] for _ in spans]
+            languages = Counter()
+            stitched = 0
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    index, result = await next_done
+                    texts[index] = result["text"]
+                    chunk_segments[index] = result.get("segments", [])
+                    start, end = spans[index]
+                    languages[result["language"]] += end - start
+
+                    advanced = False
+                    while stitched < len(texts) and texts[stitched] is not None:
+                        stitched += 1
+                        advanced = True
+                    if advanced and on_partial is not None:
+                        partial = " ".join(t for t in texts[:stitched] if t)
+                        await on_partial(partial, stitched, len(spans))
+            except Exception:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+            return {
+                "text": " ".join(t for t in texts if t).strip(),
+                # The language spoken for most of the recording wins
+                "language": languages.most_common(1)[0][0] if languages else "unknown",
+                "segments": [seg for segments in chunk_segments for seg in segments],
+                "backend": backend,
+                "model": model,
+                "chunks": len(spans),
+            }
+        finally:
+            if os.path.exists(waveform_path):
+                os.remove(waveform_path)
+
+    async def warm_up(self) -> None:
+        """
+        Spawn every worker and wait until each has loaded its model.
+        Used when STT_PRELOAD is enabled so the first upload does not pay the load cost.
+        """
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _ping_worker) for _ in range(self.workers)
+        ])
+        print(f"STT workers ready: {sorted(set(pids))}")
+
+    @property
+    def started(self) -> bool:
+        """Whether the worker pool has been spawned in this process."""
+        return self._executor is not None
+
+    def shutdown(self) -> None:
+        """Cancel dispatchers and stop the worker processes."""
+        for task in self._dispatchers:
+            task.cancel()
+        self._dispatchers = []
+        self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
 stt_service = STTService()
@@ -0,0 +1,312 @@
+import os
+import time
+import uuid
+import asyncio
+import aiofiles
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+
+from config import settings
+from db.mongo import db
+from services.audio_service import UPLOAD_DIR, UPLOAD_TMP_DIR
+from services.stt_cache import hash_file
+
+class UploadSessionError(ValueError):
+    """Base error for resumable upload sessions."""
+
+class UploadSessionNotFound(UploadSessionError):
+    """Raised when a session does not exist, has expired, or belongs to someone else."""
+
+class UploadOffsetMismatch(UploadSessionError):
+    """Raised when a chunk does not start at the session's committed offset."""
+    def __init__(self, expected_offset: int) -> None:
+        super().__init__(f"Chunk must start at offset {expected_offset}")
+        self.expected_offset = expected_offset
+
+class UploadIncomplete(UploadSessionError):
+    """Raised when finalizing a session that has not received every byte."""
+
+class UploadChunkInProgress(UploadSessionError):
+    """Raised when another request is still writing the chunk at the committed offset."""
+
+class UploadSessionService:
+    """
+    Resumable upload protocol: create a session, PUT chunks at byte offsets, then finalize.
+
+    Session state (committed offset, declared size, form fields) lives in the
+    `upload_sessions` collection and bytes accumulate in a part file under
+    UPLOAD_TMP_DIR, so any API worker sharing the volume can accept the next chunk.
+    A chunk only counts once the offset update is committed in Mongo; a chunk
+    interrupted half-way is simply overwritten by the client's retry.
+
+    Writers and finalizers hold time-limited claims on the session document
+    (`writer`, status "finalizing"), so a request that dies mid-way only blocks
+    the session until its claim goes stale.
+    """
+
+    def __init__(self) -> None:
+        self._next_cleanup = 0.0
+
+    def _part_path(self, session_id: str) -> str:
+        return os.path.join(UPLOAD_TMP_DIR, f"{session_id}.part")
+
+    async def cleanup_orphans(self) -> int:
+        """
+        Delete part files whose session has expired or is gone.
+
+        The TTL index drops expired session documents but knows nothing about the
+        bytes on disk. Part files younger than the chunk lease are kept, since
+        `create_session` writes the file before inserting its document.
+
+        Returns:
+            int: Number of part files removed.
+        """
+        if not os.path.isdir(UPLOAD_TMP_DIR):
+            return 0
+        parts = {
+            name[:-len(".part")]: os.path.join(UPLOAD_TMP_DIR, name)
+            for name in os.listdir(UPLOAD_TMP_DIR) if name.endswith(".part")
+        }
+        if not parts:
+            return 0
+        live = await db.db.upload_sessions.distinct(
+            "_id", {"_id": {"$in": list(parts)}, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+        cutoff = time.time() - settings.UPLOAD_CHUNK_LEASE_SECONDS
+        removed = 0
+        for session_id, path in parts.items():
+            if session_id in live:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    async def create_session(self, owner: str | None, ext: str, content_type: str, total_size: int, fields: dict) -> dict:
+        """
+        Open a new upload session.
+
+        Args:
+            owner (str | None): Authenticated user ID allowed to continue the session.
+            ext (str): Final file extension derived from the MIME type.
+            content_type (str): Declared MIME type.
+            total_size (int): Exact number of bytes the client will send.
+            fields (dict): Form fields (contributor, state, city, consent) applied on finalize.
+
+        Returns:
+            dict: The stored session document.
+        """
+        if time.monotonic() >= self._next_cleanup:
+            self._next_cleanup = time.monotonic() + settings.UPLOAD_CLEANUP_INTERVAL_SECONDS
+            await self.cleanup_orphans()
+
+        os.makedirs(UPLOAD_TMP_DIR, exist_ok=True)
+        session_id = str(uuid.uuid4())
+        # Touch the part file so every worker sees the session's storage from the start
+        async with aiofiles.open(self._part_path(session_id), 'wb'):
+            pass
+
+        now = datetime.utcnow()
+        session = {
+            "_id": session_id,
+            "owner": owner,
+            "ext": ext,
+            "content_type": content_type,
+            "total_size": total_size,
+            "offset": 0,
+            "status": "active",
+            "writer": None,
+            "fields": fields,
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        }
+        await db.db.upload_sessions.insert_one(session)
+        return session
+
+    async def get_session(self, session_id: str, owner: str | None) -> dict:
+        """
+        Fetch a session owned by `owner`.
+
+        Raises:
+            UploadSessionNotFound: If missing, expired, or owned by another user.
+        """
+        session = await db.db.upload_sessions.find_one({"_id": session_id})
+        if not session or session.get("owner") != owner or session["expires_at"] < datetime.utcnow():
+            raise UploadSessionNotFound(f"Upload session {session_id} not found")
+        return session
+
+    async def append_chunk(self, session: dict, offset: int, body: AsyncIterator[bytes]) -> int:
+        """
+        Write a chunk at `offset` and commit the new offset.
+
+        Args:
+            session (dict): Active session document.
+            offset (int): Byte offset the client believes it is resuming from.
+            body (AsyncIterator[bytes]): Request body stream for the chunk.
+
+        Returns:
+            int: The committed offset after this chunk.
+
+        Raises:
+            UploadOffsetMismatch: If `offset` is not the committed offset.
+            UploadChunkInProgress: If another request is writing at this offset.
+            UploadSessionError: If the chunk is too large or overruns the declared size.
+        """
+        if session["status"] != "active":
+            raise UploadSessionError("Upload session is already finalized")
+        if offset != session["offset"]:
+            raise UploadOffsetMismatch(session["offset"])
+
+        # Lease the session before touching the part file, so two PUTs at the same
+        # offset can't interleave their writes; _write_chunk renews it while bytes arrive
+        now = datetime.utcnow()
+        writer = str(uuid.uuid4())
+        leased = await db.db.upload_sessions.find_one_and_update(
+            {
+                "_id": session["_id"], "offset": offset, "status": "active",
+                "$or": [{"writer": None}, {"writer_expires_at": {"$lt": now}}]
+            },
+            {"$set": {
+                "writer": writer,
+                "writer_expires_at": now + timedelta(seconds=settings.UPLOAD_CHUNK_LEASE_SECONDS)
+            }}
+        )
+        if leased is None:
+            current = await db.db.upload_sessions.find_one({"_id": session["_id"]}, {"offset": 1})
+            if current is None or current["offset"] == offset:
+                raise UploadChunkInProgress("Another request is uploading this chunk")
+            raise UploadOffsetMismatch(current["offset"])
+
+        try:
+            written = await self._write_chunk(session, offset, body, writer)
+        except BaseException:
+            await db.db.upload_sessions.update_one(
+                {"_id": session["_id"], "writer": writer}, {"$set": {"writer": None}}
+            )
+            raise
+
+        new_offset = offset + written
+        committed = await db.db.upload_sessions.find_one_and_update(
+            {"_id": session["_id"], "writer": writer},
+            {"$set": {"offset": new_offset, "writer": None, "updated_at": datetime.utcnow()}}
+        )
+        if committed is None:
+            # Our lease expired and another request took over the offset
+            current = await db.db.upload_sessions.find_one({"_id": session["_id"]}, {"offset": 1})
+            raise UploadOffsetMismatch(current["offset"] if current else 0)
+        return new_offset
+
+    async def _renew(self, session_id: str, writer: str) -> None:
+        """Extend the writer lease, or raise if a retry has taken the session over."""
+        renewed = await db.db.upload_sessions.find_one_and_update(
+            {"_id": session_id, "writer": writer},
+            {"$set": {"writer_expires_at": datetime.utcnow() + timedelta(seconds=settings.UPLOAD_CHUNK_LEASE_SECONDS)}}
+        )
+        if renewed is None:
+            raise UploadChunkInProgress("A newer request took over this chunk")
+
+    async def _write_chunk(self, session: dict, offset: int, body: AsyncIterator[bytes], writer: str) -> int:
+        # Renewed before any write that would otherwise fall in the last two thirds of the
+        # lease, so bytes are never written after another request could have taken over
+        renew_every = settings.UPLOAD_CHUNK_LEASE_SECONDS / 3
+        renewed_at = time.monotonic()
+        written = 0
+        async with aiofiles.open(self._part_path(session["_id"]), 'r+b') as out_file:
+            await out_file.seek(offset)
+            # Drop bytes from any previously interrupted attempt at this offset
+            await out_file.truncate(offset)
+            async for data in body:
+                written += len(data)
+                if written > settings.UPLOAD_CHUNK_MAX_BYTES:
+                    raise UploadSessionError(f"Chunk exceeds {settings.UPLOAD_CHUNK_MAX_BYTES} bytes")
+                if offset + written > session["total_size"]:
+                    raise UploadSessionError("Chunk overruns the declared upload size")
+                if time.monotonic() - renewed_at >= renew_every:
+                    await self._renew(session["_id"], writer)
+                    renewed_at = time.monotonic()
+                await out_file.write(data)
+        return written
+
+    async def complete(self, session: dict, min_size: int) -> dict:
+        """
+        Move a fully received upload into UPLOAD_DIR.
+
+        A finalize that died part-way leaves the session "finalizing"; once that claim is
+        older than UPLOAD_FINALIZE_STALE_SECONDS a retry takes it over and reuses the
+        filename and record ID chosen by the first attempt. Errors roll the session back
+        to "active" so the client can retry straight away.
+
+        Returns:
+            dict: {"audio_url": str, "filename": str, "size": int, "sha256": str, "record_id": str}
+
+        Raises:
+            UploadIncomplete: If bytes are missing or the upload is below `min_size`.
+            UploadSessionError: If another request is already finalizing the session.
+        """
+        if session["offset"] != session["total_size"]:
+            raise UploadIncomplete(f"Received {session['offset']} of {session['total_size']} bytes")
+        if session["total_size"] < min_size:
+            raise UploadIncomplete(f"Upload is only {session['total_size']} bytes")
+
+        # Claim the session so concurrent finalize calls can't both move the part file
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.UPLOAD_FINALIZE_STALE_SECONDS)
+        claimed = await db.db.upload_sessions.find_one_and_update(
+            {
+                "_id": session["_id"],
+                "$and": [
+                    {"$or": [{"writer": None}, {"writer_expires_at": {"$lt": now}}]},
+                    {"$or": [{"status": "active"}, {"status": "finalizing", "updated_at": {"$lt": stale}}]},
+                ]
+            },
+            {"$set": {"status": "finalizing", "updated_at": now}}
+        )
+        if claimed is None:
+            raise UploadSessionError("Upload session is already being finalized")
+
+        try:
+            filename = claimed.get("filename") or f"{uuid.uuid4()}_recording.{session['ext']}"
+            record_id = claimed.get("pending_record_id") or str(uuid.uuid4())
+            await db.db.upload_sessions.update_one(
+                {"_id": session["_id"]}, {"$set": {"filename": filename, "pending_record_id": record_id}}
+            )
+
+            part_path = self._part_path(session["_id"])
+            final_path = os.path.join(UPLOAD_DIR, filename)
+            os.makedirs(UPLOAD_DIR, exist_ok=True)
+            if os.path.exists(part_path):
+                os.replace(part_path, final_path)
+            elif not os.path.exists(final_path):
+                raise UploadSessionError("Upload data is missing; start a new upload")
+            audio_hash = await asyncio.to_thread(hash_file, final_path)
+        except BaseException:
+            await self.release(session["_id"])
+            raise
+
+        return {
+            "audio_url": f"http://localhost:8000/uploads/{filename}",
+            "filename": filename,
+            "size": session["total_size"],
+            "sha256": audio_hash,
+            "record_id": record_id,
+        }
+
+    async def release(self, session_id: str) -> None:
+        """Return a session claimed by `complete` to "active" after a failed finalize."""
+        await db.db.upload_sessions.update_one(
+            {"_id": session_id, "status": "finalizing"},
+            {"$set": {"status": "active", "updated_at": datetime.utcnow()}}
+        )
+
+    async def mark_finalized(self, session_id: str, record_id: str) -> None:
+        """Record the knowledge ID created for a session so finalize retries are idempotent."""
+        await db.db.upload_sessions.update_one(
+            {"_id": session_id},
+            {"$set": {"status": "finalized", "record_id": record_id, "updated_at": datetime.utcnow()}}
+        )
+
+upload_session_service = UploadSessionService()
@@ -5,8 +5,13 @@ import os
 import wave
 import struct
 import math
+import glob
+import sys
+import argparse
 import psutil
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 def create_test_wav(filename="diagnostic_audio.wav"):
     # Create a 2-second synthesized speech-like audio (approx) or just a tone
     # For a real test, a tone is enough to check if the model runs without crashing
@@ -96,5 +101,94 @@ def analyze_whisper():
     else:
          print(f"\n[!] FAILURE REASON: {report['error']}")
 
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    # Word-level Levenshtein distance normalised by reference length
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+def load_fixtures(fixtures_dir):
+    # Each fixture is <name>.wav with the reference transcript in <name>.txt
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(fixtures_dir, "*.wav"))):
+        ref_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(ref_path):
+            print(f"   Skipping {wav_path}: no reference transcript")
+            continue
+        with wave.open(wav_path) as w:
+            duration = w.getnframes() / w.getframerate()
+        with open(ref_path, encoding="utf-8") as f:
+            fixtures.append({"path": wav_path, "duration": duration, "reference": f.read().strip()})
+    return fixtures
+
+def benchmark_backends(fixtures_dir, backend_names, model_sizes):
+    from services.stt_backends import load_backend
+
+    fixtures = load_fixtures(fixtures_dir)
+    if not fixtures:
+        print(f"No fixtures found in {fixtures_dir}")
+        return []
+
+    total_audio = sum(f["duration"] for f in fixtures)
+    print(f"Benchmarking on {len(fixtures)} fixtures ({total_audio:.1f}s of audio)")
+    process = psutil.Process(os.getpid())
+    rows = []
+    for backend_name in backend_names:
+        for model_size in model_sizes:
+            print(f"\n[{backend_name} / {model_size}]")
+            row = {"backend": backend_name, "model": model_size, "error": None}
+            try:
+                mem_before = process.memory_info().rss / 1024 / 1024
+                start = time.time()
+                backend = load_backend(backend_name, model_size)
+                row["load_time"] = round(time.time() - start, 2)
+
+                inference_time = 0.0
+                errors = []
+                peak_rss = process.memory_info().rss / 1024 / 1024
+                for fixture in fixtures:
+                    start = time.time()
+                    result = backend.transcribe(fixture["path"])
+                    inference_time += time.time() - start
+                    peak_rss = max(peak_rss, process.memory_info().rss / 1024 / 1024)
+                    errors.append(word_error_rate(fixture["reference"], result["text"]))
+
+                row["rtf"] = round(inference_time / total_audio, 3)
+                row["rss_mb"] = round(peak_rss - mem_before, 1)
+                row["wer"] = round(sum(errors) / len(errors), 3)
+                del backend
+            except Exception as e:
+                row["error"] = str(e)
+                print(f"   [ERROR] {e}")
+            rows.append(row)
+
+    print("\n" + "="*72)
+    print(f"{'Backend':<16}{'Model':<10}{'Load (s)':>10}{'RTF':>10}{'RSS (MB)':>12}{'WER':>10}")
+    print("="*72)
+    for row in rows:
+        if row["error"]:
+            print(f"{row['backend']:<16}{row['model']:<10}  FAILED: {row['error']}")
+        else:
+            print(f"{row['backend']:<16}{row['model']:<10}{row['load_time']:>10}{row['rtf']:>10}{row['rss_mb']:>12}{row['wer']:>10}")
+    print("\nRTF = inference time / audio duration (lower is faster; < 1 is faster than real time)")
+    return rows
+
 if __name__ == "__main__":
-    analyze_whisper()
+    parser = argparse.ArgumentParser(description="Whisper diagnostics and STT backend benchmark")
+    parser.add_argument("--benchmark", metavar="FIXTURES_DIR", help="Compare STT backends on <name>.wav/<name>.txt fixtures")
+    parser.add_argument("--backends", default="whisper,faster-whisper")
+    parser.add_argument("--models", default="tiny,small")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_backends(args.benchmark, args.backends.split(","), args.models.split(","))
+    else:
+        analyze_whisper()
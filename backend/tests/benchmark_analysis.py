@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent_manager import AgentManager
+from agents.telemetry import track
+
+# Used when no --texts directory is given
+SAMPLE_TEXTS = [
+    "My grandmother in Kerala would grind fresh neem leaves with turmeric into a paste and apply it to "
+    "cuts and insect bites. She said the bitterness drives out poison, and we children had to sit still "
+    "while it dried. Every monsoon she made a fresh batch and kept it in a brass pot.",
+    "Before sowing paddy in Tamil Nadu, farmers in our village would offer the first handful of seeds at "
+    "the village shrine and wait for the first rain after the Aadi month. The elders read the direction "
+    "of the wind and the flight of the cranes to decide the day of sowing.",
+    "In the Garhwal hills there is a story of a shepherd who sang to the mountain goddess every evening. "
+    "When a landslide threatened the village she sent his flock running down the valley, and the people "
+    "followed and were saved. Shepherds still sing that song when they take the flocks up in spring.",
+]
+
+def load_texts(directory: str | None) -> list[str]:
+    if not directory:
+        return SAMPLE_TEXTS
+    texts = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            if text := f.read().strip():
+                texts.append(text)
+    return texts
+
+async def run_mode(manager: AgentManager, mode: str, text: str) -> dict:
+    # Every LLM call made inside the block (fused call, or the three separate ones) is accounted together
+    with track(f"analysis_{mode}") as timing:
+        result = await manager.process_analysis(text, mode=mode)
+    extraction = result["extraction"] or {}
+    return {
+        "latency_ms": timing.latency_ms,
+        "llm_calls": timing.llm_calls,
+        "input_tokens": timing.input_tokens,
+        "output_tokens": timing.output_tokens,
+        "valid": bool(extraction.get("title")) and "category" in (result["categorization"] or {}),
+    }
+
+async def benchmark(texts: list[str], runs: int) -> dict:
+    manager = AgentManager()
+    rows = {"separate": [], "fused": []}
+    for _ in range(runs):
+        for text in texts:
+            # Alternate the order so neither mode consistently benefits from a warm connection
+            for mode in ("separate", "fused") if len(rows["fused"]) % 2 == 0 else ("fused", "separate"):
+                rows[mode].append(await run_mode(manager, mode, text))
+    return rows
+
+def summarize(rows: list[dict]) -> dict:
+    latencies = sorted(r["latency_ms"] for r in rows)
+    return {
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+        "calls": round(statistics.mean(r["llm_calls"] for r in rows), 2),
+        "input_tokens": round(statistics.mean(r["input_tokens"] for r in rows)),
+        "output_tokens": round(statistics.mean(r["output_tokens"] for r in rows)),
+        "valid": f"{sum(r['valid'] for r in rows)}/{len(rows)}",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="A/B latency and token cost: fused analysis vs three separate agents")
+    parser.add_argument("--texts", help="Directory of .txt transcripts (defaults to built-in samples)")
+    parser.add_argument("--runs", type=int, default=3, help="Passes over the texts per mode")
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts)
+    print(f"Benchmarking {len(texts)} texts x {args.runs} runs against the live Groq API...")
+    rows = asyncio.run(benchmark(texts, args.runs))
+
+    print("\n" + "=" * 86)
+    print(f"{'Mode':<10}{'p50 (ms)':>11}{'p95 (ms)':>11}{'LLM calls':>11}{'In tokens':>12}{'Out tokens':>12}{'Valid':>10}")
+    print("=" * 86)
+    summary = {mode: summarize(r) for mode, r in rows.items()}
+    for mode, s in summary.items():
+        print(f"{mode:<10}{s['p50_ms']:>11}{s['p95_ms']:>11}{s['calls']:>11}{s['input_tokens']:>12}{s['output_tokens']:>12}{s['valid']:>10}")
+
+    separate, fused = summary["separate"], summary["fused"]
+    if separate["input_tokens"]:
+        print(f"\nInput tokens saved by fusing: {1 - fused['input_tokens'] / separate['input_tokens']:.0%}")
+    if separate["p50_ms"]:
+        print(f"Median latency change: {fused['p50_ms'] / separate['p50_ms'] - 1:+.0%}")
+
+if __name__ == "__main__":
+    main()
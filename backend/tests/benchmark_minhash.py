@@ -0,0 +1,83 @@
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.minhash import signature, lsh_buckets, similarity, NUM_PERM
+from config import settings
+
+def synthetic_corpus(records: int, words: int, vocabulary: int, rng: random.Random) -> list[list[str]]:
+    vocab = [f"w{i}" for i in range(vocabulary)]
+    return [rng.choices(vocab, k=words) for _ in range(records)]
+
+def perturb(words: list[str], rate: float, rng: random.Random) -> list[str]:
+    """A re-recording of the same story: a few words heard differently by STT."""
+    return [f"x{rng.randrange(10**6)}" if rng.random() < rate else w for w in words]
+
+def percentile(values: list[float], pct: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * pct))]
+
+def main():
+    parser = argparse.ArgumentParser(description="MinHash/LSH re-upload lookup over a synthetic archive")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=150, help="Words per synthetic transcript")
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--perturb", type=float, default=0.02, help="Share of words changed in a re-upload")
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    corpus = synthetic_corpus(args.records, args.words, args.vocabulary, rng)
+    start = time.perf_counter()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    signatures = np.empty((args.records, NUM_PERM), dtype=np.uint32)
+    # Stands in for the multikey MongoDB index on `lsh_buckets`
+    table: dict[str, list[int]] = {}
+    for i, words in enumerate(corpus):
+        signatures[i] = signature(" ".join(words))
+        for key in lsh_buckets(signatures[i]):
+            table.setdefault(key, []).append(i)
+    # ru_maxrss is in KiB on Linux
+    index_mib = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    build = time.perf_counter() - start
+    print(f"Indexed {args.records} records in {build:.1f}s ({build / args.records * 1e6:.0f} us each)")
+    print(f"Memory: signatures {signatures.nbytes / 2**20:.1f} MiB, with the in-process bucket table {index_mib:.1f} MiB")
+    print(f"Stored per record: {NUM_PERM * 8} B minhash + {sum(len(k) for k in lsh_buckets(signatures[0]))} B lsh_buckets")
+
+    def query(text: str) -> tuple[list[int], int]:
+        sig = signature(text)
+        candidates = {i for key in lsh_buckets(sig) for i in table.get(key, ())}
+        hits = [i for i in candidates if similarity(sig, signatures[i]) >= settings.DUPLICATION_MINHASH_SIMILARITY]
+        return hits, len(candidates)
+
+    originals = rng.sample(range(args.records), args.queries)
+    for label, texts, expected in (
+        ("re-uploads", [" ".join(perturb(corpus[i], args.perturb, rng)) for i in originals], originals),
+        ("new stories", [" ".join(words) for words in synthetic_corpus(args.queries, args.words, args.vocabulary, rng)], None),
+    ):
+        latencies, found, flagged, candidates = [], 0, 0, 0
+        for n, text in enumerate(texts):
+            start = time.perf_counter()
+            hits, checked = query(text)
+            latencies.append((time.perf_counter() - start) * 1e3)
+            flagged += bool(hits)
+            found += expected is not None and expected[n] in hits
+            candidates += checked
+        result = f"recall {found / len(texts):.1%}" if expected is not None else f"false positives {flagged / len(texts):.1%}"
+        print(f"{label:12} p50 {percentile(latencies, 0.5):.2f} ms  p95 {percentile(latencies, 0.95):.2f} ms  "
+              f"{candidates / len(texts):.1f} candidates/query  {result}")
+
+    # For comparison: estimating similarity against every signature, as without the buckets
+    sig = signature(" ".join(corpus[originals[0]]))
+    start = time.perf_counter()
+    np.count_nonzero(signatures == sig, axis=1)
+    print(f"Brute-force scan of all signatures: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.prompts import ChatPromptTemplate
+from agents.agent_manager import AgentManager
+from routers.processing import verification_agents, score_aggregator_agent, fused_verification_agent
+
+def per_call_us(fn, iterations: int) -> float:
+    fn()  # first call pays the one-off compilation in the precompiled case
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call prompt/chain overhead: rebuilt every call vs precompiled")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    manager = AgentManager()
+    agents = [*manager.agents.values(), *verification_agents, score_aggregator_agent, fused_verification_agent]
+    print(f"{'agent:prompt':34} {'rebuilt us':>11} {'compiled us':>12} {'speedup':>8}")
+    total_before = total_after = 0.0
+    for agent in agents:
+        for name, template in agent.PROMPTS.items():
+            inputs = {var: "x" for var in agent.prompt(name).input_variables}
+
+            def rebuilt():
+                # What every process() call did before: parse the template and compose a new chain
+                chain = ChatPromptTemplate.from_template(template) | agent.llm
+                chain.first.invoke(inputs)
+
+            def compiled():
+                chain = agent.chain(name)
+                chain.first.invoke(inputs)
+
+            before, after = per_call_us(rebuilt, args.iterations), per_call_us(compiled, args.iterations)
+            total_before += before
+            total_after += after
+            print(f"{agent.name + ':' + name:34} {before:11.1f} {after:12.1f} {before / after:7.1f}x")
+    print(f"{'all prompts':34} {total_before:11.1f} {total_after:12.1f} {total_before / total_after:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import json
+
+# Each scenario runs in a fresh interpreter so module caches and page cache
+# effects from one run don't leak into the next.
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PROBE = r"""
+import json, os, time, sys
+import psutil
+start = time.perf_counter()
+import main
+if os.environ.get("BENCH_EAGER_WHISPER") == "1":
+    # Reproduces the old behaviour: STTService() loaded the model at import time
+    import whisper
+    from config import settings
+    whisper.load_model(settings.STT_MODEL)
+elapsed = time.perf_counter() - start
+rss = psutil.Process(os.getpid()).memory_info().rss
+print(json.dumps({
+    "import_seconds": round(elapsed, 3),
+    "rss_mb": round(rss / 1024 / 1024, 1),
+    "torch_loaded": "torch" in sys.modules,
+    "whisper_loaded": "whisper" in sys.modules,
+}))
+"""
+
+def run_scenario(eager: bool) -> dict:
+    env = dict(os.environ, BENCH_EAGER_WHISPER="1" if eager else "0")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def benchmark_startup(runs: int = 3):
+    print("Measuring cold boot of the API process (import main)...")
+    results = {"eager (before)": [], "lazy (after)": []}
+    for _ in range(runs):
+        results["eager (before)"].append(run_scenario(eager=True))
+        results["lazy (after)"].append(run_scenario(eager=False))
+
+    print("\n" + "=" * 60)
+    print(f"{'Scenario':<16}{'Boot (s)':>12}{'RSS (MB)':>16}{'torch loaded':>16}")
+    print("=" * 60)
+    for name, samples in results.items():
+        boot = min(s["import_seconds"] for s in samples)
+        rss = min(s["rss_mb"] for s in samples)
+        print(f"{name:<16}{boot:>12}{rss:>16}{str(samples[0]['torch_loaded']):>16}")
+
+if __name__ == "__main__":
+    benchmark_startup()
@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+def create_app(rpm: int = 30, window_seconds: float = 60.0, latency: float = 0.0, content: str = '{"ok": true}') -> FastAPI:
+    """
+    Minimal stand-in for Groq's OpenAI-compatible chat endpoint.
+
+    Allows `rpm` requests per sliding `window_seconds`; anything above gets a 429 with a
+    Retry-After header, like the real API. `"stream": true` requests get the content back
+    as server-sent chunks of a few characters, with usage on the last one. Point the
+    backend at it with GROQ_BASE_URL=http://localhost:<port>, or mount it on an
+    httpx.ASGITransport in tests.
+    """
+    app = FastAPI()
+    app.state.accepted = deque()
+    app.state.stats = {"requests": 0, "completed": 0, "rate_limited": 0, "in_flight": 0, "max_in_flight": 0}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats, accepted = app.state.stats, app.state.accepted
+        stats["requests"] += 1
+
+        now = time.monotonic()
+        while accepted and now - accepted[0] >= window_seconds:
+            accepted.popleft()
+        if len(accepted) >= rpm:
+            stats["rate_limited"] += 1
+            retry_after = window_seconds - (now - accepted[0])
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": f"{retry_after:.3f}"},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            )
+        accepted.append(now)
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats["in_flight"] -= 1
+        stats["completed"] += 1
+
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        base = {
+            "id": f"chatcmpl-fake-{stats['requests']}",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+        }
+        if body.get("stream"):
+            return StreamingResponse(_sse_chunks(base, content, usage), media_type="text/event-stream")
+        return {
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    @app.get("/openai/v1/models")
+    async def list_models():
+        app.state.stats["model_listings"] = app.state.stats.get("model_listings", 0) + 1
+        return {"object": "list", "data": [{"id": "llama-3.3-70b-versatile", "object": "model"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+async def _sse_chunks(base: dict, content: str, usage: dict, size: int = 8):
+    def event(delta: dict, finish_reason: str | None = None, **extra) -> str:
+        chunk = {**base, "object": "chat.completion.chunk",
+                 "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    yield event({"role": "assistant", "content": ""})
+    for i in range(0, len(content), size):
+        yield event({"content": content[i:i + size]})
+        await asyncio.sleep(0)
+    yield event({}, "stop", x_groq={"usage": usage})
+    yield "data: [DONE]\n\n"
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Groq server for rate-limit testing")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--rpm", type=int, default=30, help="Requests accepted per window before answering 429")
+    parser.add_argument("--window", type=float, default=60.0, help="Sliding window length in seconds")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds each completion takes")
+    parser.add_argument("--content", default=json.dumps({"ok": True}), help="Assistant message returned")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.rpm, args.window, args.latency, args.content), port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import copy
+import uuid
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+_MISSING = object()
+
+def _get(doc: dict, path: str) -> Any:
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _set(doc: dict, path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+def _unset(doc: dict, path: str) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(last, None)
+
+def _equals(value: Any, expected: Any) -> bool:
+    if value is _MISSING:
+        return expected is None
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+def _compare(value: Any, op: str, arg: Any) -> bool:
+    values = value if isinstance(value, list) else [value]
+    if op == "$eq":
+        return _equals(value, arg)
+    if op == "$ne":
+        return not _equals(value, arg)
+    if op == "$in":
+        return any(_equals(value, a) for a in arg)
+    if op == "$nin":
+        return not any(_equals(value, a) for a in arg)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$type":
+        return arg == "string" and isinstance(value, str)
+    if op in ("$lt", "$lte", "$gt", "$gte"):
+        check = {"$lt": lambda v: v < arg, "$lte": lambda v: v <= arg, "$gt": lambda v: v > arg, "$gte": lambda v: v >= arg}[op]
+        return any(v is not _MISSING and v is not None and check(v) for v in values)
+    raise NotImplementedError(f"fake_mongo does not support {op}")
+
+def matches(doc: dict, query: dict) -> bool:
+    """Whether `doc` satisfies a MongoDB filter (the subset of operators the backend uses)."""
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict) and cond and all(op.startswith("$") for op in cond):
+            if not all(_compare(_get(doc, key), op, arg) for op, arg in cond.items()):
+                return False
+        elif not _equals(_get(doc, key), cond):
+            return False
+    return True
+
+def _project(doc: dict, projection: dict | None) -> dict:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    include_id = projection.get("_id", 1)
+    fields = [key for key, keep in projection.items() if keep and key != "_id"]
+    if fields:
+        projected = {key: doc[key] for key in fields if key in doc}
+        if include_id and "_id" in doc:
+            projected["_id"] = doc["_id"]
+        return projected
+    return {key: value for key, value in doc.items() if projection.get(key, 1)}
+
+class FakeCursor:
+    def __init__(self, docs: List[dict]) -> None:
+        self.docs = docs
+
+    def sort(self, key, direction: int = 1) -> "FakeCursor":
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self.docs.sort(key=lambda doc: (_get(doc, field) is _MISSING, _get(doc, field)), reverse=order < 0)
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        if count:
+            self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length: int | None = None) -> List[dict]:
+        return self.docs if length is None else self.docs[:length]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+class FakeCollection:
+    """
+    In-memory stand-in for a Motor collection, for unit tests without a MongoDB server.
+
+    `unique` lists (field, partial filter) pairs enforced like unique (partial) indexes:
+    inserts and updates that would break one raise DuplicateKeyError.
+    """
+    def __init__(self, docs: List[dict] | None = None, unique: List[Tuple[str, dict]] = ()) -> None:
+        self.docs: List[dict] = [copy.deepcopy(doc) for doc in docs or []]
+        self.unique = [("_id", {}), *unique]
+
+    def _check_unique(self, doc: dict) -> None:
+        for field, partial in self.unique:
+            if not matches(doc, partial) or _get(doc, field) is _MISSING:
+                continue
+            for other in self.docs:
+                if other is not doc and matches(other, partial) and _get(other, field) == _get(doc, field):
+                    raise DuplicateKeyError(f"E11000 duplicate key error on {field}")
+
+    def _apply(self, doc: dict, update: dict, inserting: bool = False) -> None:
+        for path, value in update.get("$set", {}).items():
+            _set(doc, path, copy.deepcopy(value))
+        for path in update.get("$unset", {}):
+            _unset(doc, path)
+        for path, amount in update.get("$inc", {}).items():
+            current = _get(doc, path)
+            _set(doc, path, (0 if current is _MISSING else current) + amount)
+        if inserting:
+            for path, value in update.get("$setOnInsert", {}).items():
+                _set(doc, path, copy.deepcopy(value))
+
+    def _find(self, query: dict, sort=None) -> List[dict]:
+        found = [doc for doc in self.docs if matches(doc, query or {})]
+        if sort:
+            found = FakeCursor(found).sort(sort).docs
+        return found
+
+    async def insert_one(self, document: dict) -> SimpleNamespace:
+        doc = copy.deepcopy(document)
+        doc.setdefault("_id", str(uuid.uuid4()))
+        self._check_unique(doc)
+        self.docs.append(doc)
+        document.setdefault("_id", doc["_id"])
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def find_one(self, query: dict | None = None, projection: dict | None = None, sort=None) -> dict | None:
+        found = self._find(query, sort)
+        return _project(found[0], projection) if found else None
+
+    def find(self, query: dict | None = None, projection: dict | None = None) -> FakeCursor:
+        return FakeCursor([_project(doc, projection) for doc in self._find(query)])
+
+    async def _update(self, query: dict, update: dict, upsert: bool, many: bool) -> Tuple[SimpleNamespace, dict | None, dict | None]:
+        targets = self._find(query)[: None if many else 1]
+        before = None
+        for doc in targets:
+            snapshot = copy.deepcopy(doc)
+            before = before or snapshot
+            self._apply(doc, update)
+            try:
+                self._check_unique(doc)
+            except DuplicateKeyError:
+                doc.clear()
+                doc.update(snapshot)
+                raise
+        modified = sum(1 for doc in targets if doc != before) if not many else len(targets)
+        if targets or not upsert:
+            return SimpleNamespace(matched_count=len(targets), modified_count=modified, upserted_id=None), before, targets[0] if targets else None
+
+        doc = {key: copy.deepcopy(value) for key, value in query.items()
+               if not key.startswith("$") and not (isinstance(value, dict) and any(k.startswith("$") for k in value))}
+        self._apply(doc, update, inserting=True)
+        doc.setdefault("_id", str(uuid.uuid4()))
+        self._check_unique(doc)
+        self.docs.append(doc)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"]), None, doc
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False) -> SimpleNamespace:
+        return (await self._update(query, update, upsert, many=False))[0]
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False) -> SimpleNamespace:
+        return (await self._update(query, update, upsert, many=True))[0]
+
+    async def find_one_and_update(self, query: dict, update: dict, projection: dict | None = None, sort=None,
+                                  upsert: bool = False, return_document: bool = False) -> dict | None:
+        if sort:
+            target = self._find(query, sort)[:1]
+            if target:
+                query = {"_id": target[0]["_id"]}
+        _, before, after = await self._update(query, update, upsert, many=False)
+        result = after if return_document else before
+        return _project(result, projection) if result is not None else None
+
+    async def delete_one(self, query: dict) -> SimpleNamespace:
+        found = self._find(query)[:1]
+        for doc in found:
+            self.docs.remove(doc)
+        return SimpleNamespace(deleted_count=len(found))
+
+    async def delete_many(self, query: dict) -> SimpleNamespace:
+        found = self._find(query)
+        self.docs = [doc for doc in self.docs if doc not in found]
+        return SimpleNamespace(deleted_count=len(found))
+
+    async def count_documents(self, query: dict) -> int:
+        return len(self._find(query))
+
+    async def distinct(self, key: str, query: dict | None = None) -> List[Any]:
+        values = []
+        for doc in self._find(query):
+            value = _get(doc, key)
+            if value is not _MISSING and value not in values:
+                values.append(value)
+        return values
+
+class FakeDatabase:
+    """Collections are created on first access, like a real database."""
+    def __init__(self, **collections: FakeCollection) -> None:
+        self.__dict__.update(collections)
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        collection = FakeCollection()
+        setattr(self, name, collection)
+        return collection
@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import psutil
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi import UploadFile
+from services.audio_service import audio_service
+
+MIN_FILE_SIZE = 1024
+MAX_FILE_SIZE = 25 * 1024 * 1024
+
+def make_upload(source_path: str) -> UploadFile:
+    # Starlette hands handlers a file-backed UploadFile once a part exceeds its spool size,
+    # so a real file is the faithful stand-in for a multipart body here.
+    return UploadFile(file=open(source_path, "rb"), filename="recording.webm")
+
+async def legacy_upload(upload: UploadFile, filename: str) -> None:
+    # Previous path: read the whole body into memory, then write it out
+    content = await upload.read()
+    if len(content) < MIN_FILE_SIZE or len(content) > MAX_FILE_SIZE:
+        raise ValueError("size out of bounds")
+    await audio_service.upload_audio(content, filename)
+
+async def streaming_upload(upload: UploadFile, filename: str) -> None:
+    await audio_service.save_upload_stream(upload, filename, MIN_FILE_SIZE, MAX_FILE_SIZE)
+
+async def run_scenario(mode: str, concurrency: int, source_path: str) -> dict:
+    process = psutil.Process(os.getpid())
+    baseline = process.memory_info().rss
+    peak = baseline
+    stop = asyncio.Event()
+
+    async def sample_rss():
+        nonlocal peak
+        while not stop.is_set():
+            peak = max(peak, process.memory_info().rss)
+            await asyncio.sleep(0.005)
+
+    handler = legacy_upload if mode == "legacy" else streaming_upload
+    uploads = [make_upload(source_path) for _ in range(concurrency)]
+    sampler = asyncio.create_task(sample_rss())
+    start = time.perf_counter()
+    await asyncio.gather(*[handler(u, f"loadtest_{mode}_{i}.webm") for i, u in enumerate(uploads)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+    for u in uploads:
+        await u.close()
+
+    return {
+        "mode": mode,
+        "seconds": round(elapsed, 2),
+        "peak_rss_delta_mb": round((peak - baseline) / 1024 / 1024, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of concurrent uploads, legacy vs streaming")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--size-mb", type=float, default=25)
+    parser.add_argument("--mode", choices=["legacy", "streaming"])
+    parser.add_argument("--source")
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child process: run one scenario in isolation so RSS isn't polluted by the other
+        print(json.dumps(asyncio.run(run_scenario(args.mode, args.concurrency, args.source))))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="heritix_upload_load_")
+    source = os.path.join(workdir, "source.bin")
+    with open(source, "wb") as f:
+        f.write(os.urandom(int(args.size_mb * 1024 * 1024)))
+
+    print(f"{args.concurrency} concurrent uploads of {args.size_mb} MB each")
+    rows = []
+    try:
+        for mode in ("legacy", "streaming"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--source", source,
+                 "--concurrency", str(args.concurrency)],
+                cwd=workdir, capture_output=True, text=True, check=True
+            )
+            rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n" + "=" * 48)
+    print(f"{'Mode':<12}{'Time (s)':>12}{'Peak RSS delta (MB)':>24}")
+    print("=" * 48)
+    for row in rows:
+        print(f"{row['mode']:<12}{row['seconds']:>12}{row['peak_rss_delta_mb']:>24}")
+
+if __name__ == "__main__":
+    main()
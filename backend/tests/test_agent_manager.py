@@ -0,0 +1,182 @@
+import asyncio
+from types import SimpleNamespace
+from tenacity import wait_none
+
+from agents.agent_manager import AgentManager, execute_agent_scan
+from agents.base_agent import BaseAgent
+from agents.llm_client import LLMClientRegistry
+
+# No RPM/TPM budget, so the suite never waits on the shared registry's rate limits
+UNTHROTTLED = LLMClientRegistry(api_key="x", default_model="test-model")
+
+class SleepyAgent(BaseAgent):
+    cacheable = False  # timing stand-in; every call has to sleep
+
+    def __init__(self, name: str, delay: float = 0.05, fail: bool = False) -> None:
+        super().__init__(name, UNTHROTTLED)
+        self.delay = delay
+        self.fail = fail
+
+    async def process(self, input_data, **kwargs):
+        await asyncio.sleep(self.delay)
+        # Stand-in for an LLM response carrying usage metadata
+        await self._invoke(SimpleNamespace(ainvoke=self._respond), {})
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return {"agent": self.name}
+
+    async def _respond(self, inputs):
+        return SimpleNamespace(usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+
+def _manager(fail: str | None = None) -> AgentManager:
+    manager = AgentManager()
+    for name in ("extraction", "categorization", "context", "education", "translation"):
+        manager.register_agent(SleepyAgent(name, fail=name == fail))
+    return manager
+
+def test_agents_run_concurrently_with_timings():
+    results = asyncio.run(_manager().run_pipeline("some text"))
+    timings = results["timings"]
+    assert timings["total_latency_ms"] < 200  # five 50 ms agents, not 250 ms back to back
+    assert timings["agents"]["education"]["attempts"] == 1
+    assert timings["agents"]["education"]["total_tokens"] == 15
+    assert "errors" not in results
+
+def test_concurrency_cap_of_one_is_sequential():
+    results = asyncio.run(_manager().run_pipeline("some text", max_concurrency=1))
+    assert results["timings"]["total_latency_ms"] >= 250
+
+def test_failed_agent_returns_partial_results(monkeypatch):
+    monkeypatch.setattr(execute_agent_scan.retry, "wait", wait_none())
+    results = asyncio.run(_manager(fail="translation").run_pipeline("some text"))
+    assert results["translation"] is None
+    assert results["extraction"] == {"agent": "extraction"}
+    assert "translation is down" in results["errors"]["translation"]
+    assert results["timings"]["agents"]["translation"]["attempts"] == 3
+    assert results["timings"]["agents"]["translation"]["status"] == "failed"
+
+def test_batch_streams_in_completion_order_with_index():
+    manager = _manager()
+    manager.register_agent(SleepyAgent("extraction", delay=0.01))
+
+    async def texts():
+        for text in ["slow", ValueError("bad line"), "fast"]:
+            yield text
+
+    async def collect():
+        return [item async for item in manager.run_batch(texts(), concurrency=2)]
+
+    items = asyncio.run(collect())
+    assert sorted(item["index"] for item in items) == [0, 1, 2]
+    assert items[0] == {"index": 1, "status": "failed", "error": "bad line"}
+    assert all(item["status"] == "success" for item in items if item["index"] != 1)
+
+def test_batch_endpoint_accepts_ndjson(monkeypatch):
+    import json
+    from fastapi.testclient import TestClient
+    from main import app
+    import routers.agents as agents_router
+
+    monkeypatch.setattr(agents_router, "agent_manager", _manager())
+    body = '{"text": "one"}\n"two"\n{"oops": 1}\n'
+    response = TestClient(app).post(
+        "/agents/process/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert {line["index"]: line["status"] for line in lines} == {0: "success", 1: "success", 2: "failed"}
+
+def test_fused_analysis_falls_back_when_keys_are_missing():
+    from agents.analysis_agent import validate_analysis
+
+    class BrokenAnalysis(SleepyAgent):
+        async def process(self, input_data, **kwargs):
+            return {"error": "; ".join(validate_analysis({"title": "Neem paste"}))}
+
+    manager = _manager()
+    manager.register_agent(BrokenAnalysis("analysis"))
+    analysis = asyncio.run(manager.process_analysis("some text", mode="fused"))
+    assert analysis == {
+        "extraction": {"agent": "extraction"},
+        "categorization": {"agent": "categorization"},
+        "context": {"agent": "context"},
+    }
+
+def test_fused_analysis_leaves_long_transcripts_to_separate_agents(monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "AGENT_CHUNK_TOKENS", 10)
+
+    class UnexpectedAnalysis(SleepyAgent):
+        async def process(self, input_data, **kwargs):
+            raise AssertionError("fused call should be skipped")
+
+    manager = _manager()
+    manager.register_agent(UnexpectedAnalysis("analysis"))
+    analysis = asyncio.run(manager.process_analysis("First sentence here. " * 10, mode="fused"))
+    assert analysis["extraction"] == {"agent": "extraction"}
+
+def test_fused_analysis_splits_into_agent_shapes():
+    from agents.analysis_agent import validate_analysis, split_analysis
+    data = {
+        "title": "Neem paste for wounds", "knowledge_type": "folk_remedy", "details": {},
+        "cultural_context": "Village healers", "region": "Kerala, India", "latitude": 10.85,
+        "longitude": 76.27, "category": "Folk Medicine", "context_analysis": "Long analysis",
+    }
+    assert validate_analysis(data) == []
+    parts = split_analysis(data)
+    assert parts["categorization"] == {"category": "Folk Medicine"}
+    assert parts["context"] == {"context_analysis": "Long analysis"}
+    assert parts["extraction"]["region"] == "Kerala, India"
+
+def test_staged_education_renders_languages_concurrently():
+    import json
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    english = {"summary": "Neem paste", "lesson": "Bitterness heals", "moral": "Listen to elders",
+               "quiz_questions": [{"question": "Why neem?", "answer": "It is antiseptic."}]}
+    in_flight = peak = 0
+
+    async def render(prompt):
+        nonlocal in_flight, peak
+        text = prompt.to_string()
+        language = "hi" if "language with code: hi" in text else "ml"
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return AIMessage(content=json.dumps({**{key: f"{language}:{key}" for key in ("summary", "lesson", "moral")},
+                                             "quiz_questions": []}))
+
+    manager = AgentManager(UNTHROTTLED)
+    manager.agents["education"].llm = RunnableLambda(lambda prompt: AIMessage(content=json.dumps(english)))
+    manager.agents["education_rendition"].llm = RunnableLambda(render)
+    sections = []
+
+    async def on_section(path, value):
+        sections.append(path)
+
+    result = asyncio.run(manager.process_education("text", "ml", on_section=on_section, mode="staged"))
+    assert result["summary"] == {"en": "Neem paste", "hi": "hi:summary", "native": "ml:summary"}
+    assert result["quiz_questions"]["en"] == english["quiz_questions"]
+    assert peak == 2  # hi and native rendered at the same time
+    assert ("summary", "en") in sections and ("moral", "native") in sections
+
+def test_warm_up_builds_chains_once_and_opens_connections():
+    import httpx
+    from tests.fake_llm_server import create_app
+
+    app = create_app()
+    registry = LLMClientRegistry(api_key="x", default_model="test-model", base_url="http://fake-groq",
+                                 transport=httpx.ASGITransport(app=app))
+    manager = AgentManager(registry)
+
+    async def warm():
+        summary = await manager.warm_up(connections=2)
+        return summary, manager.agents["education"].chain("main")
+
+    summary, chain = asyncio.run(warm())
+    assert summary["chains"] == sum(len(agent.PROMPTS) for agent in manager.agents.values())
+    assert summary["connections"] == 2 and app.state.stats["model_listings"] == 2
+    assert chain.first is type(manager.agents["education"]).prompt("main")  # compiled once per class
+    assert manager.agents["education"].chain("main") is chain  # same client, so the chain is reused
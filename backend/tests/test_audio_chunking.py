@@ -0,0 +1,52 @@
+import numpy as np
+from services.audio_chunking import plan_chunks, SAMPLE_RATE
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+def test_short_audio_is_a_single_chunk():
+    audio = _tone(10)
+    assert plan_chunks(audio) == [(0, len(audio))]
+
+def test_chunks_are_contiguous_and_bounded():
+    audio = np.concatenate([_tone(25), _silence(1), _tone(25), _silence(1), _tone(25)])
+    spans = plan_chunks(audio, target_seconds=30, max_seconds=45)
+    assert spans[0][0] == 0 and spans[-1][1] == len(audio)
+    assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+    assert all(end - start <= 45 * SAMPLE_RATE for start, end in spans)
+
+def test_cuts_land_in_silence():
+    audio = np.concatenate([_tone(25), _silence(1), _tone(25), _silence(1), _tone(25)])
+    spans = plan_chunks(audio, target_seconds=30, max_seconds=45)
+    for _, end in spans[:-1]:
+        assert np.abs(audio[end - 160:end + 160]).max() == 0
+
+def test_prepared_wav_decodes_without_ffmpeg(tmp_path):
+    import wave
+    from services.audio_chunking import decode_audio
+
+    samples = (_tone(1) * 32767).astype(np.int16)
+    path = str(tmp_path / "prepared.16k.wav")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+
+    audio = decode_audio(path)
+    assert audio.dtype == np.float32
+    assert len(audio) == SAMPLE_RATE
+    assert np.allclose(audio, samples / 32768.0)
+
+def test_long_trailing_speech_is_cut_at_the_maximum():
+    # One pause early on, then two minutes of uninterrupted speech; the target leaves no search window
+    audio = np.concatenate([_tone(20), _silence(1), _tone(120)])
+    for target in (30, 100):
+        spans = plan_chunks(audio, target_seconds=target, max_seconds=45)
+        assert spans[0][0] == 0 and spans[-1][1] == len(audio)
+        assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+        assert all(end - start <= 45 * SAMPLE_RATE for start, end in spans)
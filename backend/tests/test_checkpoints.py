@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from db.mongo import db
+from routers.processing import forced_stages, is_forced
+from services.checkpoint_service import CheckpointService, is_checkpointable
+from tests.fake_mongo import FakeDatabase
+
+@pytest.fixture
+def checkpoints(monkeypatch):
+    monkeypatch.setattr(db, "db", FakeDatabase())
+    return CheckpointService()
+
+def _counting(output):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return output
+    return compute, calls
+
+def test_checkpoint_is_reused_only_for_the_same_inputs(checkpoints):
+    compute, calls = _counting({"title": "Neem paste"})
+    run = lambda inputs, **kwargs: asyncio.run(checkpoints.run("rec-1", "extraction", inputs, compute, **kwargs))
+
+    assert run({"transcript": "a"}) == ({"title": "Neem paste"}, False)
+    assert run({"transcript": "a"}) == ({"title": "Neem paste"}, True)
+    assert run({"transcript": "b"}) == ({"title": "Neem paste"}, False)  # re-transcribed
+    assert run({"transcript": "b"}, force=True)[1] is False
+    assert len(calls) == 3
+    assert [c["stage"] for c in asyncio.run(checkpoints.list_stages("rec-1"))] == ["extraction"]
+
+@pytest.mark.parametrize("output", [
+    {"score": 50, "fallback": True}, {"error": "Failed to parse JSON"}, {"summary": "…", "truncated": True}, "text",
+])
+def test_fallback_and_error_outputs_are_never_stored(checkpoints, output):
+    assert not is_checkpointable(output)
+    compute, calls = _counting(output)
+    for _ in range(2):
+        asyncio.run(checkpoints.run("rec-1", "verification:safety", {"transcript": "a"}, compute))
+    assert len(calls) == 2
+
+def test_outputs_computed_from_fallback_inputs_are_not_persisted(checkpoints):
+    compute, calls = _counting({"action": "approve"})
+    for _ in range(2):
+        asyncio.run(checkpoints.run("rec-1", "routing", {"verification": "fallback"}, compute, persist=False))
+    assert len(calls) == 2
+
+def test_from_stage_forces_the_stage_and_its_descendants():
+    forced = forced_stages("extraction")
+    assert {"extraction", "verification", "aggregation", "routing"} <= forced
+    assert not {"audio_prep", "stt", "categorization", "context"} & forced
+    assert forced_stages(None) == set()
+    with pytest.raises(ValueError):
+        forced_stages("transcription")
+
+def test_verification_sub_stages_follow_their_parent():
+    assert is_forced("verification:safety", forced_stages("extraction"))
+    assert is_forced("verification", forced_stages("verification"))
+    assert not is_forced("verification:safety", forced_stages("routing"))
+    assert not is_forced("extraction", set())
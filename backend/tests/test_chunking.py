@@ -0,0 +1,50 @@
+import asyncio
+import json
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from agents.chunking import split_text, merge_extractions, max_scores
+from agents.translation_agent import TranslationAgent
+
+def test_split_text_keeps_sentences_whole():
+    text = "पहला वाक्य। Second sentence here! Third one?\nA segment without punctuation " + "word " * 30
+    chunks = split_text(text, max_chars=60)
+    assert chunks[:2] == ["पहला वाक्य। Second sentence here! Third one?", "A segment without punctuation word word word word word word"]
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+    assert split_text("short", max_chars=60) == ["short"]
+
+def test_reducers_merge_entities_and_keep_the_riskiest_chunk():
+    merged = merge_extractions([
+        {"title": "Neem paste", "region": "unknown", "details": {"ingredients": ["neem", "turmeric"]}, "cultural_context": "Kerala homes"},
+        {"title": "Later title", "region": "Kerala, India", "details": {"ingredients": ["turmeric", "water"]}, "cultural_context": "Kerala homes"},
+        {"error": "Failed to parse JSON", "raw_output": "..."},
+    ])
+    assert merged == {"title": "Neem paste", "region": "Kerala, India",
+                      "details": {"ingredients": ["neem", "turmeric", "water"]}, "cultural_context": "Kerala homes"}
+
+    flag = {"issue": "dosage", "segment": "three leaves"}
+    worst = max_scores([{"score": 20, "flags": [flag], "reasoning": "mild"},
+                        {"score": 70, "flags": [flag], "reasoning": "ingest"}])
+    assert worst == {"score": 70, "flags": [flag], "reasoning": "ingest", "chunks": 2}
+
+def test_long_translation_is_map_reduced_in_order(monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "AGENT_CHUNK_TOKENS", 10)  # 40 characters per chunk
+
+    async def translate(prompt):
+        text = prompt.to_string().split("Text: ", 1)[1].split("\n", 1)[0]
+        await asyncio.sleep(0.03 if text.startswith("One") else 0)  # first chunk finishes last
+        return AIMessage(content=json.dumps({"en": text.upper()}))
+
+    agent = TranslationAgent()
+    agent.llm = RunnableLambda(translate)
+    sections = []
+
+    async def on_section(path, value):
+        sections.append(value)
+
+    text = "One sentence that is long. Two sentences follow it. Three is the last one."
+    result = asyncio.run(agent.process(text, on_section=on_section))
+    assert result == {"en": text.upper()}
+    assert sections == [text.upper()]  # nothing reported until the first chunk is in
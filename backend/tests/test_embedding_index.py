@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.runnables import RunnableLambda
+
+from services.embedding_index import EmbeddingIndex, HashingEmbedder
+from agents.verification import duplication_agent
+from agents.verification.duplication_agent import DuplicationAgent
+
+NEEM = "Grandmother grinds neem leaves with turmeric and applies the paste to wounds for three days."
+RAIN = "Farmers in the village watch the ants carry eggs uphill, a sign that the monsoon rains are near."
+
+def test_search_is_per_category_and_survives_reload(tmp_path):
+    index = EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder())
+
+    async def scenario():
+        await index.add("a", "Folk Medicine", NEEM)
+        await index.add("b", "Folk Medicine", RAIN)
+        await index.add("c", "Agriculture", RAIN)
+        return await index.search("Folk Medicine", NEEM.replace("three", "four"), k=2)
+
+    matches = asyncio.run(scenario())
+    assert [doc_id for doc_id, _ in matches] == ["a", "b"]
+    assert matches[0][1] > 0.9 > matches[1][1]
+
+    reloaded = EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder())
+    assert asyncio.run(reloaded.search("Folk Medicine", NEEM, exclude_id="a"))[0][0] == "b"
+    # Re-indexing under another category moves the record
+    asyncio.run(reloaded.add("a", "Agriculture", NEEM))
+    assert [doc_id for doc_id, _ in asyncio.run(index.search("Folk Medicine", NEEM))] == ["b"]
+
+def test_duplication_decides_clear_cases_without_the_llm(tmp_path, monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "DUPLICATION_MODE", "embedding")
+    index = EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder())
+    monkeypatch.setattr(duplication_agent, "embedding_index", index)
+    asyncio.run(index.add("existing", "Folk Medicine", NEEM))
+
+    def no_llm(_):
+        raise AssertionError("LLM should not be called")
+
+    agent = DuplicationAgent()
+    agent.llm = RunnableLambda(no_llm)
+    duplicate = asyncio.run(agent.process({"knowledge_id": "new", "category": "Folk Medicine", "transcript": NEEM}))
+    assert duplicate["score"] == 100.0
+    assert duplicate["flags"][0]["segment"] == "existing"
+
+    unique = asyncio.run(agent.process({"knowledge_id": "new", "category": "Folk Medicine", "transcript": RAIN}))
+    assert unique["score"] == 0.0 and unique["flags"] == []
+    # A record is never its own duplicate when reprocessed
+    assert asyncio.run(agent.process({"knowledge_id": "existing", "category": "Folk Medicine", "transcript": NEEM}))["score"] == 0.0
+
+# Retellings of the same knowledge, and different knowledge from the same category
+PARAPHRASES = [
+    (NEEM, "My grandmother would crush neem leaves together with turmeric and put that paste on cuts for three days."),
+    (RAIN, "In our village the farmers say when ants carry their eggs up the hill, the monsoon is about to arrive."),
+    ("During Pongal we boil fresh rice with milk and jaggery in a clay pot until it overflows, which means prosperity for the year.",
+     "At Pongal fresh rice is boiled with milk and jaggery in a clay pot and we let it overflow because that brings prosperity for the coming year."),
+]
+SAME_TOPIC = [
+    (NEEM, "For a cough my mother boils tulsi leaves with ginger and honey and we drink it warm twice a day."),
+    (RAIN, "Before sowing, the farmers offer the first seeds to the village goddess and pray for a good harvest."),
+    ("During Pongal we boil fresh rice with milk and jaggery in a clay pot until it overflows, which means prosperity for the year.",
+     "On Diwali we light clay lamps in every window and draw rangoli with rice flour at the door to welcome Lakshmi."),
+]
+
+def test_hashing_thresholds_send_paraphrases_to_the_llm(tmp_path):
+    index = EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder())
+    thresholds = index.thresholds()
+    for a, b in PARAPHRASES:
+        assert thresholds["borderline"] <= float(index.embed(a) @ index.embed(b)) < thresholds["match"]
+    for a, b in SAME_TOPIC:
+        assert float(index.embed(a) @ index.embed(b)) < thresholds["borderline"]
+
+def test_empty_category_falls_back_to_the_llm_check(tmp_path, monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "DUPLICATION_MODE", "embedding")
+    monkeypatch.setattr(duplication_agent, "embedding_index", EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder()))
+
+    class LegacyDuplicationAgent(DuplicationAgent):
+        async def find_candidates(self, input_data):
+            return None, {"agent": self.name, "score": 0.0, "flags": [], "reasoning": "legacy check"}
+
+    result = asyncio.run(LegacyDuplicationAgent().process({"knowledge_id": "new", "category": "Folk Medicine", "transcript": NEEM}))
+    assert result["reasoning"] == "legacy check"
+
+def test_concurrent_writers_keep_each_others_entries(tmp_path):
+    # Two instances stand in for the API and a worker process sharing the directory
+    first, second = (EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder()) for _ in range(2))
+    vector = first.embed(NEEM)
+
+    def write(index, prefix):
+        for i in range(15):
+            index._add(f"{prefix}{i}", "Folk Medicine", vector)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(write, (first, second), ("a", "b")))
+    assert first.size("Folk Medicine") == 30
+
+    second._add("a0", "Agriculture", vector)  # moved by the other process
+    asyncio.run(first.remove("a0"))
+    assert (first.size("Folk Medicine"), first.size("Agriculture")) == (29, 0)
+
+def test_counting_a_partition_does_not_load_the_embedder(tmp_path):
+    asyncio.run(EmbeddingIndex(str(tmp_path), embedder=HashingEmbedder()).add("a", "Folk Medicine", NEEM))
+
+    fresh = EmbeddingIndex(str(tmp_path), backend="hashing")
+    assert asyncio.run(fresh.count("Folk Medicine")) == 1
+    assert fresh.thresholds()["match"] > 0 and fresh._embedder is None
+    # A partition stamped with another model is ignored, still without loading one
+    other = EmbeddingIndex(str(tmp_path), backend="sentence-transformers", model_name="some-model")
+    assert other.size("Folk Medicine") == 0 and other._embedder is None
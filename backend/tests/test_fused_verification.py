@@ -0,0 +1,47 @@
+import asyncio
+import json
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from agents.verification.safety_agent import SafetyAgent
+from agents.verification.authenticity_agent import AuthenticityAgent
+from agents.verification.sensitivity_agent import SensitivityAgent
+from agents.verification.completeness_agent import CompletenessAgent
+from agents.verification.duplication_agent import DuplicationAgent
+from agents.verification.fused_verification_agent import FusedVerificationAgent
+
+class ArchivelessDuplicationAgent(DuplicationAgent):
+    async def find_candidates(self, input_data):
+        return None, {"agent": self.name, "score": 0.0, "flags": [], "reasoning": "Skipping duplication check."}
+
+    async def screen(self, input_data):
+        return [], {"agent": self.name, "score": 0.0, "flags": [], "reasoning": "Skipping duplication check."}
+
+def _fused_agent(response: dict) -> FusedVerificationAgent:
+    agents = {a.name: a for a in (SafetyAgent(), AuthenticityAgent(), SensitivityAgent(),
+                                  CompletenessAgent(), ArchivelessDuplicationAgent())}
+    agent = FusedVerificationAgent(agents)
+    agent.llm = RunnableLambda(lambda _: AIMessage(content=json.dumps(response)))
+    return agent
+
+def test_fused_sections_match_per_agent_normalization():
+    agent = _fused_agent({
+        "safety": {"score": 40, "flags": [{"issue": "dosage", "segment": "three leaves"}], "reasoning": "..."},
+        "authenticity": {"score": 80, "flags": [], "reasoning": "..."},
+        "sensitivity": {"score": 10, "flags": "not a list", "reasoning": "..."},
+        "completeness": {"score": 20, "flags": [], "reasoning": "..."},
+    })
+    out = asyncio.run(agent.process({"transcript": "text", "category": "Folk Medicine"}))
+    results = out["results"]
+    assert out["missing"] == []
+    assert results["authenticity"]["score"] == 20.0  # inverted into a risk score like AuthenticityAgent
+    assert results["sensitivity"]["access_level"] == "public"
+    assert results["safety"]["flags"] == [{"agent": "safety", "issue": "dosage", "segment": "three leaves"}]
+    assert results["completeness"]["missing_elements"] == []
+    assert results["duplication"]["score"] == 0.0
+
+def test_malformed_sections_are_reported_missing():
+    agent = _fused_agent({"safety": {"score": "high"}, "authenticity": {"score": 70}})
+    out = asyncio.run(agent.process({"transcript": "text"}))
+    assert out["missing"] == ["safety", "sensitivity", "completeness"]
+    assert set(out["results"]) == {"authenticity", "duplication"}
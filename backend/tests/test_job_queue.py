@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from db.mongo import db
+from services.job_queue import JobQueue, JobWorker, JobAlreadyRunningError, NonRetryableJobError, ACTIVE_STATUSES
+from tests.fake_mongo import FakeCollection, FakeDatabase
+
+@pytest.fixture
+def jobs(monkeypatch):
+    # Mirrors the dedupe_key_active unique partial index
+    jobs = FakeCollection(unique=[("dedupe_key", {"dedupe_key": {"$type": "string"}, "status": {"$in": ACTIVE_STATUSES}})])
+    monkeypatch.setattr(db, "db", FakeDatabase(jobs=jobs))
+    return jobs
+
+def _job(jobs, job_id):
+    return next(doc for doc in jobs.docs if doc["_id"] == job_id)
+
+class LostLeaseQueue:
+    def __init__(self):
+        self.calls = []
+
+    async def heartbeat(self, job_id, worker_id):
+        return False
+
+    async def complete(self, job_id, worker_id):
+        self.calls.append("complete")
+
+    async def fail(self, job, error, retryable=True):
+        self.calls.append("fail")
+
+def test_handler_is_cancelled_when_the_lease_is_lost(monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "JOB_VISIBILITY_TIMEOUT_SECONDS", 1)
+    cancelled = asyncio.Event()
+
+    async def handler(record_id):
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    queue = LostLeaseQueue()
+    worker = JobWorker(queue, {"process_record": handler})
+    job = {"_id": "job-1", "type": "process_record", "payload": {"record_id": "r"}, "attempts": 1, "max_attempts": 3}
+
+    async def scenario():
+        await asyncio.wait_for(worker._execute(job), timeout=5)
+
+    asyncio.run(scenario())
+    assert cancelled.is_set()
+    assert queue.calls == []
+
+def test_enqueue_reuses_an_active_job_with_the_same_key(jobs):
+    queue = JobQueue()
+    enqueue = lambda payload: asyncio.run(queue.enqueue("process_record", payload, dedupe_key="record:r"))
+
+    job_id = enqueue({"record_id": "r"})
+    assert enqueue({"record_id": "r"}) == job_id
+    # Not started yet: the latest options win
+    assert enqueue({"record_id": "r", "from_stage": "stt"}) == job_id
+    assert _job(jobs, job_id)["payload"] == {"record_id": "r", "from_stage": "stt"}
+
+    asyncio.run(queue.lease("worker-1"))
+    assert enqueue({"record_id": "r", "from_stage": "stt"}) == job_id
+    with pytest.raises(JobAlreadyRunningError):
+        enqueue({"record_id": "r"})
+
+    asyncio.run(queue.complete(job_id, "worker-1"))
+    assert enqueue({"record_id": "r"}) != job_id
+
+def test_enqueue_race_settles_on_the_unique_index(jobs):
+    queue = JobQueue()
+    first = asyncio.run(queue.enqueue("process_record", {"record_id": "r"}, dedupe_key="record:r"))
+    reuse, missed = queue._reuse, []
+
+    async def late_reuse(dedupe_key, payload):
+        # The other enqueue inserted between our lookup and our insert
+        if not missed:
+            missed.append(True)
+            return None
+        return await reuse(dedupe_key, payload)
+
+    queue._reuse = late_reuse
+    assert asyncio.run(queue.enqueue("process_record", {"record_id": "r"}, dedupe_key="record:r")) == first
+    assert len(jobs.docs) == 1
+
+def test_expired_lease_is_reclaimed_by_another_worker(jobs):
+    queue = JobQueue()
+    job_id = asyncio.run(queue.enqueue("process_record", {"record_id": "r"}))
+    assert asyncio.run(queue.lease("worker-1"))["attempts"] == 1
+    assert asyncio.run(queue.lease("worker-2")) is None
+
+    _job(jobs, job_id)["lease_expires_at"] = datetime.utcnow() - timedelta(seconds=1)  # worker-1 crashed
+    reclaimed = asyncio.run(queue.lease("worker-2"))
+    assert (reclaimed["_id"], reclaimed["worker_id"], reclaimed["attempts"]) == (job_id, "worker-2", 2)
+    assert asyncio.run(queue.heartbeat(job_id, "worker-1")) is False
+    assert asyncio.run(queue.heartbeat(job_id, "worker-2")) is True
+
+def test_fail_backs_off_exponentially_then_gives_up(jobs, monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10)
+    queue = JobQueue()
+    job_id = asyncio.run(queue.enqueue("process_record", {"record_id": "r"}, max_attempts=3))
+
+    for attempt, delay in ((1, 10), (2, 20)):
+        _job(jobs, job_id)["run_at"] = datetime.utcnow()
+        job = asyncio.run(queue.lease("worker-1"))
+        assert job["attempts"] == attempt
+        before = datetime.utcnow()
+        assert asyncio.run(queue.fail(job, "boom")) is True
+        run_at = _job(jobs, job_id)["run_at"]
+        assert timedelta(seconds=delay) <= run_at - before < timedelta(seconds=delay + 5)
+
+    _job(jobs, job_id)["run_at"] = datetime.utcnow()
+    job = asyncio.run(queue.lease("worker-1"))
+    assert asyncio.run(queue.fail({**job, "worker_id": "worker-2"}, "boom")) is None  # lease not ours
+    assert asyncio.run(queue.fail(job, "boom")) is False
+    assert (_job(jobs, job_id)["status"], _job(jobs, job_id)["last_error"]) == ("failed", "boom")
+
+def test_non_retryable_and_exhausted_jobs_fail_without_running_again(jobs):
+    queue = JobQueue()
+    ran, hooked = [], []
+
+    async def handler(record_id):
+        ran.append(record_id)
+        raise NonRetryableJobError("no speech")
+
+    async def hook(job, error, will_retry):
+        hooked.append((error, will_retry))
+
+    worker = JobWorker(queue, {"process_record": handler}, {"process_record": hook})
+    first = asyncio.run(queue.enqueue("process_record", {"record_id": "a"}, max_attempts=3))
+    asyncio.run(worker._execute(asyncio.run(queue.lease(worker.worker_id))))
+    assert _job(jobs, first)["status"] == "failed" and hooked == [("no speech", False)]
+
+    # A lease that expired on crashed workers past max_attempts is failed, not run
+    second = asyncio.run(queue.enqueue("process_record", {"record_id": "b"}, max_attempts=1))
+    _job(jobs, second)["attempts"] = 1
+    asyncio.run(worker._execute(asyncio.run(queue.lease(worker.worker_id))))
+    assert _job(jobs, second)["status"] == "failed"
+    assert ran == ["a"]
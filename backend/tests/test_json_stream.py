@@ -0,0 +1,69 @@
+import asyncio
+import json
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from agents.education_agent import EducationAgent
+from agents.json_stream import IncrementalJSONParser
+
+EDUCATION = {
+    "summary": {"en": "A \"neem\" remedy, {kept} in brass.", "hi": "नीम का लेप", "native": "വേപ്പ്"},
+    "lesson": {"en": "Bitterness as medicine.", "hi": "...", "native": "..."},
+    "quiz_questions": {"en": [{"question": "Why neem?", "answer": "It is antiseptic."}], "hi": [], "native": []},
+}
+
+def test_parser_reports_values_as_they_close_for_any_chunking():
+    text = "```json\n" + json.dumps(EDUCATION, ensure_ascii=False, indent=2) + "\n```"
+    for size in (1, 5, 64, len(text)):
+        parser = IncrementalJSONParser()
+        paths = [path for i in range(0, len(text), size) for path, _ in parser.feed(text[i:i + size])]
+        assert parser.done and parser.value == EDUCATION
+    assert paths.index(("summary", "en")) < paths.index(("summary",)) < paths.index(("quiz_questions", "en"))
+
+def test_truncated_stream_keeps_completed_sections():
+    text = json.dumps(EDUCATION, ensure_ascii=False)
+    parser = IncrementalJSONParser()
+    parser.feed(text[:text.index("Bitterness") + 6])
+    assert parser.partial() == {"summary": EDUCATION["summary"]}
+    assert parser.partial(include_open_string=True)["lesson"] == {"en": "Bitter"}
+
+def _education_agent(content: str) -> EducationAgent:
+    agent = EducationAgent()
+    agent.llm = GenericFakeChatModel(messages=iter([AIMessage(content=content)]))
+    return agent
+
+def test_education_streams_sections_to_the_callback():
+    sections = []
+
+    async def on_section(path, value):
+        sections.append(path)
+
+    result = asyncio.run(_education_agent(json.dumps(EDUCATION, ensure_ascii=False)).process("text", on_section=on_section))
+    assert result == EDUCATION
+    assert sections[:3] == [("summary", "en"), ("summary", "hi"), ("summary", "native")]
+    assert ("quiz_questions", "en") in sections
+
+def test_education_returns_partial_result_when_cut_off():
+    text = json.dumps(EDUCATION, ensure_ascii=False)
+    result = asyncio.run(_education_agent(text[:text.index('"lesson"')]).process("text"))
+    assert result == {"summary": EDUCATION["summary"], "truncated": True}
+
+def test_translation_streams_through_the_groq_client():
+    import httpx
+    from agents.llm_client import LLMClientRegistry
+    from agents.translation_agent import TranslationAgent
+    from tests.fake_llm_server import create_app
+
+    translation = {"en": "The grandmother ground neem leaves with turmeric."}
+    registry = LLMClientRegistry(
+        api_key="x", default_model="llama-3.3-70b-versatile", base_url="http://fake-groq",
+        transport=httpx.ASGITransport(app=create_app(content=json.dumps(translation))),
+    )
+    sections = []
+
+    async def on_section(path, value):
+        sections.append((path, value))
+
+    result = asyncio.run(TranslationAgent(registry).process("text", on_section=on_section))
+    assert result == translation
+    assert sections == [(("en",), translation["en"])]
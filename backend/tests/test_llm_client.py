@@ -0,0 +1,42 @@
+import asyncio
+
+from agents.llm_client import LLMClientRegistry
+from agents.extraction_agent import ExtractionAgent
+from agents.translation_agent import TranslationAgent
+
+def _registry(**kwargs) -> LLMClientRegistry:
+    return LLMClientRegistry(api_key="x", default_model="llama-3.3-70b-versatile", **kwargs)
+
+def test_agents_share_one_connection_pool():
+    registry = _registry(agent_models={"translation": "llama-3.1-8b-instant"})
+    extraction, translation = ExtractionAgent(registry), TranslationAgent(registry)
+    assert extraction.llm is ExtractionAgent(registry).llm  # same model and params -> same client
+    assert translation.llm.model_name == "llama-3.1-8b-instant"
+    assert translation.llm.max_tokens == 8192
+    assert extraction.llm.http_async_client is translation.llm.http_async_client is registry.http_client
+
+def test_slot_caps_requests_in_flight():
+    registry = _registry(max_in_flight=2, model_settings={"llama-3.3-70b-versatile": {"max_in_flight": 1}})
+    peak = 0
+
+    async def call(model):
+        nonlocal peak
+        async with registry.slot(model):
+            peak = max(peak, registry.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run(model):
+        await asyncio.gather(*[call(model) for _ in range(4)])
+
+    asyncio.run(run("llama-3.3-70b-versatile"))
+    assert peak == 1  # per-model limit
+    peak = 0
+    asyncio.run(run("llama-3.1-8b-instant"))
+    assert peak == 2  # global limit
+    assert registry.requests == 8 and registry.in_flight == 0
+
+def test_budget_is_split_between_processes():
+    registry = _registry(rpm=30, tpm=12000, processes=2, model_settings={"llama-3.1-8b-instant": {"rpm": 1, "tpm": 0}})
+    assert (registry.scheduler().requests.capacity, registry.scheduler().tokens.capacity) == (15, 6000)
+    small = registry.scheduler("llama-3.1-8b-instant")
+    assert (small.requests.capacity, small.tokens.capacity) == (1, 0)
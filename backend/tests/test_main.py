@@ -7,3 +7,44 @@ def test_read_main():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to Heritix API"}
+
+def test_archive_lists_project_out_internal_fields(monkeypatch):
+    from db.mongo import db
+    pipelines = []
+
+    class Cursor:
+        async def to_list(self, length):
+            return []
+
+    class Knowledge:
+        def aggregate(self, pipeline):
+            pipelines.append(pipeline)
+            return Cursor()
+
+    class Database:
+        knowledge = Knowledge()
+
+    monkeypatch.setattr(db, "db", Database())
+    for path in ("/archive/all", "/archive/search?q=neem", "/archive/nearby?lat=20&lng=78", "/archive/map/by-region?region=Kerala"):
+        assert client.get(path).status_code == 200
+    for pipeline in pipelines:
+        projection = next(stage["$project"] for stage in pipeline if "$project" in stage)
+        assert "title" in projection
+        assert not {"audio_prep", "audio_sha256", "minhash", "lsh_buckets", "content"} & set(projection)
+
+def test_oversized_upload_is_refused_before_the_body_is_read():
+    response = client.post(
+        "/api/upload-audio", content=b"x",
+        headers={"content-length": str(100 * 1024 * 1024), "content-type": "multipart/form-data; boundary=b"}
+    )
+    assert response.status_code == 413
+
+def test_status_prefers_the_partial_transcript_during_a_rerun(monkeypatch):
+    from db.mongo import db
+    from tests.fake_mongo import FakeCollection, FakeDatabase
+    record = {"_id": "rec-1", "processing_status": "processing", "transcript": "old " * 50,
+              "transcript_partial": "new " * 500, "transcript_progress": {"chunks_done": 3, "chunks_total": 40}}
+    monkeypatch.setattr(db, "db", FakeDatabase(knowledge=FakeCollection([record])))
+
+    preview = client.get("/api/status/rec-1").json()["metadata"]["transcript_preview"]
+    assert preview.startswith("new") and len(preview) == 100
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from langchain_core.runnables import RunnableLambda
+
+from services import minhash
+from db.mongo import db
+from main import app
+from agents.verification.duplication_agent import DuplicationAgent
+from tests.fake_mongo import FakeCollection, FakeDatabase
+
+STORY = ("Long ago the king of the hills asked the river to stop flooding the fields, and the river agreed "
+         "only if the farmers planted a banyan tree on each bank and sang to it before every harvest.")
+
+def test_near_copies_share_buckets_and_unrelated_text_does_not():
+    original = minhash.signature(STORY)
+    retold = minhash.signature(STORY.replace("planted", "grew").replace("every", "each"))
+    unrelated = minhash.signature("Grandmother grinds neem leaves with turmeric and applies the paste to wounds.")
+
+    assert minhash.similarity(original, minhash.signature(STORY.upper())) == 1.0
+    assert minhash.similarity(original, retold) > 0.7
+    assert minhash.similarity(original, unrelated) < 0.1
+    assert set(minhash.lsh_buckets(original)) & set(minhash.lsh_buckets(retold))
+    assert not set(minhash.lsh_buckets(original)) & set(minhash.lsh_buckets(unrelated))
+
+    fields = minhash.to_fields(STORY)
+    assert len(fields["minhash"]) == minhash.NUM_PERM * 8 and len(fields["lsh_buckets"]) == minhash.BANDS
+
+def test_reupload_short_circuits_the_duplication_check(monkeypatch):
+    async def find_near_duplicates(text, exclude_id=None, threshold=None):
+        assert exclude_id == "new"
+        return [("original", 0.97)]
+
+    def no_llm(_):
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(minhash, "find_near_duplicates", find_near_duplicates)
+    agent = DuplicationAgent()
+    agent.llm = RunnableLambda(no_llm)
+    result = asyncio.run(agent.process({"knowledge_id": "new", "category": "Folklore", "transcript": STORY}))
+    assert result["score"] == 97.0
+    assert [flag["segment"] for flag in result["flags"]] == ["original"]
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+class _Collection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def aggregate(self, pipeline):
+        return _Cursor([dict(doc) for doc in self.docs])
+
+class _Database:
+    def __init__(self, docs):
+        self.knowledge = _Collection(docs)
+
+def test_archive_serializes_records_with_a_signature(monkeypatch):
+    record = {"_id": "rec-1", "title": "River and the king", "category": "Folklore", "transcript": STORY,
+              "processing_status": "completed", **minhash.to_fields(STORY)}
+    monkeypatch.setattr(db, "db", _Database([record]))
+    client = TestClient(app)
+    for path in ("/archive/all", "/archive/search", "/archive/nearby?lat=20&lng=78", "/archive/map/by-region?region=Kerala"):
+        response = client.get(path)
+        assert response.status_code == 200, path
+        assert response.json()[0]["_id"] == "rec-1"
+
+def test_concurrent_copies_flag_only_the_later_upload(monkeypatch):
+    start = datetime(2024, 6, 1)
+    knowledge = FakeCollection([
+        {"_id": "first", "processing_status": "processing", "created_at": start, **minhash.to_fields(STORY)},
+        {"_id": "second", "processing_status": "processing", "created_at": start + timedelta(seconds=5), **minhash.to_fields(STORY)},
+    ])
+    monkeypatch.setattr(db, "db", FakeDatabase(knowledge=knowledge))
+
+    assert asyncio.run(minhash.find_near_duplicates(STORY, exclude_id="first")) == []
+    assert asyncio.run(minhash.find_near_duplicates(STORY, exclude_id="second")) == [("first", 1.0)]
+    # A finished record is an original whenever it was uploaded
+    knowledge.docs[1]["processing_status"] = "completed"
+    assert [doc_id for doc_id, _ in asyncio.run(minhash.find_near_duplicates(STORY, exclude_id="first"))] == ["second"]
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from services.pipeline_dag import PipelineDAG, Stage
+
+def _graph() -> PipelineDAG:
+    return PipelineDAG([
+        Stage("stt"),
+        Stage("extraction", depends_on=("stt",)),
+        Stage("categorization", depends_on=("stt",)),
+        Stage("verification", depends_on=("extraction", "categorization")),
+        Stage("routing", depends_on=("verification",), opens=lambda ok: ok),
+        Stage("education", depends_on=("stt",), gated_by="routing"),
+    ])
+
+def _runners(delay: float = 0.05, approve: bool = True, education=None) -> dict:
+    def sleeper(name, value=None):
+        async def run(results):
+            await asyncio.sleep(delay)
+            return value if value is not None else name
+        return run
+    return {
+        "stt": sleeper("stt"),
+        "extraction": sleeper("extraction"),
+        "categorization": sleeper("categorization"),
+        "verification": sleeper("verification"),
+        "routing": sleeper("routing", approve),
+        "education": education or sleeper("education"),
+    }
+
+def _rendezvous(name: str, started: dict):
+    """A stage that only finishes once every other stage in `started` has begun."""
+    async def run(results):
+        started[name].set()
+        await asyncio.wait_for(asyncio.gather(*(event.wait() for event in started.values())), 1)
+        return name
+    return run
+
+def test_independent_stages_overlap():
+    # Education only depends on stt, so it runs alongside extraction instead of after routing
+    started = {"extraction": asyncio.Event(), "education": asyncio.Event()}
+    runners = {
+        **_runners(delay=0),
+        "extraction": _rendezvous("extraction", started),
+        "education": _rendezvous("education", started),
+    }
+    run = asyncio.run(_graph().execute(runners))
+    assert run.results["education"] == "education"
+
+def test_non_speculative_waits_for_gate():
+    routed = asyncio.Event()
+
+    async def routing(results):
+        routed.set()
+        return True
+
+    async def education(results):
+        assert routed.is_set()
+        return "education"
+
+    run = asyncio.run(_graph().execute({**_runners(delay=0), "routing": routing, "education": education}, speculative=False))
+    assert run.results["education"] == "education"
+
+def test_closed_gate_discards_speculative_stages():
+    run = asyncio.run(_graph().execute(_runners(approve=False)))
+    assert "education" not in run.results
+    assert run.discarded == {"education"}
+
+def test_speculative_error_is_dropped_when_gate_closes():
+    async def failing(results):
+        raise RuntimeError("education failed")
+    run = asyncio.run(_graph().execute(_runners(approve=False, education=failing)))
+    assert run.discarded == {"education"}
+
+def test_speculative_error_surfaces_when_gate_opens():
+    async def failing(results):
+        raise RuntimeError("education failed")
+    with pytest.raises(RuntimeError, match="education failed"):
+        asyncio.run(_graph().execute(_runners(education=failing)))
+
+def test_descendants_follow_data_dependencies():
+    assert _graph().descendants("extraction") == {"extraction", "verification", "routing"}
+    with pytest.raises(ValueError):
+        _graph().descendants("unknown")
+
+def test_cycles_are_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        PipelineDAG([Stage("a", depends_on=("b",)), Stage("b", depends_on=("a",))])
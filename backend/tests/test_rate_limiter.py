@@ -0,0 +1,84 @@
+import asyncio
+import httpx
+from langchain_core.messages import AIMessageChunk
+from langchain_core.prompts import ChatPromptTemplate
+
+from agents.base_agent import BaseAgent
+from agents.llm_client import LLMClientRegistry
+from agents.rate_limiter import RateLimitScheduler, TokenBucket, llm_priority
+from tests.fake_llm_server import create_app
+
+class EchoAgent(BaseAgent):
+    async def process(self, input_data, **kwargs):
+        chain = ChatPromptTemplate.from_template("{text}") | self.llm
+        response = await self._invoke(chain, {"text": input_data})
+        return {"content": response.content}
+
+def test_queued_requests_are_granted_by_priority():
+    scheduler = RateLimitScheduler(rpm=0, tpm=0)
+    granted = []
+
+    async def request(level):
+        with llm_priority(level):
+            await scheduler.acquire(10)
+        granted.append(level)
+
+    async def run():
+        scheduler.backoff(0.05)  # e.g. a 429 just arrived; everything below queues
+        tasks = []
+        for level in ("backfill", "pipeline", "interactive"):
+            tasks.append(asyncio.create_task(request(level)))
+            await asyncio.sleep(0.005)
+        assert scheduler.stats()["queued"] == {"interactive": 1, "pipeline": 1, "backfill": 1}
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert granted == ["interactive", "pipeline", "backfill"]
+
+def test_token_bucket_waits_for_refill_and_settles_actual_usage():
+    now = [0.0]
+    bucket = TokenBucket(6000, clock=lambda: now[0])  # 100 tokens per second
+    bucket.consume(6000)
+    assert bucket.delay(500) == 5.0
+    bucket.refund(6000 - 1000)  # the request actually used 1000 tokens
+    assert bucket.delay(500) == 0.0
+
+def test_rate_limited_calls_honour_retry_after_against_fake_server():
+    app = create_app(rpm=3, window_seconds=0.3)
+    registry = LLMClientRegistry(
+        api_key="x", default_model="llama-3.3-70b-versatile",
+        base_url="http://fake-groq", transport=httpx.ASGITransport(app=app),
+    )
+    agent = EchoAgent("echo", registry, temperature=0)
+
+    async def run():
+        return await asyncio.gather(*[agent.process(f"text {i}") for i in range(7)])
+
+    results = asyncio.run(run())
+    assert all(r == {"content": '{"ok": true}'} for r in results)
+    assert app.state.stats["completed"] == 7
+    assert app.state.stats["rate_limited"] >= 1
+    assert registry.scheduler().stats()["rate_limited"] == app.state.stats["rate_limited"]
+
+class _RateLimited(Exception):
+    status_code = 429
+    response = None
+
+class _CutOffStream:
+    def __init__(self):
+        self.calls = 0
+
+    async def astream(self, inputs):
+        self.calls += 1
+        yield AIMessageChunk(content='{"a": 1, ')
+        raise _RateLimited()
+
+def test_stream_cut_off_by_a_429_is_not_replayed():
+    registry = LLMClientRegistry(api_key="x", default_model="llama-3.3-70b-versatile")
+    agent = EchoAgent("echo", registry, temperature=0)
+    chain = _CutOffStream()
+
+    response, parsed = asyncio.run(agent._stream_json(chain, {"text": "x"}, section_depth=1))
+    assert chain.calls == 1
+    assert (response, parsed) == (None, {"a": 1, "truncated": True})
+    assert registry.scheduler().stats()["rate_limited"] == 1
@@ -0,0 +1,50 @@
+import asyncio
+
+from agents.base_agent import BaseAgent
+from agents.response_cache import AgentResponseCache, hash_input
+import agents.base_agent as base_agent
+
+class CountingAgent(BaseAgent):
+    def __init__(self, name: str, temperature: float = 0, result=None) -> None:
+        super().__init__(name, temperature=temperature)
+        self.calls = 0
+        self.result = result or {"title": "Neem paste"}
+
+    async def process(self, input_data, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return dict(self.result)
+
+def test_normalised_inputs_share_an_entry_and_report_saved_latency(monkeypatch):
+    cache = AgentResponseCache(lru_size=8, ttl_hours=1, enabled=True)
+    monkeypatch.setattr(base_agent, "agent_response_cache", cache)
+    agent = CountingAgent("extraction")
+
+    async def run():
+        first = await agent.run("Grind  neem leaves\nwith turmeric ")
+        first["title"] = "mutated by the caller"
+        return await agent.run("Grind neem leaves with turmeric")
+
+    assert asyncio.run(run()) == {"title": "Neem paste"}
+    assert agent.calls == 1
+    stats = cache.stats()["agents"]["extraction"]
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+    assert stats["saved_latency_ms"] >= 10
+    assert hash_input({"a": 1, "b": "x  y"}) == hash_input({"b": "x y", "a": 1})
+
+def test_sampled_agents_and_failures_are_not_cached(monkeypatch):
+    monkeypatch.setattr("config.settings.AGENT_CACHE_NONDETERMINISTIC", [])
+    cache = AgentResponseCache(lru_size=8, ttl_hours=1, enabled=True)
+    monkeypatch.setattr(base_agent, "agent_response_cache", cache)
+    education = CountingAgent("education", temperature=0.7)
+    broken = CountingAgent("categorization", result={"category": "Uncategorized", "raw": "not json"})
+
+    async def run():
+        for _ in range(2):
+            await education.run("text")
+            await broken.run("text")
+
+    asyncio.run(run())
+    assert education.calls == 2 and broken.calls == 2
+    assert cache.stats()["agents"]["education"]["bypassed"] == 2
+    assert cache.stats()["lru_entries"] == 0
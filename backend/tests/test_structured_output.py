@@ -0,0 +1,46 @@
+import asyncio
+import json
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from agents.extraction_agent import ExtractionAgent
+from agents.structured_output import OutputSchema, NUMBER, parse_json, parse_stats
+from agents.verification.safety_agent import SafetyAgent
+
+def test_common_breakages_are_repaired_locally():
+    broken = 'Here is the JSON:\n```json\n{"score": 40, "flags": [{"issue": "dosage",},], "ok": True,\n"reasoning": "line one\nline two'
+    data, repaired = parse_json(broken)
+    assert repaired
+    assert data == {"score": 40, "flags": [{"issue": "dosage"}], "ok": True, "reasoning": "line one\nline two"}
+    assert parse_json('{"score": 1} trailing commentary')[0] == {"score": 1}
+    assert parse_json('```json\n{"a": 1}\n```') == ({"a": 1}, False)
+
+def test_schema_validates_and_coerces():
+    schema = OutputSchema(required={"score": NUMBER, "title": str})
+    data = {"score": "70", "title": "Neem"}
+    assert schema.validate(data) == [] and data["score"] == 70.0
+    assert schema.validate({"score": True}) == ["'score' must be int or float", "missing 'title'"]
+
+def test_unrepairable_output_is_reasked_once():
+    prompts = []
+
+    async def respond(prompt):
+        prompts.append(prompt.to_string())
+        if len(prompts) == 1:
+            return AIMessage(content="The score is forty, mostly safe.")
+        return AIMessage(content=json.dumps({"score": 40, "flags": [], "reasoning": "fixed"}))
+
+    agent = SafetyAgent()
+    agent.llm = RunnableLambda(respond)
+    result = asyncio.run(agent.process({"transcript": "text"}))
+    assert result["score"] == 40 and "error" not in result
+    assert "The score is forty" in prompts[1] and "score (int or float)" in prompts[1]
+    assert parse_stats.stats()["agents"]["safety"]["reasked"] >= 1
+
+def test_failed_reask_returns_the_fallback():
+    agent = ExtractionAgent()
+    agent.llm = RunnableLambda(lambda _: AIMessage(content="no JSON here"))
+    before = parse_stats.stats()["agents"].get("extraction", {}).get("failed", 0)
+    result = asyncio.run(agent.process("text"))
+    assert result == {"error": "Failed to parse JSON", "raw_output": "no JSON here"}
+    assert parse_stats.stats()["agents"]["extraction"]["failed"] == before + 1
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from db.mongo import db
+from services.stt_cache import STTCache
+from services.stt_service import stt_service
+from tests.fake_mongo import FakeDatabase
+
+RESULT = {"text": "Grandmother grinds neem leaves", "language": "hi", "segments": [{"start": 0.0, "end": 2.5, "text": "..."}]}
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDatabase()
+    monkeypatch.setattr(db, "db", fake)
+    return fake
+
+def test_key_covers_backend_model_and_decoding_params(monkeypatch):
+    from config import settings
+    streaming = stt_service.cache_params("whisper", True)
+    keys = {
+        STTCache.make_key("abc", "whisper", "small", streaming),
+        STTCache.make_key("abc", "whisper", "small", stt_service.cache_params("whisper", False)),
+        STTCache.make_key("abc", "faster-whisper", "small", stt_service.cache_params("faster-whisper", True)),
+        STTCache.make_key("abc", "whisper", "tiny", streaming),
+        STTCache.make_key("def", "whisper", "small", streaming),
+    }
+    assert len(keys) == 5
+    # Param order doesn't matter, chunking settings do
+    assert STTCache.make_key("abc", "whisper", "small", dict(reversed(streaming.items()))) == STTCache.make_key("abc", "whisper", "small", streaming)
+    monkeypatch.setattr(settings, "STT_CHUNK_SECONDS", 20.0)
+    assert STTCache.make_key("abc", "whisper", "small", stt_service.cache_params("whisper", True)) not in keys
+
+def test_put_then_get_round_trips_through_the_collection(fake_db):
+    params = stt_service.cache_params("whisper", True)
+    writer = STTCache()
+    assert asyncio.run(writer.get("abc", "whisper", "small", params)) is None
+    asyncio.run(writer.put("abc", "whisper", "small", params, {**RESULT, "backend": "whisper"}))
+
+    # A fresh process has an empty LRU and reads from MongoDB
+    reader = STTCache()
+    assert asyncio.run(reader.get("abc", "whisper", "small", params)) == RESULT
+    assert asyncio.run(reader.get("abc", "whisper", "tiny", params)) is None
+    assert fake_db.stt_cache.docs[0]["audio_sha256"] == "abc"
+
+def test_lru_serves_repeats_without_the_database(fake_db):
+    params = stt_service.cache_params("whisper", False)
+    cache = STTCache(lru_size=1)
+    asyncio.run(cache.put("abc", "whisper", "small", params, RESULT))
+    fake_db.stt_cache.docs.clear()
+    assert asyncio.run(cache.get("abc", "whisper", "small", params)) == RESULT
+
+    asyncio.run(cache.put("def", "whisper", "small", params, RESULT))  # evicts "abc"
+    assert asyncio.run(cache.get("abc", "whisper", "small", params)) is None
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from auth import verify_token
+from db.mongo import db
+from main import app
+from services import upload_session_service as uploads
+from services.upload_session_service import (
+    UploadSessionService, UploadSessionError, UploadOffsetMismatch, UploadChunkInProgress
+)
+from tests.fake_mongo import FakeDatabase
+
+AUDIO = os.urandom(4096)
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_TMP_DIR", str(tmp_path / "tmp"))
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(db, "db", FakeDatabase())
+    return UploadSessionService()
+
+def _create(service, total_size=len(AUDIO)):
+    return asyncio.run(service.create_session("user-1", "webm", "audio/webm", total_size, {"consent": True}))
+
+def _body(*pieces):
+    async def stream():
+        for piece in pieces:
+            yield piece
+    return stream()
+
+def _append(service, session_id, offset, body):
+    session = asyncio.run(service.get_session(session_id, "user-1"))
+    return asyncio.run(service.append_chunk(session, offset, body))
+
+def test_chunks_commit_in_order_and_reject_a_wrong_offset(service):
+    session_id = _create(service)["_id"]
+    assert _append(service, session_id, 0, _body(AUDIO[:1000])) == 1000
+    with pytest.raises(UploadOffsetMismatch) as mismatch:
+        _append(service, session_id, 0, _body(AUDIO[:1000]))
+    assert mismatch.value.expected_offset == 1000
+    assert _append(service, session_id, 1000, _body(AUDIO[1000:])) == len(AUDIO)
+    with open(service._part_path(session_id), "rb") as part:
+        assert part.read() == AUDIO
+
+def test_oversized_and_overrunning_chunks_are_rejected(service, monkeypatch):
+    from config import settings
+    session_id = _create(service)["_id"]
+    with pytest.raises(UploadSessionError, match="overruns"):
+        _append(service, session_id, 0, _body(AUDIO, b"extra"))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_MAX_BYTES", 1024)
+    with pytest.raises(UploadSessionError, match="exceeds"):
+        _append(service, session_id, 0, _body(AUDIO[:2048]))
+    # Neither attempt committed anything or kept the lease
+    session = asyncio.run(service.get_session(session_id, "user-1"))
+    assert (session["offset"], session["writer"]) == (0, None)
+
+def test_concurrent_put_at_the_same_offset_is_refused(service):
+    session_id = _create(service)["_id"]
+
+    async def scenario():
+        session = await service.get_session(session_id, "user-1")
+        first_started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_body():
+            yield AUDIO[:1000]
+            first_started.set()
+            await release.wait()
+            yield AUDIO[1000:2000]
+
+        first = asyncio.create_task(service.append_chunk(session, 0, slow_body()))
+        await first_started.wait()
+        with pytest.raises(UploadChunkInProgress):
+            await service.append_chunk(session, 0, _body(AUDIO[:500]))
+        release.set()
+        return await first
+
+    assert asyncio.run(scenario()) == 2000
+
+def test_writer_stops_once_a_retry_takes_over(service, monkeypatch):
+    from config import settings
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_LEASE_SECONDS", 0)  # renew before every write
+    session_id = _create(service)["_id"]
+
+    async def taken_over():
+        yield AUDIO[:1000]
+        db.db.upload_sessions.docs[0]["writer"] = "retry"
+        yield AUDIO[1000:2000]
+
+    with pytest.raises(UploadChunkInProgress):
+        _append(service, session_id, 0, taken_over())
+    assert os.path.getsize(service._part_path(session_id)) <= 1000
+
+def test_interrupted_finalize_is_taken_over_once_stale(service):
+    session_id = _create(service)["_id"]
+    _append(service, session_id, 0, _body(AUDIO))
+    first = asyncio.run(service.complete(asyncio.run(service.get_session(session_id, "user-1")), 1024))
+
+    # The first finalize died after moving the file; a prompt retry is refused
+    session = asyncio.run(service.get_session(session_id, "user-1"))
+    with pytest.raises(UploadSessionError, match="already being finalized"):
+        asyncio.run(service.complete(session, 1024))
+
+    db.db.upload_sessions.docs[0]["updated_at"] = datetime.utcnow() - timedelta(hours=1)
+    retried = asyncio.run(service.complete(session, 1024))
+    assert retried == first
+
+def test_finalize_retries_return_the_same_record(service):
+    app.dependency_overrides[verify_token] = lambda: {"sub": "user-1"}
+    try:
+        client = TestClient(app)
+        session_id = _create(service)["_id"]
+        _append(service, session_id, 0, _body(AUDIO))
+        first = client.post(f"/api/uploads/{session_id}/finalize").json()
+        second = client.post(f"/api/uploads/{session_id}/finalize").json()
+    finally:
+        app.dependency_overrides.clear()
+    assert first["record_id"] == second["record_id"]
+    assert [doc["_id"] for doc in db.db.knowledge.docs] == [first["record_id"]]
+
+def test_cleanup_removes_part_files_of_expired_sessions(service):
+    tmp_dir = uploads.UPLOAD_TMP_DIR
+    os.makedirs(tmp_dir)
+    live = datetime.utcnow() + timedelta(hours=1)
+    asyncio.run(db.db.upload_sessions.insert_one({"_id": "live", "expires_at": live}))
+    asyncio.run(db.db.upload_sessions.insert_one({"_id": "expired", "expires_at": datetime.utcnow() - timedelta(hours=1)}))
+    old = time.time() - 24 * 3600
+    for name in ("live", "expired", "gone", "just-created"):
+        with open(os.path.join(tmp_dir, f"{name}.part"), "wb") as part:
+            part.write(b"audio")
+    for name in ("live", "expired", "gone"):
+        os.utime(os.path.join(tmp_dir, f"{name}.part"), (old, old))
+
+    assert asyncio.run(service.cleanup_orphans()) == 2
+    assert sorted(os.listdir(tmp_dir)) == ["just-created.part", "live.part"]
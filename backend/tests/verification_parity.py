@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db.mongo import db
+from agents.telemetry import track
+from agents.verification import execute_with_fallback
+from agents.verification.safety_agent import SafetyAgent
+from agents.verification.authenticity_agent import AuthenticityAgent
+from agents.verification.sensitivity_agent import SensitivityAgent
+from agents.verification.completeness_agent import CompletenessAgent
+from agents.verification.duplication_agent import DuplicationAgent
+from agents.verification.score_aggregator_agent import ScoreAggregatorAgent
+from agents.verification.fused_verification_agent import (
+    FusedVerificationAgent, VERIFICATION_AGENTS, execute_fused_verification
+)
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "verification", "cases.json")
+
+async def run_case(case: dict, agents: dict, fused_agent: FusedVerificationAgent, aggregator: ScoreAggregatorAgent) -> dict:
+    verification_input = {
+        "transcript": case["transcript"],
+        "category": case["category"],
+        "context_analysis": {"context_analysis": case["context_analysis"]},
+        "region": case["region"],
+        "language": case.get("language", "en"),
+        "knowledge_id": f"parity-{case['id']}",
+    }
+
+    with track("per_agent") as per_agent_timing:
+        per_agent = await asyncio.gather(*[execute_with_fallback(agents[n], verification_input) for n in VERIFICATION_AGENTS])
+    with track("fused") as fused_timing:
+        fused = await execute_fused_verification(fused_agent, verification_input)
+        # Mirror the pipeline: checks the fused response missed run individually
+        fused_results = [
+            fused["results"][n] if n in fused["results"] else await execute_with_fallback(agents[n], verification_input)
+            for n in VERIFICATION_AGENTS
+        ]
+
+    per_agent_scored = aggregator.compute(per_agent)
+    fused_scored = aggregator.compute(fused_results)
+    return {
+        "id": case["id"],
+        "expected": case.get("expected_risk_level"),
+        "per_agent": per_agent_scored,
+        "fused": fused_scored,
+        "fused_missing": fused["missing"],
+        "per_agent_timing": per_agent_timing.as_dict(),
+        "fused_timing": fused_timing.as_dict(),
+    }
+
+async def run_parity(fixtures_path: str) -> list[dict]:
+    with open(fixtures_path, encoding="utf-8") as f:
+        cases = json.load(f)
+
+    # DuplicationAgent compares against the archive, so both modes need the same database
+    await db.connect_to_database()
+    try:
+        agents = {a.name: a for a in (SafetyAgent(), AuthenticityAgent(), SensitivityAgent(), CompletenessAgent(), DuplicationAgent())}
+        fused_agent = FusedVerificationAgent(agents)
+        aggregator = ScoreAggregatorAgent()
+        return [await run_case(case, agents, fused_agent, aggregator) for case in cases]
+    finally:
+        await db.close_database_connection()
+
+def print_report(rows: list[dict]) -> None:
+    print("\n" + "=" * 100)
+    print(f"{'Case':<18}" + "".join(f"{n[:6]:>11}" for n in VERIFICATION_AGENTS) + f"{'Composite':>12}{'Risk (per/fused)':>22}")
+    print("=" * 100)
+    deltas = {n: [] for n in VERIFICATION_AGENTS}
+    agreements = 0
+    for row in rows:
+        per, fused = row["per_agent"], row["fused"]
+        cells = ""
+        for n in VERIFICATION_AGENTS:
+            delta = fused["agent_scores"][n] - per["agent_scores"][n]
+            deltas[n].append(abs(delta))
+            cells += f"{delta:>+11.1f}"
+        agreements += per["risk_level"] == fused["risk_level"]
+        composite_delta = fused["composite_score"] - per["composite_score"]
+        print(f"{row['id']:<18}{cells}{composite_delta:>+12.1f}{per['risk_level'] + ' / ' + fused['risk_level']:>22}")
+        if row["fused_missing"]:
+            print(f"{'':<18}fused response missed: {', '.join(row['fused_missing'])}")
+
+    print("-" * 100)
+    print(f"{'Mean |delta|':<18}" + "".join(f"{sum(d) / len(d):>11.1f}" for d in deltas.values()))
+    print(f"\nRisk level agreement: {agreements}/{len(rows)}")
+
+    calls = {mode: sum(r[f"{mode}_timing"]["llm_calls"] for r in rows) for mode in ("per_agent", "fused")}
+    tokens = {mode: sum(r[f"{mode}_timing"]["total_tokens"] for r in rows) for mode in ("per_agent", "fused")}
+    latency = {mode: sum(r[f"{mode}_timing"]["latency_ms"] for r in rows) / len(rows) for mode in ("per_agent", "fused")}
+    for mode in ("per_agent", "fused"):
+        print(f"{mode:<10} LLM calls: {calls[mode]:<5} tokens: {tokens[mode]:<8} mean latency: {latency[mode]:.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare verification scores between per-agent and fused modes")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSON list of verification cases")
+    parser.add_argument("--json", help="Also write the raw comparison to this path")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run_parity(args.fixtures))
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, default=str)
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,14 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from db.mongo import db
-from agents.agent_manager import AgentManager
+from agents.agent_manager import get_agent_manager
+from agents.llm_client import llm_registry
+from agents.rate_limiter import llm_priority, Priority
 from config import settings
 
 async def reprocess_geo():
     await db.connect_to_database()
-    agent_manager = AgentManager()
+    agent_manager = get_agent_manager()
     
     # Get all completed records
     records_cursor = db.db.knowledge.find({"processing_status": "completed"})
@@ -30,8 +32,9 @@ async def reprocess_geo():
         print(f"Processing ID {record['_id']}: '{record.get('title', 'Untitled')}'")
         
         try:
-            # Run extraction agent again to get real insights
-            extraction_data = await agent_manager.process_extraction(transcript)
+            # Run extraction agent again to get real insights, behind any live uploads
+            with llm_priority(Priority.BACKFILL):
+                extraction_data = await agent_manager.process_extraction(transcript)
             
             region_name = extraction_data.get("region_name") if isinstance(extraction_data, dict) else None
             latitude = extraction_data.get("latitude") if isinstance(extraction_data, dict) else None
@@ -61,6 +64,7 @@ async def reprocess_geo():
             print(f"  -> Error processing: {e}")
             
     print(f"Finished. Successfully extracted real insights for {updated_count} records.")
+    await llm_registry.aclose()
     await db.close_database_connection()
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+import asyncio
+import signal
+import sys
+import os
+
+# Ensure the backend directory is in the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.mongo import db
+from config import settings
+from services.job_queue import job_queue, JobWorker
+from services.stt_service import stt_service
+from agents.llm_client import llm_registry
+from routers.processing import JOB_HANDLERS, JOB_FAILURE_HOOKS, warm_up_agents
+
+async def run_worker():
+    """
+    Standalone pipeline worker: leases jobs from the durable queue so API pods and
+    pipeline workers can be scaled independently (set JOB_EMBEDDED_WORKER=false on the API).
+    """
+    await db.connect_to_database()
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+
+    if settings.STT_PRELOAD:
+        await stt_service.warm_up()
+    if settings.AGENT_WARMUP_ON_STARTUP:
+        await warm_up_agents()
+
+    worker = JobWorker(job_queue, JOB_HANDLERS, JOB_FAILURE_HOOKS)
+    try:
+        await worker.run(stop)
+    finally:
+        stt_service.shutdown()
+        await llm_registry.aclose()
+        await db.close_database_connection()
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -39,6 +39,7 @@ interface RecordDetail {
     transcript: string;
     detected_language?: string;
     audio_url?: string;
+    playback_url?: string;
     created_at: string;
     processing_status: string;
     education_data?: {
@@ -192,7 +193,7 @@ export default function RecordDetailPage() {
                         <div className="flex-grow w-full md:px-8 flex flex-col justify-center relative z-10">
                             <audio
                                 ref={audioRef}
-                                src={record.audio_url}
+                                src={record.playback_url || record.audio_url}
                                 onTimeUpdate={handleTimeUpdate}
                                 onLoadedMetadata={handleLoadedMetadata}
                                 onEnded={() => setIsPlaying(false)}
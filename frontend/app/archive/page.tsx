@@ -13,6 +13,7 @@ interface Record {
     contributor: string;
     transcript: string;
     audio_url?: string;
+    playback_url?: string;
     summary?: string | { en?: string, hi?: string, native?: string };
     created_at: string;
     latitude?: number;
@@ -156,7 +157,7 @@ export default function ArchivePage() {
                             category={record.category || 'Uncategorized'}
                             contributor={record.contributor}
                             date={record.created_at}
-                            audioUrl={record.audio_url}
+                            audioUrl={record.playback_url || record.audio_url}
                             summary={record.summary || record.transcript}
                         />
                     ))}